@@ -0,0 +1,277 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 스트리밍 전송 단위 (bytes)
+CHUNK_SIZE = 64 * 1024
+
+# 매직 넘버 기반 MIME 판별 (data URL 헤더가 없는 경우)
+_MAGIC_MIME = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),  # RIFF....WEBP (sniff_mime에서 형식 태그 확인)
+]
+
+# 저장 / 응답을 허용하는 래스터 이미지 형식. 클라이언트가 보낸 MIME(data: 헤더, 파트 Content-Type)은
+# 사용하지 않으므로 SVG / HTML 같은 활성 콘텐츠가 같은 출처에서 제공되지 않습니다.
+IMAGE_MIME_TYPES = frozenset(mime for _, mime in _MAGIC_MIME)
+
+
+@dataclass
+class BlobRef:
+    """저장된 이미지 참조 정보 (measurements 행에 기록됨)"""
+    hash: str
+    size: int
+    mime: str
+
+
+class BlobStore:
+    """
+    콘텐츠 주소 기반(SHA-256) 이미지 저장소 인터페이스.
+    다른 저장소(S3 등)는 이 클래스를 상속하여 put/open/exists를 구현합니다.
+    """
+
+    def put(self, data: bytes, mime: str) -> BlobRef:
+        raise NotImplementedError
+
+    def open(self, digest: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """로컬 파일 경로 (없으면 None -> 스트리밍으로 전송)"""
+        return None
+
+    def writer(self, mime: str, max_bytes: Optional[int] = None) -> "BlobWriter":
+        """청크 단위 기록용 writer (기본: 메모리에 모은 뒤 put, 하위 클래스에서 스트리밍 구현)"""
+        return BlobWriter(self, mime, max_bytes)
+
+    def iter_chunks(self, digest: str) -> Iterator[bytes]:
+        with self.open(digest) as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class BlobTooLarge(ValueError):
+    """업로드 크기 제한 초과"""
+
+
+class BlobWriter:
+    """
+    사진을 청크 단위로 받아 SHA-256을 계산하며 기록합니다.
+    commit() 호출 시 저장소에 반영하고, abort()는 기록 중인 내용을 버립니다.
+    """
+
+    def __init__(self, store: BlobStore, mime: str, max_bytes: Optional[int] = None):
+        self.store = store
+        self.mime = mime
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._chunks = []
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise BlobTooLarge(f"Image exceeds {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        self._write(chunk)
+
+    def _write(self, chunk: bytes):
+        self._chunks.append(chunk)
+
+    def commit(self) -> BlobRef:
+        if not self.size:
+            raise ValueError("Empty image data")
+        return self.store.put(b"".join(self._chunks), self.mime)
+
+    def abort(self):
+        self._chunks = []
+
+
+class LocalBlobWriter(BlobWriter):
+    """임시 파일에 기록하고 commit 시 해시 경로로 원자적 교체 (메모리 사용량은 청크 크기로 제한)"""
+
+    def __init__(self, store: "LocalBlobStore", mime: str, max_bytes: Optional[int] = None):
+        super().__init__(store, mime, max_bytes)
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.root, suffix=".upload")
+        self._file = os.fdopen(fd, "wb")
+
+    def _write(self, chunk: bytes):
+        self._file.write(chunk)
+
+    def commit(self) -> BlobRef:
+        self._file.close()
+        if not self.size:
+            self.abort()
+            raise ValueError("Empty image data")
+        digest = self._hash.hexdigest()
+        path = self.store._path(digest)
+        if os.path.exists(path):
+            os.remove(self._tmp_path)  # 동일 내용은 한 번만 저장
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._tmp_path, path)
+        return BlobRef(hash=digest, size=self.size, mime=self.mime)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class LocalBlobStore(BlobStore):
+    """로컬 디스크 저장소: {root}/{hash[:2]}/{hash[2:4]}/{hash}"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Invalid blob digest: {digest}")
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, data: bytes, mime: str) -> BlobRef:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            # 동일 내용은 한 번만 저장 (임시 파일 작성 후 원자적 교체)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return BlobRef(hash=digest, size=len(data), mime=mime)
+
+    def open(self, digest: str) -> BinaryIO:
+        return open(self._path(digest), "rb")
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def writer(self, mime: str, max_bytes: Optional[int] = None) -> BlobWriter:
+        return LocalBlobWriter(self, mime, max_bytes)
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return self._path(digest)
+
+
+def _default_root() -> str:
+    if os.environ.get("TREEMAP_BLOB_DIR"):
+        return os.environ["TREEMAP_BLOB_DIR"]
+    # Vercel에서는 /tmp 디렉토리만 쓰기 권한이 있음
+    if os.environ.get("VERCEL"):
+        return "/tmp/tree_map_blobs"
+    return os.path.join(BASE_DIR, "blobs")
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = LocalBlobStore(_default_root())
+    return _store
+
+
+def set_blob_store(store: BlobStore):
+    """저장소 백엔드 교체 (테스트 또는 외부 스토리지 연동용)"""
+    global _store
+    _store = store
+
+
+def sniff_mime(data: bytes) -> str:
+    """매직 넘버로 이미지 MIME 판별"""
+    mime = next((m for magic, m in _MAGIC_MIME if data.startswith(magic)), "application/octet-stream")
+    if mime == "image/webp" and data[8:12] != b"WEBP":
+        return "application/octet-stream"
+    return mime
+
+
+def image_mime(head: bytes) -> str:
+    """파일 앞부분(12바이트 이상)의 매직 넘버로 판별한 MIME. 허용된 래스터 형식이 아니면 ValueError"""
+    mime = sniff_mime(head)
+    if mime not in IMAGE_MIME_TYPES:
+        raise ValueError(f"Unsupported image format (allowed: {', '.join(sorted(IMAGE_MIME_TYPES))})")
+    return mime
+
+
+def decode_image_data(image_data: str) -> Tuple[bytes, str]:
+    """
+    'data:image/png;base64,...' 형식 또는 순수 Base64 문자열을 디코딩합니다.
+    data: 헤더의 MIME은 무시하고 내용의 매직 넘버로 형식을 판별합니다 (허용 형식이 아니면 ValueError).
+    """
+    payload = image_data
+    if image_data.startswith("data:"):
+        _, _, payload = image_data.partition(",")
+    try:
+        data = base64.b64decode("".join(payload.split()), validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid base64 image data: {e}")
+    if not data:
+        raise ValueError("Empty image data")
+    return data, image_mime(data)
+
+
+def store_image_data(image_data: Optional[str]) -> dict:
+    """Base64 이미지를 저장소에 기록하고 measurements 행에 넣을 참조 컬럼을 반환합니다."""
+    if not image_data:
+        return {}
+    data, mime = decode_image_data(image_data)
+    ref = get_blob_store().put(data, mime)
+    return {"image_hash": ref.hash, "image_size": ref.size, "image_mime": ref.mime}
+
+
+def migrate_legacy_images(db, model, batch_size: int = 100) -> int:
+    """
+    image_data 컬럼에 Base64로 저장된 기존 사진을 저장소로 옮기고 컬럼을 비웁니다.
+    디코딩 / 저장에 실패한 행은 image_data를 그대로 두고 건너뜁니다 (원본이 유일한 사본).
+    """
+    migrated = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(model.id, model.image_data)
+            .filter(model.image_data.isnot(None), model.image_hash.is_(None), model.id > last_id)
+            .order_by(model.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        for row_id, image_data in rows:
+            try:
+                fields = store_image_data(image_data)
+            except ValueError as e:
+                logger.error(f"Legacy image migration skipped for ID {row_id}: {e}")
+                continue
+            fields["image_data"] = None
+            db.query(model).filter(model.id == row_id).update(fields, synchronize_session=False)
+            migrated += 1
+        db.commit()
+        last_id = rows[-1][0]
+    if migrated:
+        logger.info(f"Migrated {migrated} legacy images to blob store.")
+    return migrated
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import insert, select, text
+
+try:
+    import models, serializers
+except ImportError:
+    from . import models, serializers
+
+logger = logging.getLogger(__name__)
+
+# 변경 종류
+CREATED = "created"
+PROCESSED = "processed"  # 서버 AI 보정 결과 반영
+
+MAX_LIMIT = 1000
+# SSE: 연결 유지용 주석 전송 간격, 다른 프로세스의 변경을 확인하는 DB 조회 간격 (초)
+KEEPALIVE_SECONDS = float(os.environ.get("CHANGES_KEEPALIVE_S", "15"))
+POLL_SECONDS = float(os.environ.get("CHANGES_POLL_S", "5"))
+# PostgreSQL: change_log 기록 트랜잭션을 직렬화하는 트랜잭션 단위 advisory lock 키
+SEQ_LOCK_KEY = 0x7472_6565
+
+
+class ChangeFeed:
+    """
+    측정 변경 피드. 측정 저장과 서버 AI 보정 결과 기록 시 같은 트랜잭션에서 change_log에 단조 증가하는
+    seq를 남기고, 클라이언트는 마지막으로 받은 seq 이후의 변경분(변경된 측정의 현재 값)만 받아
+    로컬 사본을 갱신합니다 (GET /api/measurements/changes, SSE 스트림).
+    커밋 후 notify()로 같은 프로세스의 SSE 구독자를 깨우며, 다른 프로세스의 변경은 POLL_SECONDS 간격 조회로 반영됩니다.
+    """
+
+    def __init__(self):
+        self._subscribers = set()  # (loop, asyncio.Event)
+        self._lock = threading.Lock()
+
+    # ---- 기록 ----
+
+    @staticmethod
+    def record(db, measurement_ids, kind: str):
+        """
+        변경 기록 (측정 저장 / 보정 결과 기록과 같은 트랜잭션, 커밋 전).
+        seq는 INSERT 시점에 정해지므로 커밋 순서와 같아야 폴링 클라이언트가 늦게 커밋된 작은 seq를 건너뛰지 않습니다.
+        SQLite는 쓰기 잠금이 커밋까지 유지되어 항상 같고, PostgreSQL은 advisory lock(커밋 시 해제)을
+        잡은 뒤 seq를 받아 change_log를 기록하는 트랜잭션끼리 커밋 순서대로 seq가 부여되도록 합니다.
+        """
+        if measurement_ids:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEQ_LOCK_KEY})
+            db.execute(insert(models.ChangeLog.__table__),
+                       [{"measurement_id": measurement_id, "kind": kind} for measurement_id in measurement_ids])
+
+    def notify(self):
+        """변경 커밋 이후 호출 (임의의 스레드에서) - 대기 중인 SSE 구독자를 깨움"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # 이벤트 루프 종료
+                pass
+
+    # ---- 조회 ----
+
+    @staticmethod
+    def latest_seq(db) -> int:
+        return db.query(models.ChangeLog.seq).order_by(models.ChangeLog.seq.desc()).limit(1).scalar() or 0
+
+    @staticmethod
+    def read(db, since: int, limit: int, serializer: serializers.RowSerializer) -> dict:
+        """
+        since 이후 변경을 최대 limit건 읽습니다. 같은 측정의 여러 변경은 마지막 하나로 합치고,
+        측정 값은 현재 상태를 serializer 필드로 한 번만 담습니다.
+        """
+        C = models.ChangeLog
+        log = db.execute(
+            select(C.seq, C.measurement_id, C.kind).where(C.seq > since).order_by(C.seq).limit(limit + 1)
+        ).all()
+        has_more = len(log) > limit
+        log = log[:limit]
+
+        latest = {}
+        for seq, measurement_id, kind in log:
+            latest.pop(measurement_id, None)  # 마지막 변경 순서로 정렬되도록 다시 삽입
+            latest[measurement_id] = (seq, kind)
+        rows = {}
+        if latest:
+            M = models.TreeMeasurement
+            query = serializer.query(db).filter(M.id.in_(list(latest)))
+            rows = {row.id: row for row in query}
+
+        return {
+            "next": log[-1][0] if log else since,
+            "has_more": has_more,
+            "changes": [
+                {"seq": seq, "measurementId": measurement_id, "kind": kind}
+                for measurement_id, (seq, kind) in latest.items()
+            ],
+            # 삭제된 측정은 제외 (changes에는 남음)
+            "rows": [rows[measurement_id] for measurement_id in latest if measurement_id in rows],
+        }
+
+    @staticmethod
+    def to_json(page: dict, serializer: serializers.RowSerializer) -> bytes:
+        """{"next", "hasMore", "changes", "measurements"} JSON (측정 목록은 행 직렬화기로 바로 변환)"""
+        head = serializers.dumps({"next": page["next"], "hasMore": page["has_more"], "changes": page["changes"]})
+        return head[:-1] + b',"measurements":' + serializer.serialize(page["rows"]) + b"}"
+
+    # ---- 푸시 (SSE) ----
+
+    async def stream(self, session_factory, since: int, serializer: serializers.RowSerializer,
+                     run_sync, limit: int = MAX_LIMIT, is_disconnected=None):
+        """
+        text/event-stream 본문 생성기. 변경이 있으면 'changes' 이벤트(id = 마지막 seq)로 보내고,
+        변경이 없으면 KEEPALIVE_SECONDS마다 주석 줄을 보냅니다. run_sync는 DB 조회를 실행할 스레드 풀 함수.
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        subscriber = (loop, event)
+        with self._lock:
+            self._subscribers.add(subscriber)
+
+        def fetch(cursor: int) -> Optional[dict]:
+            with session_factory() as db:
+                page = self.read(db, cursor, limit, serializer)
+                return page if page["changes"] else None
+
+        try:
+            yield b"retry: 3000\n\n"
+            idle = 0.0
+            while True:
+                event.clear()
+                page = await run_sync(fetch, since)
+                while page is not None:
+                    since = page["next"]
+                    yield f"id: {since}\nevent: changes\ndata: ".encode() + self.to_json(page, serializer) + b"\n\n"
+                    idle = 0.0
+                    page = await run_sync(fetch, since) if page["has_more"] else None
+                if is_disconnected is not None and await is_disconnected():
+                    break
+                wait = min(POLL_SECONDS, KEEPALIVE_SECONDS)
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    idle += wait
+                    if idle >= KEEPALIVE_SECONDS:
+                        idle = 0.0
+                        yield b": keepalive\n\n"
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+def parse_since(since: Optional[int], last_event_id: Optional[str] = None, default: int = 0) -> int:
+    """since 쿼리 또는 SSE 재연결 시 Last-Event-ID 헤더 (둘 다 없으면 default)"""
+    if since is None and last_event_id:
+        try:
+            since = int(last_event_id)
+        except ValueError:
+            raise ValueError("Last-Event-ID must be a change sequence number")
+    if since is not None and since < 0:
+        raise ValueError("since must not be negative")
+    return default if since is None else since
@@ -0,0 +1,251 @@
+import math
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, func
+
+try:
+    import models, spatial
+    from database import additive_upsert
+except ImportError:
+    from . import models, spatial
+    from .database import additive_upsert
+
+logger = logging.getLogger(__name__)
+
+# 사전 집계하는 최대 타일 줌 (이보다 확대하면 개별 수목을 반환)
+MAX_CLUSTER_ZOOM = 16
+# 타일당 격자 분할 (2^3 = 8x8 셀)
+CELL_SHIFT = 3
+# 타일에 표시할 수종 구성 상위 개수
+TOP_SPECIES = 5
+
+TileKey = Tuple[int, int, int]
+
+
+def lonlat_to_tile(lat: float, lon: float, zoom: int) -> Tuple[int, int]:
+    """위경도 -> Web Mercator 타일 좌표 (Leaflet/OSM과 동일한 체계)"""
+    n = 1 << zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """타일 -> (minLat, minLon, maxLat, maxLon)"""
+    n = 1 << z
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+class ClusterIndex:
+    """
+    줌 레벨별 격자 셀 집계(cluster_cells, cluster_species)를 삽입 시점에 누적 갱신하고,
+    타일 응답을 LRU 캐시에 보관합니다. 타일 조회 비용은 전체 수목 수와 무관하게
+    타일당 최대 64개 셀 조회로 고정됩니다.
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[TileKey, dict]" = OrderedDict()
+        # 생성 중인 타일별 세대 번호. 생성 중 invalidate되면 항목이 사라져 결과를 캐시하지 않음
+        self._building: Dict[TileKey, int] = {}
+        self._generation = 0
+        # 타일 캐시에 반영한 마지막 change_log seq (다른 프로세스의 측정 저장 반영용)
+        self._synced_seq: Optional[int] = None
+        self._lock = threading.Lock()
+
+    # ---- 집계 갱신 ----
+
+    @staticmethod
+    def _aggregate(rows: Iterable) -> Tuple[Dict, Dict, Set[TileKey]]:
+        cells = defaultdict(lambda: [0, 0.0, 0.0, 0.0, 0, 0.0, 0])
+        species = defaultdict(int)
+        tiles = set()
+        for lat, lon, dbh, health, name in rows:
+            if lat is None or lon is None:
+                continue
+            for zoom in range(MAX_CLUSTER_ZOOM + 1):
+                cx, cy = lonlat_to_tile(lat, lon, zoom + CELL_SHIFT)
+                agg = cells[(zoom, cx, cy)]
+                agg[0] += 1
+                agg[1] += lat
+                agg[2] += lon
+                if dbh is not None:
+                    agg[3] += dbh
+                    agg[4] += 1
+                if health is not None:
+                    agg[5] += health
+                    agg[6] += 1
+                if name:
+                    species[(zoom, cx, cy, name)] += 1
+                tiles.add((zoom, cx >> CELL_SHIFT, cy >> CELL_SHIFT))
+        return cells, species, tiles
+
+    @staticmethod
+    def _write(db, cells, species):
+        additive_upsert(db, models.ClusterCell.__table__, ("zoom", "cell_x", "cell_y"), [
+            {"zoom": z, "cell_x": cx, "cell_y": cy, "count": a[0], "sum_lat": a[1], "sum_lon": a[2],
+             "sum_dbh": a[3], "dbh_count": a[4], "sum_health": a[5], "health_count": a[6]}
+            for (z, cx, cy), a in cells.items()
+        ])
+        additive_upsert(db, models.ClusterSpecies.__table__, ("zoom", "cell_x", "cell_y", "species"), [
+            {"zoom": z, "cell_x": cx, "cell_y": cy, "species": name, "count": c}
+            for (z, cx, cy, name), c in species.items()
+        ])
+
+    @staticmethod
+    def _source_columns():
+        return (
+            spatial.effective_latitude(),
+            spatial.effective_longitude(),
+            models.TreeMeasurement.dbh,
+            models.TreeMeasurement.health_score,
+            models.TreeMeasurement.species,
+        )
+
+    def record(self, db, measurement_ids) -> Set[TileKey]:
+        """새 측정을 집계에 반영합니다 (측정 저장과 같은 트랜잭션). 영향받은 타일 목록을 반환합니다."""
+        if not measurement_ids:
+            return set()
+        rows = db.execute(
+            select(*self._source_columns()).where(models.TreeMeasurement.id.in_(measurement_ids))
+        ).all()
+        cells, species, tiles = self._aggregate(rows)
+        self._write(db, cells, species)
+        return tiles
+
+    def rebuild(self, db, chunk_size: int = 5000) -> int:
+        """전체 측정 데이터로 집계를 다시 만듭니다 (초기 구축 / 수동 복구용)."""
+        db.query(models.ClusterSpecies).delete()
+        db.query(models.ClusterCell).delete()
+        total = 0
+        result = db.execute(
+            select(*self._source_columns()).execution_options(yield_per=chunk_size)
+        )
+        for partition in result.partitions(chunk_size):
+            cells, species, _ = self._aggregate(partition)
+            self._write(db, cells, species)
+            total += len(partition)
+        db.commit()
+        self.invalidate_all()
+        logger.info(f"Cluster aggregates rebuilt from {total} measurements.")
+        return total
+
+    def ensure_built(self, db):
+        """집계 테이블이 비어 있고 측정 데이터가 있으면 재구축합니다."""
+        has_cells = db.query(models.ClusterCell.zoom).first() is not None
+        if not has_cells and db.query(models.TreeMeasurement.id).first() is not None:
+            self.rebuild(db)
+
+    # ---- 타일 캐시 ----
+
+    def invalidate(self, tiles: Iterable[TileKey]):
+        with self._lock:
+            for key in tiles:
+                self._cache.pop(key, None)
+                self._building.pop(key, None)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._cache.clear()
+            self._building.clear()
+
+    def sync(self, db, seq: int, max_changes: int = 5000):
+        """
+        change_log의 seq까지 저장된 측정의 타일을 무효화합니다 (다른 프로세스 / 서버리스 인스턴스의 저장 반영).
+        같은 프로세스의 저장은 커밋 후 invalidate로 이미 반영되어 있으므로 다시 무효화해도 결과는 같습니다.
+        """
+        synced = self._synced_seq
+        if synced is not None and seq <= synced:
+            return
+        if synced is None or seq - synced > max_changes:
+            self.invalidate_all()
+        else:
+            C = models.ChangeLog
+            created = select(C.measurement_id).where(C.seq > synced, C.seq <= seq, C.kind == "created")
+            rows = db.execute(
+                select(*self._source_columns()).where(models.TreeMeasurement.id.in_(created))
+            ).all()
+            self.invalidate(self._aggregate(rows)[2])
+        with self._lock:
+            if self._synced_seq is None or seq > self._synced_seq:
+                self._synced_seq = seq
+
+    def tile(self, db, z: int, x: int, y: int) -> dict:
+        key = (z, x, y)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            self._generation += 1
+            generation = self._generation
+            self._building[key] = generation
+
+        try:
+            payload = self._build_tile(db, z, x, y)
+        except Exception:
+            with self._lock:
+                if self._building.get(key) == generation:
+                    del self._building[key]
+            raise
+
+        with self._lock:
+            # 생성 중 같은 타일이 무효화되었으면 (이전 데이터로 만든 결과) 캐시하지 않음
+            if self._building.get(key) != generation:
+                return payload
+            del self._building[key]
+            if z <= MAX_CLUSTER_ZOOM:
+                self._cache[key] = payload
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return payload
+
+    def _build_tile(self, db, z: int, x: int, y: int) -> dict:
+        if z > MAX_CLUSTER_ZOOM:
+            return {"z": z, "x": x, "y": y, "clusters": self._tile_points(db, z, x, y)}
+
+        x0, y0 = x << CELL_SHIFT, y << CELL_SHIFT
+        x1, y1 = x0 + (1 << CELL_SHIFT), y0 + (1 << CELL_SHIFT)
+        in_tile = lambda model: (
+            (model.zoom == z) & model.cell_x.between(x0, x1 - 1) & model.cell_y.between(y0, y1 - 1)
+        )
+
+        species_by_cell = defaultdict(list)
+        for cx, cy, name, count in db.query(
+            models.ClusterSpecies.cell_x, models.ClusterSpecies.cell_y,
+            models.ClusterSpecies.species, models.ClusterSpecies.count,
+        ).filter(in_tile(models.ClusterSpecies)):
+            species_by_cell[(cx, cy)].append((count, name))
+
+        clusters = []
+        for cell in db.query(models.ClusterCell).filter(in_tile(models.ClusterCell), models.ClusterCell.count > 0):
+            top = sorted(species_by_cell[(cell.cell_x, cell.cell_y)], reverse=True)[:TOP_SPECIES]
+            clusters.append({
+                "count": cell.count,
+                "latitude": cell.sum_lat / cell.count,
+                "longitude": cell.sum_lon / cell.count,
+                "mean_dbh": round(cell.sum_dbh / cell.dbh_count, 2) if cell.dbh_count else None,
+                "mean_health": round(cell.sum_health / cell.health_count, 2) if cell.health_count else None,
+                "species": {name: count for count, name in top},
+            })
+        return {"z": z, "x": x, "y": y, "clusters": clusters}
+
+    def _tile_points(self, db, z: int, x: int, y: int) -> List[dict]:
+        """최대 확대 구간: 공간 인덱스로 타일 내 개별 수목을 반환합니다."""
+        query = db.query(models.TreeMeasurement.id, *self._source_columns())
+        query = spatial.apply_spatial_filter(query, db.get_bind(), bbox=tile_bounds(z, x, y))
+        return [
+            {"count": 1, "latitude": lat, "longitude": lon, "mean_dbh": dbh, "mean_health": health,
+             "species": {name: 1} if name else {}, "measurement_id": mid}
+            for mid, lat, lon, dbh, health, name in query.all()
+        ]
@@ -0,0 +1,253 @@
+import base64
+import csv
+import datetime
+import importlib.util
+import io
+import json
+import logging
+import time
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+try:
+    import models, schemas, spatial, blob_store, queries, telemetry
+except ImportError:
+    from . import models, schemas, spatial, blob_store, queries, telemetry
+
+logger = logging.getLogger(__name__)
+
+# Parquet/Arrow 내보내기는 pyarrow 설치 시에만 지원 (임포트 비용이 커서 첫 사용 시 로드)
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _pyarrow():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+# 서버 측 커서에서 한 번에 가져오는 행 수 (= 출력 버퍼 단위)
+DEFAULT_BATCH_SIZE = 2000
+
+# 기본 내보내기 컬럼: 호환 뷰와 같은 구성 (센서 컬럼 포함, 레거시 Base64 image_data 컬럼 제외)
+EXPORT_COLUMNS = [name for name in telemetry.VIEW_COLUMNS if name != "image_data"]
+
+# 센서 컬럼의 API 필드명 (예: accelerometerX) - 목록 응답 필드가 아니므로 queries.RESPONSE_FIELDS에 없음
+TELEMETRY_ALIASES = {
+    field.alias: name for name, field in schemas.MeasurementTelemetryBase.model_fields.items() if field.alias
+}
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+class ExportStats:
+    """내보내기 처리량 측정 (rows/sec)"""
+
+    def __init__(self):
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def available_formats() -> List[str]:
+    return [f for f in FORMATS if f not in COLUMNAR_FORMATS or HAS_PYARROW]
+
+
+def resolve_columns(columns: Optional[str]) -> List[str]:
+    """'id,species,treeLatitude' -> 테이블 컬럼명 목록 (API 응답 필드명도 허용)"""
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    names = []
+    table_columns = set(EXPORT_COLUMNS)
+    for raw in columns.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        name = queries.RESPONSE_FIELDS.get(raw) or TELEMETRY_ALIASES.get(raw, raw)
+        if name not in table_columns:
+            raise ValueError(f"Unknown column: {raw}")
+        if name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError("columns must not be empty")
+    return names
+
+
+def iter_batches(session, columns: Sequence[str], bbox=None, near=None, include_images: bool = False,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[tuple]]:
+    """
+    서버 측 커서(stream_results)로 행을 batch_size 단위로 읽어옵니다.
+    전체 결과를 메모리에 올리지 않으므로 수백만 행도 일정한 메모리로 처리합니다.
+    """
+    T = models.MeasurementTelemetry.__table__
+    select_columns = [T.c[c] if c in telemetry.FIELDS else getattr(models.TreeMeasurement, c) for c in columns]
+    if include_images:
+        select_columns.append(models.TreeMeasurement.image_hash)
+        select_columns.append(models.TreeMeasurement.image_mime)
+    stmt = select(*select_columns).select_from(models.TreeMeasurement)
+    if any(c in telemetry.FIELDS for c in columns):
+        stmt = stmt.outerjoin(T, T.c.measurement_id == models.TreeMeasurement.id)
+    stmt = spatial.apply_spatial_filter(stmt, session.get_bind(), bbox=bbox, near=near)
+    stmt = stmt.order_by(models.TreeMeasurement.id)
+
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    store = blob_store.get_blob_store() if include_images else None
+    for partition in result.partitions(batch_size):
+        if not include_images:
+            yield [tuple(row) for row in partition]
+            continue
+        batch = []
+        for row in partition:
+            *values, image_hash, image_mime = row
+            values.append(_image_data_url(store, image_hash, image_mime))
+            batch.append(tuple(values))
+        yield batch
+
+
+def _image_data_url(store, image_hash, image_mime) -> Optional[str]:
+    if not image_hash or not store.exists(image_hash):
+        return None
+    with store.open(image_hash) as f:
+        encoded = base64.b64encode(f.read()).decode("ascii")
+    return f"data:{image_mime or 'application/octet-stream'};base64,{encoded}"
+
+
+def _plain(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def write_csv(batches, columns: Sequence[str], stats: ExportStats) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Excel에서 한글 수종명이 깨지지 않도록 BOM 추가
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([_plain(v) for v in row] for row in batch)
+        stats.rows += len(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_ndjson(batches, columns: Sequence[str], stats: ExportStats) -> Iterator[bytes]:
+    for batch in batches:
+        lines = [
+            json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False)
+            for row in batch
+        ]
+        stats.rows += len(batch)
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _DrainBuffer(io.RawIOBase):
+    """pyarrow 출력용 버퍼: 쓰인 바이트를 모아두었다가 스트리밍으로 내보냅니다."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns: Sequence[str]):
+    pa, _ = _pyarrow()
+    types = {}
+    tables = (models.TreeMeasurement.__table__, models.MeasurementTelemetry.__table__)
+    for column in (column for table in tables for column in table.columns):
+        python_type = column.type.python_type
+        if python_type is int:
+            types[column.name] = pa.int64()
+        elif python_type is float:
+            types[column.name] = pa.float64()
+        elif python_type is datetime.datetime:
+            types[column.name] = pa.timestamp("us")
+        else:
+            types[column.name] = pa.string()
+    return pa.schema([(c, types.get(c, pa.string())) for c in columns])
+
+
+def write_columnar(batches, columns: Sequence[str], stats: ExportStats, fmt: str) -> Iterator[bytes]:
+    """배치(= Parquet row group / Arrow record batch) 단위로 스트리밍합니다."""
+    if not HAS_PYARROW:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export")
+    pa, pq = _pyarrow()
+    schema = _arrow_schema(columns)
+    sink = _DrainBuffer()
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+    try:
+        for batch in batches:
+            arrays = [pa.array([row[i] for row in batch], type=field.type) for i, field in enumerate(schema)]
+            table = pa.Table.from_arrays(arrays, schema=schema)
+            writer.write_table(table)
+            stats.rows += len(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export(session, fmt: str, columns: Sequence[str], bbox=None, near=None, include_images: bool = False,
+           batch_size: int = DEFAULT_BATCH_SIZE, stats: Optional[ExportStats] = None) -> Iterator[bytes]:
+    """측정 데이터를 지정 형식의 바이트 청크 스트림으로 내보냅니다."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    if fmt in COLUMNAR_FORMATS and not HAS_PYARROW:
+        raise ValueError(f"Format '{fmt}' requires pyarrow")
+    stats = stats or ExportStats()
+    out_columns = list(columns) + (["image_data"] if include_images else [])
+    batches = iter_batches(session, columns, bbox=bbox, near=near,
+                           include_images=include_images, batch_size=batch_size)
+    if fmt == "csv":
+        yield from write_csv(batches, out_columns, stats)
+    elif fmt == "ndjson":
+        yield from write_ndjson(batches, out_columns, stats)
+    else:
+        yield from write_columnar(batches, out_columns, stats, fmt)
+    stats.finish()
+    logger.info(f"Exported {stats.rows} measurements as {fmt} in {stats.elapsed:.2f}s "
+                f"({stats.rows_per_sec:,.0f} rows/s)")
+
+
+def stream_export(session_factory, fmt: str, columns: Sequence[str], **kwargs) -> Iterator[bytes]:
+    """
+    StreamingResponse용 제너레이터: 응답 전송이 끝날 때까지 세션을 직접 유지합니다.
+    (요청 의존성 세션은 응답 스트리밍 전에 닫힐 수 있음)
+    """
+    session = session_factory()
+    try:
+        yield from export(session, fmt, columns, **kwargs)
+    finally:
+        session.close()
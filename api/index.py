@@ -1,9 +1,14 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+import hmac
 import os
 import logging
-from typing import List
+from typing import List, Optional
 
 # 임포트 오류를 방지하기 위해 sys.path 추가 (필요시)
 import sys
@@ -13,22 +18,184 @@ if current_dir not in sys.path:
 
 # Vercel 및 로컬 환경 호환 임포트 (전역 초기화 방식)
 try:
-    import models, schemas, database
-    from database import engine, get_db
-    from services.ai_service import TreeAIService
+    import models, schemas, database, spatial, blob_store, queries, clusters, exporter, metrics, serializers
+    import changes, snapshot, stats, telemetry, thumbnails, trees
+    from response_cache import ResponseCache, ResponseCacheMiddleware
+    from database import engine, get_db, get_async_db
+    from services.job_queue import AIJobQueue
+    from services import ingest
+    from services.group_commit import GroupCommitter
+    from services import upload
+    from services.reprocess import Reprocessor
+    from services import model_registry
 except ImportError as e:
     logger = logging.getLogger(__name__)
     logger.error(f"Import error at start: {e}")
     # 재시도 (패키지 형태)
-    from . import models, schemas, database
-    from .database import engine, get_db
-    from .services.ai_service import TreeAIService
+    from . import models, schemas, database, spatial, blob_store, queries, clusters, exporter, metrics, serializers
+    from . import changes, snapshot, stats, telemetry, thumbnails, trees
+    from .response_cache import ResponseCache, ResponseCacheMiddleware
+    from .database import engine, get_db, get_async_db
+    from .services.job_queue import AIJobQueue
+    from .services import ingest
+    from .services.group_commit import GroupCommitter
+    from .services import upload
+    from .services.reprocess import Reprocessor
+    from .services import model_registry
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+
+# 목록 응답 캐시 (ETag / 조건부 GET). 측정 저장, AI 보정 반영 시 버전 증가로 무효화
+response_cache = ResponseCache(max_bytes=int(os.environ.get("RESPONSE_CACHE_MB", "64")) * 1024 * 1024)
+
+
+# 사진 파생 이미지(썸네일 / 중간 크기) 캐시 (THUMBNAIL_* 환경 변수로 설정)
+thumbnail_cache = thumbnails.ThumbnailCache.from_env()
+if not thumbnail_cache.available:
+    logger.warning("Pillow is not installed. Image size variants will serve the original photo.")
+
+
+# SQL 실행 시간 계측 (/metrics)
+metrics.instrument_engine(database.engine)
+
+
+# 측정 변경 피드 (GET /api/measurements/changes, SSE)
+change_feed = changes.ChangeFeed()
+
+
+def on_measurements_processed(db, ids):
+    """서버 AI 보정 결과 커밋 이후 후속 처리"""
+    response_cache.bump()
+    change_feed.notify()
+
+
+# 수목 개체 식별 (새 측정을 근접 개체에 연결, TREE_MATCH_RADIUS_M)
+tree_linker = trees.TreeLinker()
+
+# 인벤토리 통계 (격자 셀 x 수종 단위 증분 집계)
+stats_index = stats.StatsIndex()
+
+
+@contextmanager
+def on_measurements_processing(db, ids):
+    """서버 AI 보정 결과 기록을 감싸는 후속 처리 (같은 트랜잭션, 커밋 전)"""
+    # 통계의 보정량 집계 교체
+    with stats_index.tracking_corrections(db, ids):
+        yield
+    change_feed.record(db, ids, changes.PROCESSED)
+
+
+# 서버 AI 분석 작업 큐 (AI_WORKERS, AI_WORKER_MODE 환경 변수로 설정)
+ai_queue = AIJobQueue.from_env(database.SessionLocal, on_processed=on_measurements_processed,
+                               on_write=on_measurements_processing)
+
+# 전체 재보정 (모델 업그레이드 시, REPROCESS_* 환경 변수로 설정) - AI 작업 큐와 같은 후속 처리 훅 사용
+reprocessor = Reprocessor.from_env(database.SessionLocal, on_write=on_measurements_processing,
+                                   on_processed=on_measurements_processed)
+
+# 지도 타일 클러스터 집계 및 타일 캐시
+cluster_index = clusters.ClusterIndex(cache_size=int(os.environ.get("CLUSTER_CACHE_TILES", "4096")))
+
+
+def on_measurements_inserted(db, ids):
+    """측정 저장 트랜잭션 안에서 실행되는 후속 처리 (커밋 전)"""
+    # 같은 나무의 이전 측정과 연결 (없으면 새 개체)
+    with metrics.stage("tree_link"):
+        tree_linker.link(db, ids)
+    # 서버 측 정밀 AI 분석은 작업 큐에 등록 (원본 데이터와 같은 트랜잭션으로 커밋)
+    ai_queue.enqueue(db, ids)
+    # 줌 레벨별 클러스터 집계 누적 (영향받은 타일은 커밋 후 캐시에서 제거)
+    db.info.setdefault("cluster_tiles", set()).update(cluster_index.record(db, ids))
+    # 인벤토리 통계 누적
+    stats_index.record(db, ids)
+    # 변경 피드 기록
+    change_feed.record(db, ids, changes.CREATED)
+
+
+def shared_data_version() -> int:
+    """
+    응답 캐시 / 타일 캐시의 공유 데이터 버전 (change_log 최신 seq).
+    다른 프로세스가 저장하거나 보정한 측정도 change_log에 남으므로 주기적으로 (RESPONSE_CACHE_SYNC_S) 확인해
+    캐시를 무효화합니다.
+    """
+    with database.SessionLocal() as db:
+        seq = change_feed.latest_seq(db)
+        cluster_index.sync(db, seq)
+    return seq
+
+
+def on_measurements_committed(db, ids):
+    """측정 커밋 이후 후속 처리"""
+    cluster_index.invalidate(db.info.pop("cluster_tiles", ()))
+    response_cache.bump()
+    change_feed.notify()
+    # 워커 모드는 즉시 응답, 즉시 실행 모드(AI_WORKERS=0)는 여기서 처리
+    ai_queue.notify(db, ids)
+
+
+# 그룹 커밋 (DB_GROUP_COMMIT=1): 동시 요청의 단건 INSERT를 수 ms 단위로 묶어 한 번에 커밋
+group_committer = GroupCommitter(
+    database.SessionLocal,
+    window_ms=float(os.environ.get("DB_GROUP_COMMIT_WINDOW_MS", "2")),
+    max_batch=int(os.environ.get("DB_GROUP_COMMIT_MAX_BATCH", "256")),
+    on_inserted=on_measurements_inserted,
+    on_committed=on_measurements_committed,
+) if os.environ.get("DB_GROUP_COMMIT") == "1" else None
+
+bulk_ingestor = ingest.BulkIngestor(
+    database.SessionLocal,
+    on_inserted=on_measurements_inserted,
+    on_committed=on_measurements_committed,
+    chunk_size=int(os.environ.get("BULK_CHUNK_SIZE", ingest.DEFAULT_CHUNK_SIZE)),
+)
+
+
+def collect_runtime_metrics():
+    """/metrics 수집 시점의 응답 캐시 / AI 작업 큐 상태"""
+    cache = response_cache.stats()
+    samples = [
+        ("treemap_response_cache_hits_total", "counter", "Response cache hits.", cache["hits"]),
+        ("treemap_response_cache_misses_total", "counter", "Response cache misses.", cache["misses"]),
+        ("treemap_response_cache_not_modified_total", "counter", "304 responses from ETag matches.",
+         cache["not_modified"]),
+        ("treemap_response_cache_bytes", "gauge", "Bytes held in the response cache.", cache["bytes"]),
+    ]
+    thumbs = thumbnail_cache.stats()
+    samples += [
+        ("treemap_thumbnail_memory_hits_total", "counter", "Thumbnail requests served from memory.",
+         thumbs["memory_hits"]),
+        ("treemap_thumbnail_disk_hits_total", "counter", "Thumbnail requests served from the disk cache.",
+         thumbs["disk_hits"]),
+        ("treemap_thumbnail_generated_total", "counter", "Thumbnails generated from the original photo.",
+         thumbs["generated"]),
+        ("treemap_thumbnail_disk_bytes", "gauge", "Bytes held in the thumbnail disk cache.", thumbs["disk_bytes"]),
+    ]
+    with database.SessionLocal() as db:
+        queue = ai_queue.stats(db)
+    for status in ("pending", "running", "done", "failed"):
+        samples.append((f"treemap_ai_queue_{status}", "gauge", f"AI jobs in {status} state.", queue[status]))
+    memory = model_registry.process_memory()
+    for name, documentation in (("rss_bytes", "Resident memory of this process."),
+                                ("rss_file_bytes", "Resident file-backed pages (shared, incl. mapped model weights).")):
+        if memory[name] is not None:
+            samples.append((f"treemap_process_{name}", "gauge", documentation, memory[name]))
+    registry = model_registry.get_registry()
+    active = next((m for m in registry.loaded() if m.version == registry.active_version), None)
+    if active is not None:
+        samples += [
+            ("treemap_ai_model_load_seconds", "gauge", "Load time of the active AI model.", active.load_ms / 1000),
+            ("treemap_ai_model_warmup_seconds", "gauge", "Warm-up inference time of the active AI model.",
+             active.warmup_ms / 1000),
+            ("treemap_ai_model_weight_bytes", "gauge", "Weight size of the active AI model.", active.weight_bytes),
+        ]
+    return samples
+
+
+metrics.REGISTRY.register_collector(collect_runtime_metrics)
 
 # [중요] 자동 시딩을 위한 샘플 데이터 정의 (Base64 이미지 포함)
 SAMPLE_IMAGE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg==" # 1x1 Red Dot
@@ -150,31 +317,98 @@ SAMPLE_TREES = [
     }
 ]
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # [DB 초기화 및 시딩 로직]
+def prepare_database():
+    """
+    시작 시 DB 준비. 콜드 스타트 비용을 줄이기 위해
+    - DB 파일이 비어 있으면 (Vercel /tmp) 미리 만든 스냅샷을 복사하고
+    - 스키마 스탬프가 현재 모델과 같으면 스키마 점검/보정을 생략하며
+    - 데이터가 하나도 없을 때만 샘플을 시딩합니다 (전체 COUNT 대신 존재 여부만 확인).
+    """
+    snapshot.restore_if_missing(database.SQLALCHEMY_DATABASE_URL, getattr(blob_store.get_blob_store(), "root", None))
+    metadata = models.Base.metadata
+    db = next(get_db())
     try:
-        models.Base.metadata.create_all(bind=engine)
-        db = next(get_db())
-        count = db.query(models.TreeMeasurement).count()
-        if count == 0:
+        if database.schema_is_current(engine, metadata):
+            logger.info("Schema stamp matches. Skipping schema checks.")
+        else:
+            metadata.create_all(bind=engine)
+            database.ensure_columns(engine, models.TreeMeasurement.__table__)
+            database.ensure_indexes(engine, models.TreeMeasurement.__table__)
+            database.ensure_columns(engine, models.AIJob.__table__)
+            database.ensure_columns(engine, models.ReprocessRun.__table__)
+            telemetry.ensure_schema(engine)
+            spatial.ensure_spatial_index(engine)
+            blob_store.migrate_legacy_images(db, models.TreeMeasurement)
+            database.stamp_schema(engine, metadata)
+
+        if db.query(models.TreeMeasurement.id).first() is None:
             logger.info("No data found. Auto-seeding 5 sample trees...")
             for tree_data in SAMPLE_TREES:
-                db_tree = models.TreeMeasurement(**tree_data)
+                tree_data = dict(tree_data)
+                image_fields = blob_store.store_image_data(tree_data.pop("image_data", None))
+                tree_data, telemetry_row = telemetry.split(tree_data)
+                db_tree = models.TreeMeasurement(**tree_data, **image_fields)
                 db.add(db_tree)
+                db.flush()
+                telemetry.insert_rows(db, [db_tree.id], [telemetry_row])
             db.commit()
             logger.info("Auto-seeding completed.")
-        else:
-            logger.info(f"Database already has {count} entries. Skipping seeding.")
+        cluster_index.ensure_built(db)
+        stats_index.ensure_built(db)
+        tree_linker.ensure_linked(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # [DB 초기화 및 시딩 로직]
+    try:
+        prepare_database()
     except Exception as e:
         logger.error(f"Lifespan setup error: {e}")
+
+    # 첫 배치가 모델 로드 비용을 치르지 않도록 시작 시 로드 + 워밍업 (프로세스 풀 워커는 fork 시 물려받음)
+    if os.environ.get("AI_MODEL_PRELOAD", "0" if os.environ.get("VERCEL") else "1") == "1":
+        try:
+            model_registry.get_registry().get()
+        except Exception as e:
+            logger.error(f"AI model preload error: {e}")
+
+    try:
+        ai_queue.start()
+    except Exception as e:
+        logger.error(f"AI job queue start error: {e}")
+    if group_committer:
+        group_committer.start()
     yield
+    if group_committer:
+        group_committer.stop()
+    ai_queue.stop()
+    reprocessor.stop()  # 진행 중인 재보정은 paused로 남아 다시 시작하면 이어서 실행
+    thumbnail_cache.stop()
 
 app = FastAPI(
     title="TreeMap Backend API",
     version="1.1.0",
     lifespan=lifespan
 )
+# 라우트별 검증 / 엔드포인트 / 직렬화 구간 계측
+app.router.route_class = metrics.TimedRoute
+
+# 요청 지연 시간 및 단계별 시간 수집 (캐시 미들웨어 안쪽: 라우트가 실행되는 요청만 기록)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# 조회 빈도가 높은 목록/타일 응답 캐시 (CORS보다 안쪽에 두어 304/캐시 응답에도 CORS 헤더 적용)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    # 변경 피드(/api/measurements/changes)는 since마다 응답이 달라 캐시하지 않음 (항상 DB에서 읽음)
+    paths=["/api/measurements"],
+    prefixes=["/api/tiles/"],
+    version_source=shared_data_version,
+    version_ttl=float(os.environ.get("RESPONSE_CACHE_SYNC_S", "1")),
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -182,70 +416,489 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Change-Seq", "ETag"],
 )
 
 @app.get("/", tags=["Health"])
 def read_root():
     return {"message": "Welcome to TreeMap API", "env": "vercel" if os.environ.get('VERCEL') else "local"}
 
-@app.post("/api/measurements", response_model=schemas.TreeMeasurement, tags=["Measurements"])
-def create_measurement(measurement: schemas.TreeMeasurementCreate, db: Session = Depends(get_db)):
-    try:
-        db_measurement = models.TreeMeasurement(
-            dbh=measurement.dbh,
-            height=measurement.height,
-            crown_width=measurement.crown_width,
-            ground_clearance=measurement.ground_clearance,
-            species=measurement.species,
-            health_score=measurement.health_score,
-            device_latitude=measurement.device_latitude,
-            device_longitude=measurement.device_longitude,
-            tree_latitude=measurement.tree_latitude,
-            tree_longitude=measurement.tree_longitude,
-            adjusted_tree_latitude=measurement.adjusted_tree_latitude,
-            adjusted_tree_longitude=measurement.adjusted_tree_longitude,
-            magnetometer_y=measurement.magnetometer_y,
-            magnetometer_z=measurement.magnetometer_z,
-            device_pitch=measurement.device_pitch,
-            device_roll=measurement.device_roll,
-            device_azimuth=measurement.device_azimuth,
-            ambient_light=measurement.ambient_light,
-            pressure=measurement.pressure,
-            altitude=measurement.altitude,
-            temperature=measurement.temperature,
-            image_width=measurement.image_width,
-            image_height=measurement.image_height,
-            focal_length=measurement.focal_length,
-            camera_distance=measurement.camera_distance,
-            device_model=measurement.device_model,
-            os_version=measurement.os_version,
-            app_version=measurement.app_version,
-            image_data=measurement.image_data
-        )
+def insert_measurement(db: Session, row: dict):
+    """측정 행 INSERT (센서 데이터는 measurement_telemetry) + 같은 트랜잭션의 후속 처리 + 커밋"""
+    with metrics.stage("insert_commit"):
+        row, telemetry_row = telemetry.split(row)
+        db_measurement = models.TreeMeasurement(**row)
         db.add(db_measurement)
+        db.flush()
+        telemetry.insert_rows(db, [db_measurement.id], [telemetry_row])
+
+        on_measurements_inserted(db, [db_measurement.id])
         db.commit()
-        db.refresh(db_measurement)
+    return db_measurement
 
-        # [추가] 서버 측 정밀 AI 분석 트리거
-        try:
-            TreeAIService.process_measurement(db_measurement)
-            db.commit() # AI 처리 결과 반영
+def save_measurement(db: Session, row: dict):
+    """측정 행 저장 (그룹 커밋 또는 요청별 커밋) 후 저장된 ORM 객체를 반환합니다."""
+    try:
+        if group_committer:
+            # 다른 요청과 함께 한 트랜잭션으로 커밋된 후 ID를 돌려받음
+            with metrics.stage("group_commit"):
+                measurement_id = group_committer.submit(row)
+            with metrics.stage("refresh"):
+                db_measurement = db.get(models.TreeMeasurement, measurement_id)
+            return db_measurement
+
+        db_measurement = insert_measurement(db, row)
+        with metrics.stage("post_commit"):
+            on_measurements_committed(db, [db_measurement.id])
+        with metrics.stage("refresh"):
             db.refresh(db_measurement)
-            logger.info(f"Server-side AI processing successful for Measurement ID: {db_measurement.id}")
-        except Exception as ai_err:
-            logger.error(f"Server AI Trigger Error: {ai_err}")
-            # AI 처리가 실패하더라도 기본 데이터는 저장된 상태 유지
 
         return db_measurement
+    except TimeoutError as e:
+        # 그룹 커밋 대기열에서 취소된 행 (저장되지 않음, 재시도 가능)
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Runtime Error: {e}")
         db.rollback()
         # 에러 내용을 구체적으로 반환하여 디버깅 지원
         raise HTTPException(status_code=500, detail=f"Database or Logic Error: {str(e)}")
 
+async def measurement_response(db: database.AsyncDb, saved, includes: List[str]):
+    """저장 응답. include=telemetry이면 목록 API와 같은 직렬화기로 센서 필드를 포함한 측정 JSON을 반환합니다."""
+    if "telemetry" not in includes:
+        return saved
+    serializer = serializers.for_fields(None, includes)
+
+    def fetch(session):
+        return serializer.query(session).filter(models.TreeMeasurement.id == saved.id).all()
+
+    rows = await db.run(fetch)
+    return Response(content=serializers.dumps(serializer.to_dicts(rows)[0]), media_type="application/json")
+
+@app.post("/api/measurements", response_model=schemas.TreeMeasurement, tags=["Measurements"])
+async def create_measurement(
+    measurement: schemas.TreeMeasurementCreate,
+    include: Optional[str] = Query(None, description="telemetry: 응답에 센서 원시 데이터 필드 포함 (목록 API와 같음)"),
+    db: database.AsyncDb = Depends(get_async_db)
+):
+    # 사진은 Blob 저장소에 한 번만 저장하고 행에는 참조만 기록 (디코딩 / 파일 쓰기는 스레드 풀에서)
+    try:
+        includes = queries.parse_include(include)
+        with metrics.stage("image_store"):
+            row = await run_in_threadpool(ingest.build_row, measurement)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await measurement_response(db, await db.run(save_measurement, row), includes)
+
+@app.post("/api/measurements/upload", response_model=schemas.TreeMeasurement, tags=["Measurements"])
+async def upload_measurement(
+    request: Request,
+    include: Optional[str] = Query(None, description="telemetry: 응답에 센서 원시 데이터 필드 포함 (목록 API와 같음)"),
+    db: database.AsyncDb = Depends(get_async_db)
+):
+    """
+    multipart/form-data 측정 업로드: 'metadata' 파트(JSON, POST /api/measurements 본문과 같은 형식)와
+    'image' 파트(사진 바이너리). 사진은 Base64 변환 없이 청크 단위로 저장소에 기록되며
+    크기 제한(UPLOAD_MAX_IMAGE_MB)을 넘으면 413을 반환합니다.
+    """
+    try:
+        includes = queries.parse_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        multipart = upload.MultipartUpload(request.headers.get("content-type"))
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > multipart.max_body_bytes:
+            raise upload.UploadError(f"Request body exceeds {multipart.max_body_bytes} bytes", status_code=413)
+        with metrics.stage("upload_stream"):
+            await multipart.read(request.stream())
+    except upload.UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    try:
+        measurement = schemas.TreeMeasurementCreate.model_validate_json(multipart.metadata)
+        if measurement.image_data and multipart.image is not None:
+            raise ValueError("Send the photo either as the 'image' part or as imageData, not both")
+        with metrics.stage("image_store"):
+            row = await run_in_threadpool(ingest.build_row, measurement)
+            row.update(await run_in_threadpool(multipart.commit))
+    except ValidationError as e:
+        multipart.abort()
+        raise RequestValidationError(e.errors(include_url=False), body=multipart.metadata)
+    except ValueError as e:
+        multipart.abort()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await measurement_response(db, await db.run(save_measurement, row), includes)
+
+@app.post("/api/measurements/bulk", response_model=schemas.BulkIngestResult, tags=["Measurements"])
+async def bulk_create_measurements(request: Request):
+    """
+    오프라인 현장 조사 데이터 일괄 업로드.
+    JSON 배열 또는 NDJSON(Content-Type: application/x-ndjson) 본문을 스트리밍으로 읽어
+    레코드별로 검증하고, BULK_CHUNK_SIZE 단위 트랜잭션으로 일괄 저장합니다.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    ndjson = content_type in ingest.NDJSON_CONTENT_TYPES
+
+    results, pending = [], []
+    count = 0
+    stream_error = None
+    try:
+        async for record in ingest.iter_json_records(request.stream(), ndjson):
+            index, measurement, error = bulk_ingestor.validate(count, record)
+            count += 1
+            if error:
+                results.append({"index": index, "id": None, "error": error})
+                continue
+            pending.append((index, measurement))
+            if len(pending) >= bulk_ingestor.chunk_size:
+                results.extend(await run_in_threadpool(bulk_ingestor.ingest_chunk, pending))
+                pending = []
+    except ValueError as e:
+        stream_error = str(e)
+    if pending:
+        results.extend(await run_in_threadpool(bulk_ingestor.ingest_chunk, pending))
+
+    if stream_error and count == 0:
+        raise HTTPException(status_code=400, detail=stream_error)
+
+    results.sort(key=lambda r: r["index"])
+    inserted = sum(1 for r in results if r["id"] is not None)
+    return {"inserted": inserted, "failed": len(results) - inserted, "results": results, "error": stream_error}
+
 @app.get("/api/measurements", response_model=List[schemas.TreeMeasurement], tags=["Measurements"])
-def read_measurements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_measurements(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=queries.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (키셋 페이지네이션)"),
+    fields: Optional[str] = Query(None, description="응답 필드 목록 (예: id,species,treeLatitude,treeLongitude,dbh)"),
+    include: Optional[str] = Query(None, description="telemetry: 센서 원시 데이터 필드(accelerometerX 등 23개)를 응답에 포함"),
+    bbox: Optional[str] = Query(None, description="minLat,minLon,maxLat,maxLon"),
+    lat: Optional[float] = Query(None, description="반경 검색 중심 위도"),
+    lon: Optional[float] = Query(None, description="반경 검색 중심 경도"),
+    radius: Optional[float] = Query(None, description="반경 검색 거리 (m)"),
+    db: database.AsyncDb = Depends(get_async_db)
+):
+    # 공간 필터 / 페이지 / 필드 파라미터 검증
+    try:
+        bbox_filter, near_filter = spatial.parse_spatial_params(bbox, lat, lon, radius)
+        if cursor:
+            queries.decode_cursor(cursor)
+        field_names = queries.parse_fields(fields) if fields else None
+        includes = queries.parse_include(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def fetch(db):
+        # 목록 조회 전 변경 피드 위치 (이후 변경은 /api/measurements/changes?since=X-Change-Seq로 이어받음)
+        change_seq = change_feed.latest_seq(db)
+        # 응답에 필요한 컬럼만 SELECT 하고 행 튜플을 바로 JSON으로 직렬화 (ORM 객체/행별 Pydantic 모델 생성 생략)
+        serializer = serializers.for_fields(field_names, includes)
+        query = serializer.query(db)
+        query = spatial.apply_spatial_filter(query, db.get_bind(), bbox=bbox_filter, near=near_filter)
+        query = queries.keyset_order(query)
+        # cursor가 있으면 (measured_at, id) 인덱스 범위 탐색, 없으면 기존 offset 방식
+        query = queries.apply_cursor(query, cursor) if cursor else query.offset(skip)
+        rows = query.limit(limit).all()
+
+        return serializer, rows, change_seq
+
     try:
-        return db.query(models.TreeMeasurement).offset(skip).limit(limit).all()
+        serializer, rows, change_seq = await db.run(fetch)
+        # 직렬화는 DB 세션을 잡지 않도록 db.run 밖의 스레드 풀에서 수행
+        with metrics.stage("row_serialize"):
+            content = await run_in_threadpool(serializer.serialize, rows)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"X-Change-Seq": str(change_seq)}
+    if limit > 0 and len(rows) == limit:
+        headers["X-Next-Cursor"] = queries.encode_cursor(rows[-1].measured_at, rows[-1].id)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+@app.get("/api/measurements/export", tags=["Measurements"])
+def export_measurements(
+    format: str = Query("csv", description="csv, ndjson, parquet, arrow (parquet/arrow는 pyarrow 필요)"),
+    columns: Optional[str] = Query(None, description="내보낼 컬럼 (기본: 사진 제외 전체)"),
+    include_images: bool = Query(False, alias="includeImages", description="사진을 data URL로 포함"),
+    bbox: Optional[str] = Query(None, description="minLat,minLon,maxLat,maxLon"),
+    lat: Optional[float] = Query(None, description="반경 검색 중심 위도"),
+    lon: Optional[float] = Query(None, description="반경 검색 중심 경도"),
+    radius: Optional[float] = Query(None, description="반경 검색 거리 (m)"),
+):
+    """
+    전체 수목 인벤토리 스트리밍 내보내기 (GIS 연계용).
+    서버 측 커서로 읽은 행을 바로 출력 형식으로 변환하여 전송하므로 메모리 사용량이 일정합니다.
+    """
+    try:
+        bbox_filter, near_filter = spatial.parse_spatial_params(bbox, lat, lon, radius)
+        export_columns = exporter.resolve_columns(columns)
+        if format not in exporter.available_formats():
+            raise ValueError(f"Unsupported format: {format} (available: {', '.join(exporter.available_formats())})")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type, extension = exporter.FORMATS[format]
+    return StreamingResponse(
+        exporter.stream_export(
+            database.SessionLocal, format, export_columns,
+            bbox=bbox_filter, near=near_filter, include_images=include_images,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="measurements.{extension}"'},
+    )
+
+@app.get("/api/measurements/changes", tags=["Measurements"])
+async def read_measurement_changes(
+    since: int = Query(0, description="마지막으로 받은 next 값 (0이면 처음부터)"),
+    limit: int = Query(500, ge=1, le=changes.MAX_LIMIT),
+    fields: Optional[str] = Query(None, description="measurements 필드 목록 (목록 API와 같음)"),
+    include: Optional[str] = Query(None, description="목록 API와 같음 (telemetry)"),
+    db: database.AsyncDb = Depends(get_async_db)
+):
+    """
+    since 이후의 측정 변경분 (새 측정, 서버 AI 보정 결과). 같은 측정의 여러 변경은 하나로 합치고
+    변경된 측정의 현재 값을 함께 반환합니다. 응답의 next를 다음 요청의 since로 사용합니다.
+    """
+    try:
+        since = changes.parse_since(since)
+        serializer = serializers.for_fields(queries.parse_fields(fields) if fields else None,
+                                            queries.parse_include(include))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page = await db.run(change_feed.read, since, limit, serializer)
+    return Response(content=change_feed.to_json(page, serializer), media_type="application/json")
+
+@app.get("/api/measurements/changes/stream", tags=["Measurements"])
+async def stream_measurement_changes(
+    request: Request,
+    since: Optional[int] = Query(None, description="이 seq 이후부터 전송 (없으면 Last-Event-ID, 둘 다 없으면 접속 이후 변경만)"),
+    fields: Optional[str] = Query(None, description="measurements 필드 목록 (목록 API와 같음)"),
+    include: Optional[str] = Query(None, description="목록 API와 같음 (telemetry)"),
+):
+    """변경 피드 Server-Sent Events 스트림 ('changes' 이벤트, 데이터 형식은 /api/measurements/changes와 같음)"""
+    try:
+        serializer = serializers.for_fields(queries.parse_fields(fields) if fields else None,
+                                            queries.parse_include(include))
+        since = changes.parse_since(since, request.headers.get("last-event-id"), default=-1)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if since < 0:
+        def latest_seq():
+            with database.SessionLocal() as db:
+                return change_feed.latest_seq(db)
+        since = await run_in_threadpool(latest_seq)
+
+    return StreamingResponse(
+        change_feed.stream(database.SessionLocal, since, serializer, run_in_threadpool,
+                           is_disconnected=request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/tiles/{z}/{x}/{y}", response_model=schemas.TileClusters, tags=["Map"])
+async def read_tile_clusters(z: int, x: int, y: int, db: database.AsyncDb = Depends(get_async_db)):
+    """
+    Web Mercator 타일(z/x/y) 내 수목 클러스터 (8x8 격자 셀별 개수, 중심점, 평균 DBH/건강도, 수종 구성).
+    사전 집계 테이블과 타일 캐시를 사용하므로 전체 수목 수와 무관하게 일정한 비용으로 응답합니다.
+    clusters.MAX_CLUSTER_ZOOM보다 확대된 타일은 개별 수목을 반환합니다.
+    """
+    if not 0 <= z <= 22 or not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise HTTPException(status_code=400, detail="Invalid tile coordinates")
+    return await db.run(cluster_index.tile, z, x, y)
+
+@app.get("/api/stats", response_model=schemas.InventoryStats, tags=["Stats"])
+async def read_inventory_stats(
+    bbox: Optional[str] = Query(None, description="minLat,minLon,maxLat,maxLon"),
+    lat: Optional[float] = Query(None, description="반경 검색 중심 위도"),
+    lon: Optional[float] = Query(None, description="반경 검색 중심 경도"),
+    radius: Optional[float] = Query(None, description="반경 검색 거리 (m, 반경을 감싸는 bbox로 집계)"),
+    species: Optional[str] = Query(None, description="수종 목록 (쉼표 구분, 정확히 일치)"),
+    group_by: Optional[str] = Query(None, alias="groupBy", description="cell: 구역(통계 격자 셀)별 요약 포함"),
+    db: database.AsyncDb = Depends(get_async_db)
+):
+    """
+    인벤토리 대시보드 통계: 수종별 개체 수, DBH / 수고 / 수관폭 / 건강도 분포, 서버 AI 보정량.
+    측정 삽입 및 AI 보정 시 증분 갱신되는 사전 집계를 읽으므로 전체 측정 수와 무관하게 응답합니다.
+    """
+    try:
+        bbox_filter, near_filter = spatial.parse_spatial_params(bbox, lat, lon, radius)
+        if near_filter is not None:
+            bbox_filter = spatial.radius_bbox(*near_filter)
+        if group_by not in (None, "cell"):
+            raise ValueError(f"Unsupported groupBy: {group_by} (available: cell)")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    species_filter = [s.strip() for s in species.split(",") if s.strip()] if species else None
+
+    result = await db.run(stats_index.query, bbox=bbox_filter, species=species_filter, by_cell=group_by == "cell")
+    # 지표 이름은 다른 응답 필드와 같은 camelCase로
+    for key in ("metrics", "corrections"):
+        result[key] = {schemas.METRIC_NAMES[name]: value for name, value in result[key].items()}
+    return result
+
+@app.get("/api/trees/{tree_id}/history", response_model=schemas.TreeHistory, tags=["Trees"])
+async def read_tree_history(tree_id: int, db: database.AsyncDb = Depends(get_async_db)):
+    """
+    수목 개체의 생육 이력 (측정 시각 순, 서버 보정값 우선)과 DBH / 수고 / 수관폭 연간 성장률.
+    측정 응답의 treeId로 조회합니다.
+    """
+    history = await db.run(tree_linker.history, tree_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Tree not found")
+    return history
+
+@app.get("/api/measurements/{measurement_id}/status", response_model=schemas.MeasurementProcessingStatus, tags=["Measurements"])
+async def read_measurement_status(measurement_id: int, db: database.AsyncDb = Depends(get_async_db)):
+    def fetch(db):
+        db_measurement = db.get(models.TreeMeasurement, measurement_id)
+        if db_measurement is None:
+            return None
+        job = ai_queue.latest_job(db, measurement_id)
+        return schemas.MeasurementProcessingStatus(
+            measurement_id=measurement_id,
+            is_server_processed=db_measurement.is_server_processed or 0,
+            job_status=job.status if job else None,
+            attempts=job.attempts if job else 0,
+            error=job.error if job else None,
+            server_confidence=db_measurement.server_confidence,
+            server_processed_at=db_measurement.server_processed_at,
+        )
+
+    status = await db.run(fetch)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Measurement not found")
+    return status
+
+@app.get("/api/measurements/{measurement_id}/telemetry", response_model=schemas.MeasurementTelemetry, tags=["Measurements"])
+async def read_measurement_telemetry(measurement_id: int, db: database.AsyncDb = Depends(get_async_db)):
+    """
+    측정 하나의 원시 센서 데이터 (IMU / 환경 / 카메라 / 기기 정보, 촬영 구간 IMU 샘플 시퀀스).
+    목록 응답에는 포함되지 않으며 상세 화면에서 필요할 때만 조회합니다.
+    """
+    values = await db.run(telemetry.read, measurement_id)
+    if values is None:
+        raise HTTPException(status_code=404, detail="Measurement not found")
+    return values
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus 수집 엔드포인트 (요청/단계/SQL 지연 시간, AI 작업 결과, 캐시 및 큐 상태)"""
+    return Response(content=metrics.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/api/jobs", response_model=schemas.AIQueueStats, tags=["Jobs"])
+def read_job_stats(db: Session = Depends(get_db)):
+    return ai_queue.stats(db)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """ADMIN_TOKEN이 설정되어 있으면 X-Admin-Token 헤더가 일치해야 관리 API를 사용할 수 있습니다."""
+    expected = os.environ.get("ADMIN_TOKEN")
+    if expected and not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/api/admin/reprocess", response_model=schemas.ReprocessStatus, status_code=202, tags=["Jobs"],
+          dependencies=[Depends(require_admin)])
+def start_reprocess(
+    only_stale: bool = Query(True, alias="onlyStale", description="현재 모델 버전으로 보정된 측정은 건너뜀"),
+    db: Session = Depends(get_db)
+):
+    """
+    전체 재보정 시작 (현재 서버 AI 모델 버전으로 기존 측정의 server_* 값을 다시 계산).
+    같은 모델 버전의 중단된 작업이 있으면 체크포인트부터 이어서 실행합니다.
+    """
+    try:
+        run_id = reprocessor.start(only_stale=only_stale)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return reprocessor.status(db, run_id)
+
+@app.get("/api/admin/reprocess", response_model=schemas.ReprocessStatus, tags=["Jobs"],
+         dependencies=[Depends(require_admin)])
+def read_reprocess_status(db: Session = Depends(get_db)):
+    """최근 재보정 작업의 진행률, 처리량(rows/s), 예상 남은 시간"""
+    status = reprocessor.status(db)
+    if status is None:
+        raise HTTPException(status_code=404, detail="No reprocess run")
+    return status
+
+@app.post("/api/admin/reprocess/pause", response_model=schemas.ReprocessStatus, tags=["Jobs"],
+          dependencies=[Depends(require_admin)])
+def pause_reprocess(db: Session = Depends(get_db)):
+    """진행 중인 재보정을 현재 청크 기록 후 멈춥니다 (POST /api/admin/reprocess로 재개)."""
+    if not reprocessor.pause():
+        raise HTTPException(status_code=409, detail="No reprocess run in progress")
+    db.expire_all()
+    return reprocessor.status(db)
+
+@app.get("/api/admin/models", response_model=schemas.AIModelRegistryStatus, tags=["Jobs"],
+         dependencies=[Depends(require_admin)])
+def read_ai_models():
+    """활성 AI 모델 버전, 이 프로세스에 로드된 모델의 로드/워밍업 시간과 상주 메모리"""
+    return model_registry.get_registry().status()
+
+@app.post("/api/admin/models/{version}/activate", response_model=schemas.AIModelRegistryStatus, tags=["Jobs"],
+          dependencies=[Depends(require_admin)])
+def activate_ai_model(version: str):
+    """
+    AI 모델 버전 교체: 새 버전을 로드하고 워밍업한 뒤 활성 버전을 바꿉니다 (진행 중인 배치는 이전 버전으로 완료).
+    이후 보정 결과에는 새 버전이 기록되며, 기존 측정은 POST /api/admin/reprocess로 다시 보정합니다.
+    """
+    registry = model_registry.get_registry()
+    try:
+        registry.activate(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return registry.status()
+
+@app.get("/api/measurements/{measurement_id}/image", tags=["Measurements"])
+async def read_measurement_image(
+    measurement_id: int,
+    request: Request,
+    size: Optional[str] = Query(None, description="파생 이미지 크기 (thumb | medium, 생략 시 원본)"),
+    db: database.AsyncDb = Depends(get_async_db),
+):
+    if size is not None and size != "original" and size not in thumbnails.SIZES:
+        raise HTTPException(status_code=400, detail=f"Unknown image size: {size} (available: {', '.join(thumbnails.SIZES)})")
+    row = await db.run(
+        lambda db: db.query(models.TreeMeasurement.image_hash, models.TreeMeasurement.image_mime)
+        .filter(models.TreeMeasurement.id == measurement_id)
+        .first()
+    )
+    if row is None or row.image_hash is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # 파생 이미지: 메모리 적중은 바로 응답, 디스크 읽기 / 생성은 워커 풀에서 처리
+    if size in thumbnails.SIZES and thumbnail_cache.available:
+        etag = thumbnail_cache.etag(row.image_hash, size)
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        try:
+            with metrics.stage("thumbnail"):
+                data = await thumbnail_cache.get(row.image_hash, size)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Image blob missing")
+        except ValueError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        return Response(data, media_type=thumbnail_cache.media_type, headers=headers)
+
+    # 콘텐츠 해시가 곧 ETag (내용이 바뀌면 해시도 바뀌므로 영구 캐시 가능)
+    etag = f'"{row.image_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable",
+               "X-Content-Type-Options": "nosniff"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    store = blob_store.get_blob_store()
+    if not store.exists(row.image_hash):
+        raise HTTPException(status_code=404, detail="Image blob missing")
+    # 허용 형식 이전에 저장된 MIME(예: text/html)은 그대로 내보내지 않음
+    media_type = row.image_mime if row.image_mime in blob_store.IMAGE_MIME_TYPES else "application/octet-stream"
+    path = store.local_path(row.image_hash)
+    if path:
+        return FileResponse(path, media_type=media_type, headers=headers)
+    return StreamingResponse(store.iter_chunks(row.image_hash), media_type=media_type, headers=headers)
@@ -0,0 +1,326 @@
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# 요청 처리 단계 / SQL 지연 시간 구간 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 느린 요청 로그 기준 (ms, 0이면 비활성)
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", "0"))
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_text(labelnames: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, "") for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label 값 -> [구간별 개수..., 합계, 총 개수]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(labels.get(name, "") for name in self.labelnames))
+        return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+                labels = _label_text(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_number(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """메트릭 모음. 수집 시점에 값을 계산하는 collector(게이지)도 등록할 수 있습니다."""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, float]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, float]]]):
+        """collector()는 (이름, 타입, 설명, 값) 목록을 반환합니다."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, documentation, value in samples:
+                lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"])
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "treemap_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_DURATION = REGISTRY.histogram(
+    "treemap_http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+STAGE_DURATION = REGISTRY.histogram(
+    "treemap_stage_duration_seconds", "Time spent in each request/processing stage.", ("stage",))
+SQL_DURATION = REGISTRY.histogram(
+    "treemap_sql_query_duration_seconds", "SQL statement execution time.", ("operation",))
+AI_JOBS = REGISTRY.counter(
+    "treemap_ai_jobs_total", "Server AI job attempts by result.", ("result",))
+AI_BATCH_SIZE = REGISTRY.histogram(
+    "treemap_ai_batch_size", "Measurements per server AI batch.", (), (1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+
+# ---- 요청 단위 단계별 시간 (stage breakdown) ----
+
+# 요청마다 {단계: 누적 초}. 동기 엔드포인트는 스레드풀에서 같은 dict를 공유하므로 그대로 누적됩니다.
+_breakdown: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("treemap_stage_breakdown", default=None)
+
+
+def _record(stage_name: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage=stage_name)
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown[stage_name] = breakdown.get(stage_name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """with metrics.stage("insert_commit"): ... - 구간 시간을 히스토그램과 현재 요청 내역에 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - started)
+
+
+def _mark(name: str):
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown.setdefault("_marks", {})[name] = time.perf_counter()
+
+
+def format_breakdown(breakdown: dict) -> str:
+    parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in breakdown.items()
+             if not name.startswith("_") and name != "sql"]
+    if "sql" in breakdown:
+        parts.append(f"sql={breakdown['sql'] * 1000:.1f}ms/{breakdown.get('_sql_queries', 0)}q")
+    return " ".join(parts)
+
+
+# ---- SQL 실행 시간 (SQLAlchemy 이벤트) ----
+
+def instrument_engine(engine):
+    """엔진의 모든 SQL 실행 시간을 operation(SELECT/INSERT/...)별로 기록합니다."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("treemap_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("treemap_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        SQL_DURATION.observe(elapsed, operation=operation)
+        breakdown = _breakdown.get()
+        if breakdown is not None:
+            breakdown["sql"] = breakdown.get("sql", 0.0) + elapsed
+            breakdown["_sql_queries"] = breakdown.get("_sql_queries", 0) + 1
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("treemap_query_start"):
+            connection.info["treemap_query_start"].pop()
+
+
+# ---- 라우트: 검증 / 엔드포인트 / 직렬화 구간 ----
+
+def _timed_endpoint(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            _mark("endpoint_start")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark("endpoint_end")
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            _mark("endpoint_start")
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark("endpoint_end")
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    요청 처리를 세 구간으로 나눠 기록하는 라우트 클래스 (app.router.route_class로 지정).
+    - validate: 본문 파싱, Pydantic 검증, 의존성(DB 세션) 준비
+    - endpoint: 엔드포인트 함수 실행
+    - serialize: 응답 모델 변환 및 JSON 직렬화
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                finished = time.perf_counter()
+                breakdown = _breakdown.get()
+                marks = breakdown.get("_marks", {}) if breakdown is not None else {}
+                if "endpoint_start" in marks and "endpoint_end" in marks:
+                    _record("validate", marks["endpoint_start"] - started)
+                    _record("endpoint", marks["endpoint_end"] - marks["endpoint_start"])
+                    _record("serialize", finished - marks["endpoint_end"])
+
+        return timed_handler
+
+
+class MetricsMiddleware:
+    """
+    요청별 지연 시간 / 상태 코드를 기록하고, 단계별 시간 내역을 수집하는 ASGI 미들웨어.
+    SLOW_REQUEST_MS 이상 걸린 요청은 단계별 내역과 함께 경고 로그로 남깁니다.
+    """
+
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        breakdown: dict = {}
+        token = _breakdown.set(breakdown)
+        status = {"code": 500}
+        started = time.perf_counter()
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                # 스트리밍 응답(SSE)은 연결 유지 시간이 아니라 응답 시작까지의 시간만 기록
+                if any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message["headers"]):
+                    status["started"] = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            elapsed = status.get("started", time.perf_counter()) - started
+            _breakdown.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "<unmatched>"
+            HTTP_DURATION.observe(elapsed, method=scope["method"], route=route_path)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route_path, status=str(status["code"]))
+            if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning(
+                    f"Slow request: {scope['method']} {scope['path']} {status['code']} "
+                    f"{elapsed * 1000:.1f}ms [{format_breakdown(breakdown)}]"
+                )
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index, LargeBinary
 from database import Base
 import datetime
 
@@ -23,7 +23,49 @@ class TreeMeasurement(Base):
     adjusted_tree_longitude = Column(Float, nullable=True) # 사용자 보정 경도
     
     measured_at = Column(DateTime, default=datetime.datetime.utcnow)
-    
+
+    # 원시 센서 데이터(IMU, 환경, 카메라, 기기 정보)는 measurement_telemetry에 분리 저장
+
+    # 사진 데이터 (Base64 형식, 레거시 - 신규 데이터는 Blob 저장소 사용)
+    image_data = Column(String, nullable=True)
+
+    # 사진 Blob 참조 (콘텐츠 해시 기반 저장소)
+    image_hash = Column(String(64), nullable=True, index=True)  # SHA-256
+    image_size = Column(Integer, nullable=True)  # bytes
+    image_mime = Column(String, nullable=True)
+
+    # 서버 AI 처리 결과 (새로 추가)
+    is_server_processed = Column(Integer, default=0) # 0: 미처리, 1: 처리완료
+    server_processed_at = Column(DateTime, nullable=True)
+    server_species = Column(String, nullable=True)
+    server_dbh = Column(Float, nullable=True)
+    server_height = Column(Float, nullable=True)
+    server_crown_width = Column(Float, nullable=True)
+    server_ground_clearance = Column(Float, nullable=True)
+    server_health_score = Column(Float, nullable=True)
+    server_confidence = Column(Float, nullable=True) # AI 확신도 (0~1)
+    server_model_version = Column(String, nullable=True)  # 보정에 사용한 서버 AI 모델 버전
+
+    # 개체 식별 (같은 나무의 반복 측정을 묶음, trees.id)
+    tree_id = Column(Integer, nullable=True, index=True)
+
+    __table_args__ = (
+        # 키셋 페이지네이션 (measured_at, id) 정렬/범위 탐색용
+        Index("ix_measurements_measured_at_id", "measured_at", "id"),
+    )
+
+
+class MeasurementTelemetry(Base):
+    """
+    측정 원시 센서 데이터 (measurements와 1:1, measurement_id = measurements.id).
+    지도 / 목록 조회가 읽지 않는 컬럼을 측정 행에서 분리해 measurements 행을 작게 유지합니다.
+    *_samples는 촬영 구간의 센서 샘플 시퀀스로, float32 (x, y, z) 배열을 BLOB 하나에 담습니다 (telemetry.pack_vectors).
+    조회는 GET /api/measurements/{id}/telemetry, 분리 이전 컬럼 구성은 measurements_full 뷰로 제공합니다.
+    """
+    __tablename__ = "measurement_telemetry"
+
+    measurement_id = Column(Integer, primary_key=True)
+
     # IMU 데이터 (관성 측정 장치)
     accelerometer_x = Column(Float, nullable=True)
     accelerometer_y = Column(Float, nullable=True)
@@ -54,17 +96,152 @@ class TreeMeasurement(Base):
     device_model = Column(String, nullable=True)  # 기기 모델명
     os_version = Column(String, nullable=True)  # OS 버전
     app_version = Column(String, nullable=True)  # 앱 버전
-    
-    # 사진 데이터 (Base64 형식)
-    image_data = Column(String, nullable=True)
 
-    # 서버 AI 처리 결과 (새로 추가)
-    is_server_processed = Column(Integer, default=0) # 0: 미처리, 1: 처리완료
-    server_processed_at = Column(DateTime, nullable=True)
-    server_species = Column(String, nullable=True)
-    server_dbh = Column(Float, nullable=True)
-    server_height = Column(Float, nullable=True)
-    server_crown_width = Column(Float, nullable=True)
-    server_ground_clearance = Column(Float, nullable=True)
-    server_health_score = Column(Float, nullable=True)
-    server_confidence = Column(Float, nullable=True) # AI 확신도 (0~1)
+    # 센서 샘플 시퀀스 (리틀 엔디언 float32 x, y, z 반복)
+    sample_interval_ms = Column(Float, nullable=True)  # 샘플 간격 (ms)
+    accelerometer_samples = Column(LargeBinary, nullable=True)
+    gyroscope_samples = Column(LargeBinary, nullable=True)
+    magnetometer_samples = Column(LargeBinary, nullable=True)
+
+
+class AIJob(Base):
+    """서버 AI 분석 작업 큐 (재시작 시에도 대기 작업이 유지되는 영속 큐)"""
+    __tablename__ = "ai_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    measurement_id = Column(Integer, index=True, nullable=False)
+    status = Column(String, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    not_before = Column(DateTime, nullable=True)  # 재시도 대기 (이 시각 이전에는 가져가지 않음)
+
+
+class ClusterCell(Base):
+    """
+    지도 클러스터 사전 집계 (줌 레벨별 격자 셀)
+    셀은 타일 줌 z에서 8x8로 분할한 격자 (= 줌 z+3 타일) 입니다.
+    """
+    __tablename__ = "cluster_cells"
+
+    zoom = Column(Integer, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0)
+    sum_lat = Column(Float, default=0.0)
+    sum_lon = Column(Float, default=0.0)
+    sum_dbh = Column(Float, default=0.0)
+    dbh_count = Column(Integer, default=0)
+    sum_health = Column(Float, default=0.0)
+    health_count = Column(Integer, default=0)
+
+
+class ClusterSpecies(Base):
+    """클러스터 셀별 수종 구성"""
+    __tablename__ = "cluster_species"
+
+    zoom = Column(Integer, primary_key=True)
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    species = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+
+
+class StatsGroup(Base):
+    """
+    인벤토리 통계 사전 집계: 격자 셀(구역) x 수종별 개체 수.
+    셀은 stats.STATS_ZOOM 타일이며, 수종이 없으면 species = ''.
+    """
+    __tablename__ = "stats_groups"
+
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    species = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+    processed = Column(Integer, default=0)  # 서버 AI 보정 완료 수
+    species_mismatch = Column(Integer, default=0)  # 서버 재식별 수종이 원본과 다른 수
+
+
+class StatsMetric(Base):
+    """셀 x 수종 x 지표별 누적 합 (개수, 합, 제곱합, 절댓값 합) - 평균/표준편차/평균 절대 보정량 계산용"""
+    __tablename__ = "stats_metrics"
+
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    species = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)  # dbh, height, ... / 보정량은 delta_dbh 등
+    n = Column(Integer, default=0)
+    total = Column(Float, default=0.0)
+    total_sq = Column(Float, default=0.0)
+    total_abs = Column(Float, default=0.0)
+
+
+class StatsHistogram(Base):
+    """셀 x 수종 x 지표별 고정 구간 히스토그램"""
+    __tablename__ = "stats_histograms"
+
+    cell_x = Column(Integer, primary_key=True)
+    cell_y = Column(Integer, primary_key=True)
+    species = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0)
+
+
+class Tree(Base):
+    """
+    수목 개체. 같은 나무를 다시 측정한 기록(measurements.tree_id)을 묶어 생육 이력을 조회합니다.
+    위치는 연결된 측정 좌표의 평균이며, 새 측정은 저장 시 근접 개체와 자동 연결됩니다 (trees.TreeLinker).
+    """
+    __tablename__ = "trees"
+
+    id = Column(Integer, primary_key=True, index=True)
+    species = Column(String, nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    measurement_count = Column(Integer, default=0)
+    first_measured_at = Column(DateTime, nullable=True)
+    last_measured_at = Column(DateTime, nullable=True)
+    latest_measurement_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        # R*Tree가 없는 DB(PostgreSQL 등)의 근접 개체 검색용
+        Index("ix_trees_latitude_longitude", "latitude", "longitude"),
+    )
+
+
+class ChangeLog(Base):
+    """
+    측정 변경 피드 (GET /api/measurements/changes). seq는 단조 증가하며 삭제 후에도 재사용하지 않습니다.
+    """
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    measurement_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # created, processed
+    changed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+
+class ReprocessRun(Base):
+    """
+    전체 재보정 작업 (모델 업그레이드 시 기존 측정의 server_* 값을 다시 계산).
+    last_id는 결과와 같은 트랜잭션으로 기록되는 체크포인트로, 중단 후 이어서 실행할 때 사용합니다.
+    """
+    __tablename__ = "reprocess_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    model_version = Column(String, nullable=False)
+    status = Column(String, default="running")  # running, paused, done, failed
+    only_stale = Column(Integer, default=1)  # 1: 이미 같은 버전으로 보정된 측정은 건너뜀
+    last_id = Column(Integer, default=0)
+    total = Column(Integer, default=0)  # 시작 시점의 대상 측정 수
+    processed = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    started_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String, nullable=True)  # 실행 중인 프로세스의 claim 토큰 (기록 시 확인)
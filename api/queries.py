@@ -0,0 +1,115 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+
+try:
+    import models, schemas
+except ImportError:
+    from . import models, schemas
+
+# 목록 조회 한 페이지 최대 행 수 (전체 순회는 cursor 사용)
+MAX_PAGE_SIZE = 5000
+
+# 응답 필드명(alias 또는 snake_case) -> 컬럼 속성명
+# 예: 'treeLatitude', 'tree_latitude' -> 'tree_latitude'
+RESPONSE_FIELDS = {}
+for _name, _field in schemas.TreeMeasurement.model_fields.items():
+    RESPONSE_FIELDS[_name] = _name
+    if _field.alias:
+        RESPONSE_FIELDS[_field.alias] = _name
+RESPONSE_FIELDS["imageUrl"] = RESPONSE_FIELDS["image_url"] = "image_url"
+
+# 응답 키 (FastAPI 기본 by_alias 직렬화와 동일한 이름)
+RESPONSE_KEYS = {
+    name: (field.alias or name) for name, field in schemas.TreeMeasurement.model_fields.items()
+}
+RESPONSE_KEYS["image_url"] = "imageUrl"
+
+# include=telemetry일 때 덧붙이는 센서 원시 데이터 필드 -> 응답 키 (분리 이전 응답과 같은 이름)
+TELEMETRY_KEYS = {
+    name: (field.alias or name) for name, field in schemas.MeasurementTelemetryBase.model_fields.items()
+}
+
+# include 파라미터로 선택하는 추가 응답 블록
+INCLUDES = ("telemetry",)
+
+# 계산 필드가 필요로 하는 컬럼
+_DERIVED_SOURCES = {"image_url": ("id", "image_hash")}
+
+
+def encode_cursor(measured_at: Optional[datetime.datetime], row_id: int) -> str:
+    """(measured_at, id) 키셋 위치를 불투명한 토큰으로 인코딩합니다."""
+    payload = json.dumps([measured_at.isoformat() if measured_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime.datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        measured_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.datetime.fromisoformat(measured_at) if measured_at else None), int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def keyset_order(query):
+    # measured_at이 NULL인 행(이전 데이터)은 DB와 무관하게 맨 앞 (SQLite 기본, PostgreSQL은 명시 필요)
+    M = models.TreeMeasurement
+    return query.order_by(M.measured_at.asc().nulls_first(), M.id)
+
+
+def apply_cursor(query, cursor: str):
+    """cursor 이후의 행만 조회 ((measured_at, id) 인덱스 범위 탐색, OFFSET 미사용)"""
+    measured_at, row_id = decode_cursor(cursor)
+    M = models.TreeMeasurement
+    if measured_at is None:
+        # (NULL, id) 비교는 항상 NULL이므로 NULL 구간의 나머지 + NULL이 아닌 전체로 이어감
+        return query.filter(or_(and_(M.measured_at.is_(None), M.id > row_id), M.measured_at.isnot(None)))
+    # NULL 행은 앞 구간이므로 행 값 비교(NULL -> 제외) 그대로 사용
+    return query.filter(tuple_(M.measured_at, M.id) > tuple_(measured_at, row_id))
+
+
+def parse_fields(fields: str) -> List[str]:
+    """'id,species,treeLatitude' -> 응답 필드 속성명 목록 (요청 순서 유지)"""
+    names = []
+    for raw in fields.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        if raw not in RESPONSE_FIELDS:
+            raise ValueError(f"Unknown field: {raw}")
+        name = RESPONSE_FIELDS[raw]
+        if name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError("fields must not be empty")
+    return names
+
+
+def parse_include(include: Optional[str]) -> List[str]:
+    """'telemetry' -> 추가 응답 블록 목록 (없으면 빈 목록)"""
+    names = []
+    for raw in (include or "").split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        if raw not in INCLUDES:
+            raise ValueError(f"Unknown include: {raw} (available: {', '.join(INCLUDES)})")
+        if raw not in names:
+            names.append(raw)
+    return names
+
+
+def projection_columns(names: List[str]) -> List[str]:
+    """요청 필드 + 페이지 커서 및 계산 필드에 필요한 컬럼"""
+    columns = []
+    for name in list(names) + ["id", "measured_at"]:
+        for col in _DERIVED_SOURCES.get(name, (name,)):
+            if col not in columns:
+                columns.append(col)
+    return columns
+
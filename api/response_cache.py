@@ -0,0 +1,180 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+
+class ResponseCache:
+    """
+    GET 응답 LRU 캐시 (전체 바이트 크기 제한).
+    캐시 항목은 데이터 버전(version)과 함께 저장되며, 측정 저장 또는 AI 보정 결과 반영 시
+    bump()로 버전을 올리면 이전 항목과 ETag가 모두 무효화됩니다.
+    다른 프로세스(다중 워커, 서버리스 인스턴스, 재보정 CLI)의 변경은 요청마다 sync()로 전달되는
+    공유 데이터 버전(change_log 최신 seq)이 바뀌면 같은 방식으로 무효화됩니다.
+    버전은 프로세스 단위이며, 재시작 시 이전 ETag가 재사용되지 않도록 임의 epoch로 시작합니다.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entry_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, Tuple[int, int, list, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._epoch = os.urandom(4).hex()
+        self._version = 0
+        self._shared: Optional[int] = None  # 마지막으로 확인한 공유 데이터 버전
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self):
+        """데이터 변경 알림: 모든 캐시 항목과 ETag를 무효화합니다."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._size = 0
+
+    def sync(self, shared: int) -> int:
+        """공유 데이터 버전을 반영하고 현재 버전을 반환합니다. 처음 보는 (더 큰) 값이면 bump()와 같이 무효화."""
+        with self._lock:
+            if self._shared is None or shared > self._shared:
+                if self._shared is not None:
+                    self._version += 1
+                    self._entries.clear()
+                    self._size = 0
+                self._shared = shared
+            return self._version
+
+    @staticmethod
+    def key(path: str, query_string: bytes) -> str:
+        # 쿼리 파라미터 순서와 무관하게 같은 키
+        params = sorted(p for p in query_string.decode("latin-1").split("&") if p)
+        return path + "?" + "&".join(params)
+
+    def etag(self, key: str, version: int) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return f'"{self._epoch}-{version}-{digest}"'
+
+    def get(self, key: str, version: int):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, version: int, status: int, headers: list, body: bytes):
+        if len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                return  # 처리 중 데이터가 변경됨
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[3])
+            self._entries[key] = (version, status, headers, body)
+            self._size += len(body)
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[3])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "version": self._version,
+                    "hits": self.hits, "misses": self.misses, "not_modified": self.not_modified}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCacheMiddleware:
+    """
+    지정 경로의 GET 요청에 대해 ETag / If-None-Match 조건부 응답과 응답 캐시를 제공하는 ASGI 미들웨어.
+    변경이 없으면 라우팅, 측정 조회, 직렬화 없이 304 또는 캐시된 본문을 반환합니다.
+    version_source가 있으면 (스레드 풀에서) 공유 데이터 버전을 읽어 cache.sync()에 전달합니다.
+    확인 결과는 version_ttl초 동안 재사용하므로, 그 사이의 조건부 요청은 DB 조회 없이 304를 반환합니다
+    (같은 프로세스의 변경은 bump()로 즉시 반영, 다른 프로세스의 변경은 최대 version_ttl초 뒤 반영).
+    """
+
+    def __init__(self, app, cache: ResponseCache, paths: Iterable[str] = (), prefixes: Iterable[str] = (),
+                 version_source: Optional[Callable[[], int]] = None, version_ttl: float = 1.0):
+        self.app = app
+        self.cache = cache
+        self.version_source = version_source
+        self.version_ttl = version_ttl
+        self._synced_at: Optional[float] = None
+        self.paths = set(paths)
+        self.prefixes = tuple(prefixes)
+
+    async def _version(self) -> int:
+        now = time.monotonic()
+        if self.version_source is None or (
+                self._synced_at is not None and now - self._synced_at < self.version_ttl):
+            return self.cache.version
+        self._synced_at = now  # 확인 중인 동안 들어온 요청은 직전 버전 사용 (동시 조회 방지)
+        try:
+            return self.cache.sync(await run_in_threadpool(self.version_source))
+        except Exception:
+            self._synced_at = None
+            raise
+
+    def _cacheable(self, path: str) -> bool:
+        return path in self.paths or (bool(self.prefixes) and path.startswith(self.prefixes))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self._cacheable(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache.key(scope["path"], scope.get("query_string", b""))
+        version = await self._version()
+        etag = self.cache.etag(key, version)
+        cache_headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+
+        if _etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        entry = self.cache.get(key, version)
+        if entry is not None:
+            _, status, headers, body = entry
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        state = {"status": None, "headers": None, "chunks": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if message["status"] == 200:
+                    headers = [
+                        (k, v) for k, v in message.get("headers", [])
+                        if k.lower() not in (b"etag", b"cache-control")
+                    ] + cache_headers
+                    message = {**message, "headers": headers}
+                state["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body" and state["status"] == 200:
+                state["chunks"].append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    self.cache.put(key, version, 200, state["headers"], b"".join(state["chunks"]))
+            await send(message)
+
+        await self.app(scope, receive, capture)
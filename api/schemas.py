@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, computed_field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 class TreeMeasurementBase(BaseModel):
     # Pydantic v2 설정
@@ -22,6 +22,34 @@ class TreeMeasurementBase(BaseModel):
     adjusted_tree_latitude: Optional[float] = Field(None, alias='adjustedTreeLatitude')
     adjusted_tree_longitude: Optional[float] = Field(None, alias='adjustedTreeLongitude')
     
+    # 서버 AI 처리 결과 (새로 추가)
+    is_server_processed: Optional[int] = Field(0, alias='isServerProcessed')
+    server_processed_at: Optional[datetime] = Field(None, alias='serverProcessedAt')
+    server_species: Optional[str] = Field(None, alias='serverSpecies')
+    server_dbh: Optional[float] = Field(None, alias='serverDbh')
+    server_height: Optional[float] = Field(None, alias='serverHeight')
+    server_crown_width: Optional[float] = Field(None, alias='serverCrownWidth')
+    server_ground_clearance: Optional[float] = Field(None, alias='serverGroundClearance')
+    server_health_score: Optional[float] = Field(None, alias='serverHealthScore')
+    server_confidence: Optional[float] = Field(None, alias='serverConfidence')
+    server_model_version: Optional[str] = Field(None, alias='serverModelVersion')
+
+# 센서별 샘플 시퀀스 최대 길이 (예: 100Hz 5초)
+IMU_MAX_SAMPLES = 500
+
+class IMUSamples(BaseModel):
+    # 촬영 구간 IMU 샘플 시퀀스 (센서별 [x, y, z] 목록)
+    model_config = ConfigDict(populate_by_name=True)
+
+    interval_ms: Optional[float] = Field(None, alias='intervalMs', gt=0)  # 샘플 간격
+    accelerometer: Optional[List[Tuple[float, float, float]]] = Field(None, max_length=IMU_MAX_SAMPLES)
+    gyroscope: Optional[List[Tuple[float, float, float]]] = Field(None, max_length=IMU_MAX_SAMPLES)
+    magnetometer: Optional[List[Tuple[float, float, float]]] = Field(None, max_length=IMU_MAX_SAMPLES)
+
+class MeasurementTelemetryBase(BaseModel):
+    # 원시 센서 데이터 (measurement_telemetry에 저장, 측정 응답에는 include=telemetry일 때만 포함)
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
     # IMU 데이터 (관성 측정 장치)
     accelerometer_x: Optional[float] = Field(None, alias='accelerometerX')
     accelerometer_y: Optional[float] = Field(None, alias='accelerometerY')
@@ -53,23 +81,236 @@ class TreeMeasurementBase(BaseModel):
     os_version: Optional[str] = Field(None, alias='osVersion')
     app_version: Optional[str] = Field(None, alias='appVersion')
 
-    # 사진 데이터 (Base64)
+class TreeMeasurementCreate(TreeMeasurementBase, MeasurementTelemetryBase):
+    # 사진 데이터 (Base64, 업로드 시에만 사용 - 저장소로 이동 후 참조만 보관)
     image_data: Optional[str] = Field(None, alias='imageData')
 
-    # 서버 AI 처리 결과 (새로 추가)
-    is_server_processed: Optional[int] = Field(0, alias='isServerProcessed')
-    server_processed_at: Optional[datetime] = Field(None, alias='serverProcessedAt')
-    server_species: Optional[str] = Field(None, alias='serverSpecies')
-    server_dbh: Optional[float] = Field(None, alias='serverDbh')
-    server_height: Optional[float] = Field(None, alias='serverHeight')
-    server_crown_width: Optional[float] = Field(None, alias='serverCrownWidth')
-    server_ground_clearance: Optional[float] = Field(None, alias='serverGroundClearance')
-    server_health_score: Optional[float] = Field(None, alias='serverHealthScore')
-    server_confidence: Optional[float] = Field(None, alias='serverConfidence')
-
-class TreeMeasurementCreate(TreeMeasurementBase):
-    pass
+    # 촬영 구간 센서 샘플 (선택)
+    imu_samples: Optional[IMUSamples] = Field(None, alias='imuSamples')
 
 class TreeMeasurement(TreeMeasurementBase):
     id: int
     measured_at: datetime
+
+    # 사진 Blob 참조 (원본은 GET /api/measurements/{id}/image)
+    image_hash: Optional[str] = Field(None, alias='imageHash')
+    image_size: Optional[int] = Field(None, alias='imageSize')
+    image_mime: Optional[str] = Field(None, alias='imageMime')
+
+    # 수목 개체 (GET /api/trees/{treeId}/history)
+    tree_id: Optional[int] = Field(None, alias='treeId')
+
+    @computed_field(alias='imageUrl')
+    @property
+    def image_url(self) -> Optional[str]:
+        return f"/api/measurements/{self.id}/image" if self.image_hash else None
+
+class MeasurementTelemetry(MeasurementTelemetryBase):
+    # GET /api/measurements/{id}/telemetry (센서 데이터가 없는 측정은 값이 모두 null)
+    measurement_id: int = Field(..., alias='measurementId')
+    imu_samples: Optional[IMUSamples] = Field(None, alias='imuSamples')
+
+class MeasurementProcessingStatus(BaseModel):
+    # 서버 AI 분석 진행 상태
+    model_config = ConfigDict(populate_by_name=True)
+
+    measurement_id: int = Field(..., alias='measurementId')
+    is_server_processed: int = Field(0, alias='isServerProcessed')
+    job_status: Optional[str] = Field(None, alias='jobStatus')
+    attempts: int = 0
+    error: Optional[str] = None
+    server_confidence: Optional[float] = Field(None, alias='serverConfidence')
+    server_processed_at: Optional[datetime] = Field(None, alias='serverProcessedAt')
+
+class AIQueueStats(BaseModel):
+    # AI 작업 큐 현황
+    model_config = ConfigDict(populate_by_name=True)
+
+    workers: int
+    mode: str
+    pending: int
+    running: int
+    done: int
+    failed: int
+
+    # 마이크로 배치 처리 통계 (배치 크기/지연 시간 튜닝용)
+    batch_size: int = Field(..., alias='batchSize')
+    batches: int = 0
+    avg_batch_size: float = Field(0.0, alias='avgBatchSize')
+    avg_item_latency_ms: float = Field(0.0, alias='avgItemLatencyMs')
+
+class BulkIngestItem(BaseModel):
+    # 일괄 업로드 레코드별 결과 (index: 요청 내 순번)
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkIngestResult(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkIngestItem]
+    error: Optional[str] = None  # 본문 파싱 중단 등 요청 단위 오류
+
+class TileCluster(BaseModel):
+    # 격자 셀 단위 수목 클러스터 (확대 구간에서는 개별 수목)
+    model_config = ConfigDict(populate_by_name=True)
+
+    count: int
+    latitude: float  # 셀 내 수목 좌표 평균 (중심점)
+    longitude: float
+    mean_dbh: Optional[float] = Field(None, alias='meanDbh')
+    mean_health: Optional[float] = Field(None, alias='meanHealth')
+    species: Dict[str, int] = {}  # 수종별 개체 수 (상위 수종)
+    measurement_id: Optional[int] = Field(None, alias='measurementId')
+
+class TileClusters(BaseModel):
+    z: int
+    x: int
+    y: int
+    clusters: List[TileCluster]
+
+# 통계 지표 이름 (stats.FIELDS) -> 응답 키
+METRIC_NAMES = {"dbh": "dbh", "height": "height", "crown_width": "crownWidth", "health_score": "healthScore"}
+
+class HistogramBucket(BaseModel):
+    lower: float
+    upper: Optional[float] = None  # 마지막 구간은 상한 없음
+    count: int
+
+class MetricSummary(BaseModel):
+    # 측정 지표 분포 (개수, 평균, 표준편차, 고정 구간 히스토그램)
+    count: int
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    histogram: List[HistogramBucket] = []
+
+class CorrectionSummary(BaseModel):
+    # 스마트폰 측정값 대비 서버 AI 보정량 (server_* - 원본)
+    model_config = ConfigDict(populate_by_name=True)
+
+    count: int
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    mean_abs: Optional[float] = Field(None, alias='meanAbs')
+
+class SpeciesStats(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    species: Optional[str] = None
+    count: int
+    mean_dbh: Optional[float] = Field(None, alias='meanDbh')
+    mean_height: Optional[float] = Field(None, alias='meanHeight')
+    mean_health: Optional[float] = Field(None, alias='meanHealth')
+
+class CellStats(BaseModel):
+    # 구역(통계 격자 셀)별 요약
+    model_config = ConfigDict(populate_by_name=True)
+
+    cell_x: int = Field(..., alias='cellX')
+    cell_y: int = Field(..., alias='cellY')
+    bounds: List[float]  # minLat, minLon, maxLat, maxLon
+    count: int
+    mean_dbh: Optional[float] = Field(None, alias='meanDbh')
+    mean_health: Optional[float] = Field(None, alias='meanHealth')
+
+class InventoryStats(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    count: int
+    processed: int
+    species_mismatch: int = Field(0, alias='speciesMismatch')
+    metrics: Dict[str, MetricSummary]  # dbh, height, crownWidth, healthScore
+    corrections: Dict[str, CorrectionSummary]
+    species: List[SpeciesStats]
+    cells: Optional[List[CellStats]] = None
+
+class ReprocessStatus(BaseModel):
+    # 전체 재보정 작업 진행 상황
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: int
+    model_version: str = Field(..., alias='modelVersion')
+    status: str  # running, paused, done, failed
+    active: bool = False  # 이 서버 프로세스에서 실행 중
+    total: int
+    processed: int
+    last_id: int = Field(0, alias='lastId')  # 체크포인트
+    progress: float
+    rows_per_sec: float = Field(0.0, alias='rowsPerSec')
+    avg_rows_per_sec: float = Field(0.0, alias='avgRowsPerSec')
+    eta_seconds: Optional[float] = Field(None, alias='etaSeconds')
+    workers: int
+    error: Optional[str] = None
+    started_at: Optional[datetime] = Field(None, alias='startedAt')
+    updated_at: Optional[datetime] = Field(None, alias='updatedAt')
+    finished_at: Optional[datetime] = Field(None, alias='finishedAt')
+
+class AIModelInfo(BaseModel):
+    # 이 서버 프로세스에 로드된 AI 모델 버전
+    model_config = ConfigDict(populate_by_name=True)
+
+    version: str
+    architecture: str
+    active: bool = False
+    weight_bytes: int = Field(..., alias='weightBytes')
+    resident_bytes: Optional[int] = Field(None, alias='residentBytes')  # 상주 중인 가중치 매핑 페이지
+    load_ms: float = Field(..., alias='loadMs')
+    warmup_ms: float = Field(..., alias='warmupMs')
+    loaded_at: datetime = Field(..., alias='loadedAt')
+
+class ProcessMemory(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    rss_bytes: Optional[int] = Field(None, alias='rssBytes')
+    rss_anon_bytes: Optional[int] = Field(None, alias='rssAnonBytes')
+    rss_file_bytes: Optional[int] = Field(None, alias='rssFileBytes')  # 파일 매핑 (다른 프로세스와 공유)
+
+class AIModelRegistryStatus(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    active_version: str = Field(..., alias='activeVersion')
+    default_version: str = Field(..., alias='defaultVersion')
+    available: List[str] = []
+    loaded: List[AIModelInfo] = []
+    memory: ProcessMemory
+
+class TreeHistoryEntry(BaseModel):
+    # 생육 이력 한 건: 지표값은 서버 보정값 우선, raw*는 스마트폰 측정값
+    model_config = ConfigDict(populate_by_name=True)
+
+    measurement_id: int = Field(..., alias='measurementId')
+    measured_at: Optional[datetime] = Field(None, alias='measuredAt')
+    species: Optional[str] = None
+    is_server_processed: int = Field(0, alias='isServerProcessed')
+    dbh: Optional[float] = None
+    height: Optional[float] = None
+    crown_width: Optional[float] = Field(None, alias='crownWidth')
+    ground_clearance: Optional[float] = Field(None, alias='groundClearance')
+    health_score: Optional[float] = Field(None, alias='healthScore')
+    raw_dbh: Optional[float] = Field(None, alias='rawDbh')
+    raw_height: Optional[float] = Field(None, alias='rawHeight')
+    raw_crown_width: Optional[float] = Field(None, alias='rawCrownWidth')
+    raw_ground_clearance: Optional[float] = Field(None, alias='rawGroundClearance')
+    raw_health_score: Optional[float] = Field(None, alias='rawHealthScore')
+    image_url: Optional[str] = Field(None, alias='imageUrl')
+
+class TreeGrowth(BaseModel):
+    # 연간 성장률 (최소제곱 기울기, 측정 기간 trees.MIN_GROWTH_SPAN_DAYS 이상일 때)
+    model_config = ConfigDict(populate_by_name=True)
+
+    dbh: Optional[float] = None  # cm/년
+    height: Optional[float] = None  # m/년
+    crown_width: Optional[float] = Field(None, alias='crownWidth')  # m/년
+
+class TreeHistory(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: int
+    species: Optional[str] = None
+    latitude: float
+    longitude: float
+    measurement_count: int = Field(0, alias='measurementCount')
+    first_measured_at: Optional[datetime] = Field(None, alias='firstMeasuredAt')
+    last_measured_at: Optional[datetime] = Field(None, alias='lastMeasuredAt')
+    growth: TreeGrowth
+    measurements: List[TreeHistoryEntry]
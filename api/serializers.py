@@ -0,0 +1,124 @@
+import operator
+import re
+from typing import List, Optional, Sequence
+
+from pydantic_core import to_json
+
+try:
+    import models, schemas, queries, telemetry
+except ImportError:
+    from . import models, schemas, queries, telemetry
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 pydantic-core 직렬화기 사용 (출력 바이트 동일, 다소 느림)
+    orjson = None
+
+# 전체 응답 필드 (schemas.TreeMeasurement 선언 순서 + 계산 필드) - response_model 직렬화와 같은 키 순서
+FULL_FIELDS = list(schemas.TreeMeasurement.model_fields) + ["image_url"]
+
+# include=telemetry 응답의 전체 필드: 센서 필드는 분리 이전 응답과 같은 위치 (adjustedTreeLongitude 뒤)
+_TELEMETRY_AT = FULL_FIELDS.index("adjusted_tree_longitude") + 1
+TELEMETRY_FULL_FIELDS = FULL_FIELDS[:_TELEMETRY_AT] + list(telemetry.FIELDS) + FULL_FIELDS[_TELEMETRY_AT:]
+
+_KEYS = {**queries.RESPONSE_KEYS, **queries.TELEMETRY_KEYS}
+
+# orjson은 1e16 이상의 지수 표기에서 '+'를 생략함 (pydantic: 1e+16, orjson: 1e16)
+_EXPONENT = re.compile(rb"e[0-9]")
+_DIGITS = frozenset(b"0123456789")
+_NUMBER_CHARS = frozenset(b"0123456789.-")
+
+
+def _has_unsigned_exponent(data: bytes) -> bool:
+    """JSON 숫자 안의 'e' 다음 숫자 (예: 1e16) 여부. 문자열 안의 'e1' (해시 등)은 제외합니다."""
+    for match in _EXPONENT.finditer(data):
+        i = match.start() - 1
+        if i < 0 or data[i] not in _DIGITS:
+            continue
+        while i >= 0 and data[i] in _NUMBER_CHARS:
+            i -= 1
+        if i >= 0 and data[i] in b":,[":
+            return True
+    return False
+
+
+def dumps(items) -> bytes:
+    """
+    dict 목록을 JSON 바이트로 직렬화합니다. FastAPI response_model 경로(pydantic dump_json)와
+    같은 바이트를 만들며, orjson 출력에 표기가 다른 지수형 실수가 있으면 pydantic-core로 다시 직렬화합니다.
+    """
+    if orjson is not None:
+        data = orjson.dumps(items)
+        if not _has_unsigned_exponent(data):
+            return data
+    return to_json(items, inf_nan_mode="null")
+
+
+class RowSerializer:
+    """
+    SQL 행 튜플 -> 응답 JSON 바이트.
+    응답 필드별 컬럼 위치와 camelCase 키를 한 번만 계산해 두고, 행마다 Pydantic 모델을
+    만들지 않고 dict로 바로 변환합니다.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.columns = queries.projection_columns(self.names)
+        self.keys = [_KEYS[name] for name in self.names if name != "image_url"]
+        indexes = [self.columns.index(name) for name in self.names if name != "image_url"]
+        self._values = operator.itemgetter(*indexes) if len(indexes) > 1 else (
+            (lambda row, i=indexes[0]: (row[i],)) if indexes else (lambda row: ())
+        )
+        # 계산 필드 imageUrl은 요청 위치에 끼워 넣음
+        self._image_url_at = self.names.index("image_url") if "image_url" in self.names else None
+        if self._image_url_at is not None:
+            self._id = self.columns.index("id")
+            self._image_hash = self.columns.index("image_hash")
+
+        # 센서 필드가 있으면 measurement_telemetry를 LEFT JOIN (센서 데이터가 없는 측정은 null)
+        self.joins_telemetry = any(column in telemetry.FIELDS for column in self.columns)
+
+    def select_columns(self) -> list:
+        T = models.MeasurementTelemetry.__table__
+        return [T.c[column] if column in telemetry.FIELDS else getattr(models.TreeMeasurement, column)
+                for column in self.columns]
+
+    def query(self, db):
+        """응답 컬럼만 SELECT 하는 measurements 쿼리 (필터 / 정렬은 호출 측에서 추가)"""
+        query = db.query(*self.select_columns())
+        if self.joins_telemetry:
+            T = models.MeasurementTelemetry.__table__
+            query = query.select_from(models.TreeMeasurement).outerjoin(
+                T, T.c.measurement_id == models.TreeMeasurement.id)
+        return query
+
+    def to_dicts(self, rows) -> List[dict]:
+        keys, values = self.keys, self._values
+        if self._image_url_at is None:
+            return [dict(zip(keys, values(row))) for row in rows]
+
+        at, id_index, hash_index = self._image_url_at, self._id, self._image_hash
+        keys = keys[:at] + ["imageUrl"] + keys[at:]
+        items = []
+        for row in rows:
+            row_values = list(values(row))
+            row_values.insert(at, f"/api/measurements/{row[id_index]}/image" if row[hash_index] else None)
+            items.append(dict(zip(keys, row_values)))
+        return items
+
+    def serialize(self, rows) -> bytes:
+        return dumps(self.to_dicts(rows))
+
+
+# 필드 지정이 없는 목록 응답용 (모든 필드)
+MEASUREMENT = RowSerializer(FULL_FIELDS)
+MEASUREMENT_WITH_TELEMETRY = RowSerializer(TELEMETRY_FULL_FIELDS)
+
+
+def for_fields(field_names: Optional[List[str]], include: Sequence[str] = ()) -> RowSerializer:
+    """응답 필드 목록(없으면 전체)과 include 블록(queries.parse_include)에 맞는 직렬화기"""
+    if "telemetry" in include:
+        if not field_names:
+            return MEASUREMENT_WITH_TELEMETRY
+        return RowSerializer(list(field_names) + [name for name in telemetry.FIELDS if name not in field_names])
+    return RowSerializer(field_names) if field_names else MEASUREMENT
@@ -1,53 +1,142 @@
 import datetime
-import random
 import time
 import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+from sqlalchemy import select, update
+
+try:
+    import models, metrics
+    from services import model_registry
+except ImportError:
+    from .. import models, metrics
+    from . import model_registry
 
 logger = logging.getLogger(__name__)
 
+
+@contextmanager
+def _no_hook(db, measurement_ids):
+    yield
+
+
+@dataclass
+class BatchResult:
+    """배치 추론 결과 요약 (배치 크기/지연 시간 튜닝용)"""
+    size: int
+    elapsed_ms: float
+    updated_ids: List[int] = field(default_factory=list)
+
+    @property
+    def per_item_ms(self) -> float:
+        return self.elapsed_ms / self.size if self.size else 0.0
+
+
 class TreeAIService:
+    # AI 분석에 필요한 측정 필드 (프로세스 풀 전달 시 ORM 객체 대신 dict 사용)
+    INPUT_FIELDS = ("id", "species", "dbh", "height", "crown_width", "ground_clearance")
+
+    @staticmethod
+    def registry() -> model_registry.ModelRegistry:
+        return model_registry.get_registry()
+
     @staticmethod
-    def process_measurement(db_measurement):
+    def model_version() -> str:
+        """보정 결과와 함께 기록하는 현재 활성 모델 버전 (모델 교체 후 전체 재보정 대상 판별)"""
+        return model_registry.get_registry().active_version
+
+    @staticmethod
+    def analyze_batch(batch, model_version=None):
         """
-        서버의 정밀 AI 모델(YOLOv11-seg, SAM 등)을 활용하여 
-        스마트폰에서 전달된 원본 데이터를 정밀하게 보정하는 시뮬레이션 로직입니다.
+        서버의 정밀 AI 모델(YOLOv11-seg, SAM 등)을 활용하여
+        스마트폰에서 전달된 원본 데이터를 정밀하게 보정합니다 (현재는 NumPy 대체 모델).
+        배치 전체를 한 번의 모델 추론으로 계산하며, ORM에 의존하지 않는
+        순수 함수이므로 별도 프로세스에서도 실행할 수 있습니다.
+        model_version을 생략하면 활성 버전을 사용합니다 (프로세스 풀에는 호출 측의 활성 버전을 넘김).
         """
-        try:
-            logger.info(f"Starting server-side AI processing for Measurement ID: {db_measurement.id}")
-            
-            # 실제 환경에서는 여기서 이미지 데이터를 꺼내어 고성능 GPU 서버의 AI 모델에 전달합니다.
-            # image_bytes = base64.b64decode(db_measurement.image_data)
-            
-            # AI 분석 시간 시뮬레이션 (네트워크 및 추론 대기)
-            # time.sleep(0.5) 
-            
+        n = len(batch)
+        if n == 0:
+            return []
+        model = model_registry.get_registry().get(model_version)
+
+        # 실제 환경에서는 여기서 이미지 데이터를 꺼내어 고성능 GPU 서버의 AI 모델에 전달합니다.
+        # images = [blob_store.get_blob_store().open(b["image_hash"]).read() for b in batch]
+
+        # AI 분석 시간 시뮬레이션 (네트워크 및 추론 대기)
+        # time.sleep(0.5)
+
+        def column(name, default=np.nan):
+            values = np.array([b[name] if b[name] is not None else np.nan for b in batch], dtype=np.float64)
+            return np.where(np.isnan(values), default, values)
+
+        features = np.column_stack([
+            column("dbh"),
+            column("height"),
+            column("crown_width", 5.0),
+            column("ground_clearance", 2.0),
+        ])
+        # 2-4. 흉고직경 / 수고 / 수관폭 / 지하고 정밀 보정 (이미지 분할을 통한 픽셀-거리 매핑 재계산)
+        # 서버 AI는 스마트폰보다 더 정교한 마스크를 추출하여 약 2-10% 정도의 오차를 보정
+        # 5. 정밀 건강도 분석, 6. AI 확신도 점수
+        predictions = model.predict(features)
+
+        processed_at = datetime.datetime.utcnow()
+        decimals = {"server_confidence": 2}
+        # NaN(원본 누락) 은 None으로 변환
+        columns = {
+            name: [None if np.isnan(v) else v for v in np.round(values, decimals.get(name, 1)).tolist()]
+            for name, values in predictions.items()
+        }
+
+        results = []
+        for i, b in enumerate(batch):
+            result = {name: values[i] for name, values in columns.items()}
             # 1. 수종 재식별 (예: 소나무 -> 강송 등 더 구체적이거나 정확하게)
-            db_measurement.server_species = db_measurement.species + " (Server Verified)"
-            
-            # 2. 흉고직경(DBH) 정밀 보정 (이미지 분할을 통한 픽셀-거리 매핑 재계산)
-            # 서버 AI는 스마트폰보다 더 정교한 마스크를 추출하여 약 2-5% 정도의 오차를 보정한다고 가정
-            correction_factor = random.uniform(0.95, 1.05)
-            db_measurement.server_dbh = round(db_measurement.dbh * correction_factor, 1)
-            
-            # 3. 수고(Height) 정밀 보정
-            db_measurement.server_height = round(db_measurement.height * random.uniform(0.98, 1.02), 1)
-            
-            # 4. 기타 항목 산출
-            db_measurement.server_crown_width = round((db_measurement.crown_width or 5.0) * random.uniform(0.9, 1.1), 1)
-            db_measurement.server_ground_clearance = round((db_measurement.ground_clearance or 2.0) * random.uniform(0.9, 1.1), 1)
-            
-            # 5. 정밀 건강도 분석 (EfficientNet-B7 등 무거운 모델 사용 시뮬레이션)
-            db_measurement.server_health_score = round(random.uniform(70, 98), 1)
-            
-            # 6. AI 확신도 점수
-            db_measurement.server_confidence = round(random.uniform(0.85, 0.99), 2)
-            
+            result["server_species"] = (b["species"] or "") + " (Server Verified)"
             # 처리 상태 업데이트
-            db_measurement.is_server_processed = 1
-            db_measurement.server_processed_at = datetime.datetime.utcnow()
-            
-            logger.info(f"Server-side AI processing completed for ID: {db_measurement.id}")
-            return True
-        except Exception as e:
-            logger.error(f"Server AI Error: {e}")
-            return False
+            result["is_server_processed"] = 1
+            result["server_processed_at"] = processed_at
+            result["server_model_version"] = model.version
+            results.append(result)
+        return results
+
+    @staticmethod
+    def load_inputs(db, measurement_ids):
+        """배치 대상 측정값을 ORM 객체 생성 없이 한 번의 SELECT로 읽어옵니다."""
+        columns = [getattr(models.TreeMeasurement, f) for f in TreeAIService.INPUT_FIELDS]
+        rows = db.execute(select(*columns).where(models.TreeMeasurement.id.in_(measurement_ids))).all()
+        return [dict(zip(TreeAIService.INPUT_FIELDS, row)) for row in rows]
+
+    @staticmethod
+    def write_results(db, inputs, results):
+        """보정 결과를 기본키 기준 일괄 UPDATE (executemany) 로 기록합니다."""
+        params = [{"id": i["id"], **r} for i, r in zip(inputs, results)]
+        if params:
+            db.execute(update(models.TreeMeasurement), params)
+        return [p["id"] for p in params]
+
+    @staticmethod
+    def process_batch(db, measurement_ids, analyze=None, on_write=None):
+        """
+        여러 측정을 한 번에 보정합니다: 일괄 SELECT -> 벡터화 추론 -> 일괄 UPDATE.
+        analyze로 추론 함수를 대체할 수 있습니다 (예: 프로세스 풀 위임).
+        on_write(db, ids)는 UPDATE를 감싸는 컨텍스트 매니저입니다 (기록 전후 값을 쓰는 증분 집계용).
+        커밋은 호출 측 책임입니다.
+        """
+        started = time.perf_counter()
+        with metrics.stage("ai_load"):
+            inputs = TreeAIService.load_inputs(db, measurement_ids)
+        with metrics.stage("ai_inference"):
+            results = (analyze or TreeAIService.analyze_batch)(inputs)
+        with metrics.stage("ai_write"), (on_write or _no_hook)(db, [i["id"] for i in inputs]):
+            updated_ids = TreeAIService.write_results(db, inputs, results)
+        batch = BatchResult(size=len(inputs), elapsed_ms=(time.perf_counter() - started) * 1000,
+                            updated_ids=updated_ids)
+        logger.info(
+            f"Server-side AI batch processed: size={batch.size}, "
+            f"elapsed={batch.elapsed_ms:.1f}ms, per_item={batch.per_item_ms:.2f}ms"
+        )
+        return batch
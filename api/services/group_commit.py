@@ -0,0 +1,132 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, List, Optional
+
+try:
+    from services import ingest
+except ImportError:
+    from . import ingest
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitter:
+    """
+    그룹 커밋: 동시 요청의 INSERT를 window_ms 동안 모아 한 트랜잭션(한 번의 fsync)으로 커밋합니다.
+    요청 스레드는 submit()에서 자신의 행 ID가 확정될 때까지 대기합니다.
+    배치 커밋이 실패하면 원인 행을 격리하기 위해 행별 트랜잭션으로 재시도합니다.
+    """
+
+    def __init__(self, session_factory, window_ms: float = 2.0, max_batch: int = 256,
+                 on_inserted: Optional[Callable] = None, on_committed: Optional[Callable] = None):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.on_inserted = on_inserted
+        self.on_committed = on_committed
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.batches = 0
+        self.rows = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+        logger.info(f"Group commit enabled (window={self.window * 1000:.1f}ms, max_batch={self.max_batch}).")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def submit(self, row: dict, timeout: float = 30.0) -> int:
+        """
+        행을 다음 그룹 커밋에 포함시키고, 커밋 완료 후 생성된 ID를 반환합니다.
+        timeout 안에 커밋에 포함되지 못하면 대기열의 행을 취소하고 TimeoutError를 발생시킵니다
+        (저장되지 않았으므로 재시도해도 중복되지 않음). 이미 커밋 중인 행은 결과가 나올 때까지 기다립니다.
+        """
+        if self._thread is None:
+            raise RuntimeError("GroupCommitter is not running")
+        future: Future = Future()
+        self._queue.put((row, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            if future.cancel():
+                raise TimeoutError(f"Group commit did not pick up the row within {timeout}s")
+            return future.result()
+
+    def _collect(self, first) -> List[tuple]:
+        items = [first]
+        deadline = time.monotonic() + self.window
+        while len(items) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopping.set()
+                break
+            items.append(item)
+        return items
+
+    def _commit(self, items: List[tuple]) -> List[int]:
+        with self.session_factory() as db:
+            try:
+                ids = ingest.insert_rows(db, [row for row, _ in items])
+                if self.on_inserted:
+                    self.on_inserted(db, ids)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            if self.on_committed:
+                try:
+                    self.on_committed(db, ids)
+                except Exception as e:
+                    logger.error(f"Group commit post-commit hook failed: {e}")
+        return ids
+
+    def _run(self):
+        while not self._stopping.is_set():
+            first = self._queue.get()
+            if first is None:
+                break
+            # 호출 측이 시간 초과로 취소한 행은 버림 (이후에는 취소할 수 없으므로 결과를 반드시 전달)
+            items = [item for item in self._collect(first) if item[1].set_running_or_notify_cancel()]
+            if not items:
+                continue
+            try:
+                ids = self._commit(items)
+                for (_, future), row_id in zip(items, ids):
+                    future.set_result(row_id)
+                self.batches += 1
+                self.rows += len(items)
+            except Exception as batch_err:
+                logger.error(f"Group commit of {len(items)} rows failed, retrying individually: {batch_err}")
+                for item in items:
+                    try:
+                        item[1].set_result(self._commit([item])[0])
+                    except Exception as e:
+                        item[1].set_exception(e)
+
+        # 종료 시 남은 요청은 실패 처리
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("GroupCommitter stopped"))
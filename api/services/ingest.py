@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+from typing import AsyncIterator, Callable, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+try:
+    import models, schemas, blob_store, telemetry
+except ImportError:
+    from .. import models, schemas, blob_store, telemetry
+
+logger = logging.getLogger(__name__)
+
+# 클라이언트가 직접 입력하는 측정 컬럼 (서버 AI 결과, 업로드 전용 필드, 센서 샘플 시퀀스 제외)
+RAW_FIELDS = tuple(
+    name for name in schemas.TreeMeasurementCreate.model_fields
+    if name not in ("image_data", "imu_samples", "is_server_processed") and not name.startswith("server_")
+)
+IMAGE_FIELDS = ("image_hash", "image_size", "image_mime")
+
+# 한 트랜잭션에 넣는 레코드 수
+DEFAULT_CHUNK_SIZE = 500
+
+# 레코드 하나의 최대 크기 (문자 수, Base64 사진 포함). 스트리밍 파서의 버퍼 상한
+MAX_RECORD_CHARS = int(float(os.environ.get("BULK_MAX_RECORD_MB", "32")) * 1024 * 1024)
+# 디코드 오류 위치가 버퍼 끝에서 이 범위 안이면 잘린 토큰(true, 숫자 등)으로 보고 다음 청크를 기다림
+_TRUNCATED_TAIL = 32
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-seq")
+
+
+def build_row(measurement: schemas.TreeMeasurementCreate) -> dict:
+    """
+    검증된 측정 데이터를 행(dict)으로 변환합니다. 센서 컬럼(telemetry.COLUMNS)은 insert_rows에서 분리됩니다.
+    사진은 Blob 저장소에 기록하고 참조 컬럼만 남기며, 센서 샘플 시퀀스는 float32 BLOB으로 변환합니다.
+    모든 행이 같은 키를 가지므로 executemany 일괄 INSERT에 그대로 사용할 수 있습니다.
+    """
+    row = {name: getattr(measurement, name) for name in RAW_FIELDS}
+    row.update(telemetry.sample_columns(measurement.imu_samples))
+    row.update(dict.fromkeys(IMAGE_FIELDS))
+    row.update(blob_store.store_image_data(measurement.image_data))
+    return row
+
+
+def insert_rows(db, rows: List[dict]) -> List[int]:
+    """
+    일괄 INSERT 후 입력 순서대로 생성된 ID를 반환합니다 (커밋은 호출 측 책임).
+    센서 컬럼은 같은 트랜잭션에서 measurement_telemetry에 기록합니다.
+    """
+    if not rows:
+        return []
+    measurement_rows, telemetry_rows = zip(*(telemetry.split(row) for row in rows))
+    # 테이블 대상 Core executemany (ORM 일괄 INSERT보다 수 배 빠름, 컬럼 기본값은 동일하게 적용)
+    result = db.execute(
+        insert(models.TreeMeasurement.__table__).returning(models.TreeMeasurement.id, sort_by_parameter_order=True),
+        list(measurement_rows),
+    )
+    ids = list(result.scalars())
+    telemetry.insert_rows(db, ids, telemetry_rows)
+    return ids
+
+
+def _is_truncated(buffer: str, error: json.JSONDecodeError) -> bool:
+    """디코드 오류가 레코드가 덜 도착해서인지 (True) 실제로 잘못된 JSON인지 (False)"""
+    # 닫는 따옴표가 버퍼 끝까지 없으면 Unterminated string (오류 위치는 문자열 시작)
+    return error.msg.startswith("Unterminated string") or len(buffer) - error.pos <= _TRUNCATED_TAIL
+
+
+async def iter_json_records(chunks: AsyncIterator[bytes], ndjson: bool,
+                            max_record_size: int = MAX_RECORD_CHARS) -> AsyncIterator[object]:
+    """
+    요청 본문을 스트리밍으로 읽어 레코드를 하나씩 반환합니다.
+    JSON 배열과 NDJSON(줄 단위 JSON)을 모두 지원하며, 버퍼에는 최대 한 레코드(max_record_size 이하)만 유지합니다.
+    NDJSON의 파싱 불가능한 줄은 ValueError 인스턴스로 반환하고, JSON 배열 중간의 잘못된 요소나
+    크기 상한을 넘는 레코드는 그 자리에서 ValueError를 발생시킵니다 (이전 레코드까지만 처리).
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pending = b""
+    started = False  # JSON 배열의 '[' 확인 여부
+    index = 0  # 다음 레코드 번호
+
+    async for chunk in chunks:
+        # 멀티바이트 문자가 청크 경계에서 잘리지 않도록 처리
+        pending += chunk
+        try:
+            text_chunk = pending.decode("utf-8")
+            pending = b""
+        except UnicodeDecodeError as e:
+            text_chunk = pending[:e.start].decode("utf-8")
+            pending = pending[e.start:]
+        buffer += text_chunk
+
+        if ndjson:
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    index += 1
+                    yield _parse_line(line)
+            if len(buffer) > max_record_size:
+                raise ValueError(f"Record {index} exceeds the maximum record size ({max_record_size} characters)")
+            continue
+
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != "[":
+                    raise ValueError("Request body must be a JSON array or NDJSON stream")
+                started = True
+                buffer = buffer[1:]
+                continue
+            if buffer[:1] == ",":
+                buffer = buffer[1:]
+                continue
+            if buffer[:1] == "]" or not buffer:
+                break
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if _is_truncated(buffer, e):
+                    break  # 레코드가 아직 다 도착하지 않음
+                # 남은 본문을 버퍼에 쌓아 두고 청크마다 다시 파싱하지 않도록 즉시 중단
+                raise ValueError(f"Malformed JSON in record {index}: {e.msg}")
+            buffer = buffer[end:]
+            index += 1
+            yield record
+
+        if len(buffer) > max_record_size:
+            raise ValueError(f"Record {index} exceeds the maximum record size ({max_record_size} characters)")
+
+    if ndjson:
+        if buffer.strip():
+            yield _parse_line(buffer)
+        return
+    buffer = buffer.strip()
+    if not started:
+        if buffer:
+            raise ValueError("Request body must be a JSON array or NDJSON stream")
+        return
+    if buffer != "]":
+        raise ValueError("Malformed JSON array in request body")
+
+
+def _parse_line(line: str):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {e}")
+
+
+class BulkIngestor:
+    """
+    오프라인 현장 조사 데이터 일괄 업로드 처리기.
+    레코드를 하나씩 검증하고 chunk_size 단위로 한 트랜잭션에 일괄 INSERT 합니다.
+    on_inserted(db, ids)는 커밋 전(같은 트랜잭션), on_committed(db, ids)는 커밋 후 호출됩니다.
+    """
+
+    def __init__(self, session_factory, on_inserted: Optional[Callable] = None,
+                 on_committed: Optional[Callable] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.session_factory = session_factory
+        self.on_inserted = on_inserted
+        self.on_committed = on_committed
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def validate(index: int, record) -> tuple:
+        """(index, TreeMeasurementCreate | None, error | None)"""
+        if isinstance(record, ValueError):
+            return index, None, str(record)
+        if not isinstance(record, dict):
+            return index, None, "Record must be a JSON object"
+        try:
+            return index, schemas.TreeMeasurementCreate.model_validate(record), None
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            return index, None, errors
+
+    def ingest_chunk(self, items: List[tuple]) -> List[dict]:
+        """검증된 (index, measurement) 목록을 한 트랜잭션으로 저장하고 레코드별 결과를 반환합니다."""
+        results = []
+        rows, indexes = [], []
+        for index, measurement in items:
+            try:
+                rows.append(build_row(measurement))
+                indexes.append(index)
+            except ValueError as e:
+                results.append({"index": index, "id": None, "error": str(e)})
+
+        if rows:
+            with self.session_factory() as db:
+                try:
+                    ids = insert_rows(db, rows)
+                    if self.on_inserted:
+                        self.on_inserted(db, ids)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Bulk ingest chunk failed ({len(rows)} records): {e}")
+                    results.extend({"index": i, "id": None, "error": f"Database Error: {e}"} for i in indexes)
+                    return results
+                if self.on_committed:
+                    try:
+                        self.on_committed(db, ids)
+                    except Exception as e:
+                        logger.error(f"Bulk ingest post-commit hook failed: {e}")
+            results.extend({"index": i, "id": mid, "error": None} for i, mid in zip(indexes, ids))
+        return results
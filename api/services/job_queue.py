@@ -0,0 +1,330 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from sqlalchemy import and_, or_, select, update, func
+
+try:
+    import models, metrics
+except ImportError:
+    from .. import models, metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _ai_service():
+    """TreeAIService(NumPy 포함)는 첫 배치 처리 시점에 임포트합니다 (서버리스 콜드 스타트 단축)."""
+    try:
+        from services.ai_service import TreeAIService
+    except ImportError:
+        from .ai_service import TreeAIService
+    return TreeAIService
+
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class AIJobQueue:
+    """
+    서버 AI 분석 백그라운드 큐.
+    ai_jobs 테이블을 영속 큐로 사용하며, 워커 스레드가 대기 작업을 가져가 처리합니다.
+    - workers=0: 요청 처리 중 즉시 실행 (Vercel 등 백그라운드 실행이 불가능한 환경)
+    - mode="process": 추론 연산을 별도 프로세스 풀에서 실행 (GIL 회피)
+    워커는 최대 batch_size개의 작업을 모으되, 부족하면 batch_window초까지 기다려
+    마이크로 배치로 묶어 TreeAIService.process_batch로 한 번에 처리합니다.
+    """
+
+    def __init__(self, session_factory, workers: int = 2, mode: str = "thread",
+                 poll_interval: float = 1.0, max_attempts: int = 3,
+                 batch_size: int = 16, batch_window: float = 0.02, on_processed=None, on_write=None,
+                 lease_seconds: float = 600.0, retry_delay: float = 5.0):
+        self.session_factory = session_factory
+        # AI 보정 결과 커밋 이후 호출되는 콜백 (db, measurement_ids)
+        self.on_processed = on_processed
+        # AI 보정 결과 UPDATE를 감싸는 컨텍스트 매니저 (db, measurement_ids) - 같은 트랜잭션, 커밋 전
+        self.on_write = on_write
+        self.workers = workers
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        # running 작업을 처리 중인 워커가 살아 있다고 간주하는 시간 (이후 재시작 복구에서 회수)
+        self.lease_seconds = lease_seconds
+        # 실패한 작업의 재시도 대기 시간 (시도마다 2배)
+        self.retry_delay = retry_delay
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self._batch_lock = threading.Lock()
+        self._batches = 0
+        self._batched_items = 0
+        self._batch_ms = 0.0
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls, session_factory, **kwargs):
+        # Vercel 서버리스 환경에서는 응답 이후 백그라운드 스레드가 보장되지 않으므로 즉시 실행
+        default_workers = "0" if os.environ.get("VERCEL") else "2"
+        return cls(
+            session_factory,
+            workers=int(os.environ.get("AI_WORKERS", default_workers)),
+            mode=os.environ.get("AI_WORKER_MODE", "thread"),
+            poll_interval=float(os.environ.get("AI_POLL_INTERVAL", "1.0")),
+            max_attempts=int(os.environ.get("AI_MAX_ATTEMPTS", "3")),
+            batch_size=int(os.environ.get("AI_BATCH_SIZE", "16")),
+            batch_window=float(os.environ.get("AI_BATCH_WINDOW_MS", "20")) / 1000,
+            lease_seconds=float(os.environ.get("AI_JOB_LEASE_S", "600")),
+            retry_delay=float(os.environ.get("AI_RETRY_DELAY_S", "5")),
+            **kwargs,
+        )
+
+    @property
+    def inline(self) -> bool:
+        return self.workers <= 0
+
+    # ---- 작업 등록 ----
+
+    def enqueue(self, db, measurement_ids):
+        """측정 저장과 같은 트랜잭션에서 작업을 등록합니다 (커밋은 호출 측 책임)."""
+        db.add_all([models.AIJob(measurement_id=mid, status=JOB_PENDING) for mid in measurement_ids])
+
+    def notify(self, db=None, measurement_ids=None):
+        """
+        커밋 이후 호출합니다. 워커 모드에서는 대기 중인 워커를 깨우고,
+        즉시 실행 모드에서는 해당 작업을 현재 요청에서 처리합니다.
+        """
+        if not self.inline:
+            self._wakeup.set()
+            return
+        if db is not None and measurement_ids:
+            self._run_batch(db, self._claim(db, measurement_ids=measurement_ids))
+
+    # ---- 워커 수명 주기 ----
+
+    def start(self):
+        with self.session_factory() as db:
+            self.recover(db)
+        if self.inline:
+            logger.info("AI job queue running in inline mode (AI_WORKERS=0).")
+            return
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._stopping.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"ai-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"AI job queue started with {self.workers} {self.mode} worker(s).")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def recover(self, db):
+        """
+        재시작 복구: 임대 시간(lease_seconds)이 지나도록 끝나지 않은 running 작업을 대기 상태로 되돌리고,
+        작업이 없는 미처리 측정(is_server_processed = 0)을 큐에 등록합니다.
+        다른 프로세스의 워커가 처리 중인 작업(임대 시간 이내)은 건드리지 않습니다.
+        """
+        expired = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.lease_seconds)
+        reset = db.execute(
+            update(models.AIJob)
+            .where(models.AIJob.status == JOB_RUNNING,
+                   or_(models.AIJob.started_at.is_(None), models.AIJob.started_at < expired))
+            .values(status=JOB_PENDING)
+        ).rowcount
+        orphan_ids = db.execute(
+            select(models.TreeMeasurement.id)
+            .where(func.coalesce(models.TreeMeasurement.is_server_processed, 0) == 0)
+            .where(~select(models.AIJob.id)
+                   .where(models.AIJob.measurement_id == models.TreeMeasurement.id)
+                   .exists())
+        ).scalars().all()
+        self.enqueue(db, orphan_ids)
+        db.commit()
+        if reset or orphan_ids:
+            logger.info(f"AI job queue recovery: {reset} job(s) reset, {len(orphan_ids)} measurement(s) enqueued.")
+
+    # ---- 처리 ----
+
+    def _claim(self, db, limit: int = 1, measurement_ids=None):
+        """
+        대기 작업을 원자적으로 running 상태로 전환하고 (job_id, measurement_id) 목록을 반환합니다.
+        임대 시간이 지난 running 작업(처리 중 종료된 프로세스의 작업)도 함께 다시 가져가므로
+        재시작 시점과 무관하게 실행 중인 워커가 회수합니다.
+        """
+        now = datetime.datetime.utcnow()
+        expired = now - datetime.timedelta(seconds=self.lease_seconds)
+        candidates = select(models.AIJob.id).where(or_(
+            and_(models.AIJob.status == JOB_PENDING,
+                 or_(models.AIJob.not_before.is_(None), models.AIJob.not_before <= now)),
+            and_(models.AIJob.status == JOB_RUNNING,
+                 or_(models.AIJob.started_at.is_(None), models.AIJob.started_at < expired)),
+        ))
+        if measurement_ids is not None:
+            candidates = candidates.where(models.AIJob.measurement_id.in_(measurement_ids))
+        else:
+            candidates = candidates.order_by(models.AIJob.id).limit(limit)
+        candidates = candidates.with_for_update(skip_locked=True)
+        rows = db.execute(
+            update(models.AIJob)
+            .where(models.AIJob.id.in_(candidates.scalar_subquery()))
+            .values(status=JOB_RUNNING, started_at=now,
+                    attempts=models.AIJob.attempts + 1)
+            .returning(models.AIJob.id, models.AIJob.measurement_id)
+        ).all()
+        db.commit()
+        return [(row.id, row.measurement_id) for row in rows]
+
+    def _analyze_batch(self, inputs):
+        if self._executor is not None:
+            # 풀 워커는 자신의 모델 레지스트리를 쓰므로 교체된 활성 버전을 명시적으로 전달
+            service = _ai_service()
+            return self._executor.submit(service.analyze_batch, inputs, service.model_version()).result()
+        return _ai_service().analyze_batch(inputs)
+
+    def _collect_batch(self, db):
+        """batch_size만큼 모일 때까지 batch_window 동안 추가 작업을 기다립니다."""
+        jobs = self._claim(db, limit=self.batch_size)
+        if not jobs or len(jobs) >= self.batch_size or self.batch_window <= 0:
+            return jobs
+        deadline = time.monotonic() + self.batch_window
+        while len(jobs) < self.batch_size and not self._stopping.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._wakeup.wait(remaining)
+            self._wakeup.clear()
+            jobs += self._claim(db, limit=self.batch_size - len(jobs))
+        return jobs
+
+    def _finish_jobs(self, db, job_ids):
+        db.execute(
+            update(models.AIJob)
+            .where(models.AIJob.id.in_(job_ids))
+            .values(status=JOB_DONE, error=None, finished_at=datetime.datetime.utcnow())
+        )
+
+    def _record_batch(self, size: int, elapsed_ms: float):
+        with self._batch_lock:
+            self._batches += 1
+            self._batched_items += size
+            self._batch_ms += elapsed_ms
+        metrics.AI_BATCH_SIZE.observe(size)
+
+    def _notify_processed(self, db, measurement_ids):
+        if self.on_processed and measurement_ids:
+            try:
+                self.on_processed(db, measurement_ids)
+            except Exception as e:
+                logger.error(f"AI post-processing hook failed: {e}")
+
+    def _run_batch(self, db, jobs):
+        """배치 단위 처리. 실패 시 원인 행을 격리하기 위해 작업별 처리로 전환합니다."""
+        if not jobs:
+            return
+        try:
+            batch = _ai_service().process_batch(
+                db, [measurement_id for _, measurement_id in jobs], analyze=self._analyze_batch,
+                on_write=self.on_write,
+            )
+            updated = set(batch.updated_ids)
+            self._finish_jobs(db, [job_id for job_id, mid in jobs if mid in updated])
+            missing = [job_id for job_id, mid in jobs if mid not in updated]
+            if missing:
+                db.execute(
+                    update(models.AIJob).where(models.AIJob.id.in_(missing))
+                    .values(status=JOB_FAILED, error="Measurement not found",
+                            finished_at=datetime.datetime.utcnow())
+                )
+            db.commit()
+            self._record_batch(len(jobs), batch.elapsed_ms)
+            metrics.AI_JOBS.inc(len(jobs) - len(missing), result="success")
+            if missing:
+                metrics.AI_JOBS.inc(len(missing), result="failure")
+            self._notify_processed(db, batch.updated_ids)
+        except Exception as batch_err:
+            db.rollback()
+            logger.error(f"Server AI batch error ({len(jobs)} jobs), retrying individually: {batch_err}")
+            for job_id, measurement_id in jobs:
+                self._run_job(db, job_id, measurement_id)
+
+    def _run_job(self, db, job_id: int, measurement_id: int):
+        job = db.get(models.AIJob, job_id)
+        try:
+            batch = _ai_service().process_batch(db, [measurement_id], analyze=self._analyze_batch,
+                                                on_write=self.on_write)
+            if not batch.updated_ids:
+                raise LookupError(f"Measurement {measurement_id} not found")
+            self._finish_jobs(db, [job_id])
+            db.commit()
+            self._record_batch(1, batch.elapsed_ms)
+            metrics.AI_JOBS.inc(result="success")
+            self._notify_processed(db, batch.updated_ids)
+            logger.info(f"Server-side AI processing successful for Measurement ID: {measurement_id}")
+        except Exception as ai_err:
+            db.rollback()
+            metrics.AI_JOBS.inc(result="failure")
+            job = db.get(models.AIJob, job_id)
+            now = datetime.datetime.utcnow()
+            job.status = JOB_PENDING if job.attempts < self.max_attempts else JOB_FAILED
+            job.error = str(ai_err)
+            job.finished_at = now
+            if job.status == JOB_PENDING:
+                # 연속 폴링에서 재시도 횟수를 바로 소진하지 않도록 지수 백오프
+                job.not_before = now + datetime.timedelta(seconds=self.retry_delay * 2 ** max(job.attempts - 1, 0))
+            db.commit()
+            logger.error(f"Server AI Job Error (job {job_id}, attempt {job.attempts}): {ai_err}")
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                with self.session_factory() as db:
+                    jobs = self._collect_batch(db)
+                    self._run_batch(db, jobs)
+            except Exception as e:
+                logger.error(f"AI worker error: {e}")
+                jobs = []
+            if not jobs:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    # ---- 상태 조회 ----
+
+    def stats(self, db) -> dict:
+        counts = dict(
+            db.query(models.AIJob.status, func.count(models.AIJob.id)).group_by(models.AIJob.status).all()
+        )
+        with self._batch_lock:
+            batches, items, batch_ms = self._batches, self._batched_items, self._batch_ms
+        return {
+            "workers": self.workers,
+            "mode": "inline" if self.inline else self.mode,
+            **{status: counts.get(status, 0) for status in (JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED)},
+            "batch_size": self.batch_size,
+            "batches": batches,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "avg_item_latency_ms": round(batch_ms / items, 3) if items else 0.0,
+        }
+
+    def latest_job(self, db, measurement_id: int):
+        return (
+            db.query(models.AIJob)
+            .filter(models.AIJob.measurement_id == measurement_id)
+            .order_by(models.AIJob.id.desc())
+            .first()
+        )
@@ -0,0 +1,262 @@
+import datetime
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 버전 이름이 sim-으로 시작하고 가중치가 없으면 NumPy 대체 모델 가중치를 만들어 사용
+STAND_IN_PREFIX = "sim-"
+WARMUP_BATCH = 64
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+@dataclass
+class LoadedModel:
+    version: str
+    architecture: str
+    model: object
+    path: str
+    weight_bytes: int
+    load_ms: float
+    warmup_ms: float
+    loaded_at: datetime.datetime
+
+    def predict(self, features):
+        return self.model.predict(features)
+
+
+class ModelRegistry:
+    """
+    서버 AI 모델 레지스트리 (프로세스당 하나).
+    버전별 가중치는 <root>/<version>/manifest.json + .npy 파일이며 np.load(mmap_mode="r")로 메모리 매핑합니다.
+    가중치 페이지는 페이지 캐시에 한 벌만 올라가므로 fork된 풀 워커와 다른 서버 프로세스가 같은 물리 메모리를 공유합니다.
+    버전마다 프로세스당 한 번만 로드하고 워밍업 추론(모든 가중치 페이지 적재)까지 마친 뒤 사용합니다.
+    activate()는 새 버전을 로드/워밍업한 후 활성 참조만 바꾸므로 진행 중인 배치는 이전 모델로 끝납니다.
+    활성 버전은 <root>/ACTIVE 파일에 기록되어 같은 디렉토리를 쓰는 다른 프로세스도 다음 배치부터 따라갑니다.
+    """
+
+    def __init__(self, root: str, default_version: str):
+        self.root = os.path.abspath(root)
+        self.default_version = default_version
+        self._models: Dict[str, LoadedModel] = {}
+        self._active: Optional[str] = None
+        self._active_mtime: Optional[float] = None
+        self._lock = threading.RLock()
+
+    # ---- 버전 ----
+
+    @property
+    def active_version(self) -> str:
+        self._sync_active()
+        return self._active or self.default_version
+
+    def _pointer_path(self) -> str:
+        return os.path.join(self.root, "ACTIVE")
+
+    def _sync_active(self):
+        """ACTIVE 파일이 바뀌었으면 (다른 프로세스의 activate) 활성 버전을 따라가고 이전 모델을 내려놓음"""
+        try:
+            mtime = os.stat(self._pointer_path()).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._active_mtime:
+            return
+        with self._lock:
+            try:
+                with open(self._pointer_path()) as f:
+                    version = f.read().strip()
+            except OSError:
+                return
+            self._active_mtime = mtime
+            if version and version != self._active:
+                self._active = version
+                self._retain(version)
+
+    def _retain(self, version: str):
+        # 사용 중인 배치는 LoadedModel 참조를 쥐고 있으므로 목록에서만 제거 (마지막 참조가 사라질 때 매핑 해제)
+        self._models = {v: m for v, m in self._models.items() if v == version}
+
+    def available(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, name, "manifest.json")))
+
+    # ---- 로드 ----
+
+    def get(self, version: Optional[str] = None) -> LoadedModel:
+        """버전(기본: 활성 버전) 모델. 이 프로세스에서 처음이면 로드 + 워밍업"""
+        version = version or self.active_version
+        model = self._models.get(version)
+        if model is None:
+            with self._lock:
+                model = self._models.get(version)
+                if model is None:
+                    model = self._load(version)
+                    self._models[version] = model
+        return model
+
+    def activate(self, version: str) -> LoadedModel:
+        """새 버전을 로드/워밍업한 뒤 활성 버전으로 교체합니다. 버전이 없으면 FileNotFoundError."""
+        model = self.get(version)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            staging = self._pointer_path() + f".{os.getpid()}"
+            with open(staging, "w") as f:
+                f.write(version)
+            os.replace(staging, self._pointer_path())
+            self._active_mtime = os.stat(self._pointer_path()).st_mtime_ns
+            previous, self._active = self._active or self.default_version, version
+            self._retain(version)
+        logger.info(f"AI model switched: {previous} -> {version}")
+        return model
+
+    def _load(self, version: str) -> LoadedModel:
+        if not _VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid model version: {version!r}")
+        path = os.path.join(self.root, version)
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            if not version.startswith(STAND_IN_PREFIX):
+                raise FileNotFoundError(f"Model version {version} not found in {self.root}")
+            stand_in_model = _stand_in_module()
+            stand_in_model.save(path, version, stand_in_model.create_weights(version))
+            logger.info(f"Created stand-in model weights for {version} in {path}")
+
+        import numpy as np
+
+        started = time.perf_counter()
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        architecture = manifest.get("architecture")
+        if architecture != _stand_in_module().ARCHITECTURE:
+            raise ValueError(f"Unsupported model architecture: {architecture}")
+        weights = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in manifest["weights"]}
+        model = _stand_in_module().StandInModel(weights)
+        loaded = time.perf_counter()
+        # 워밍업: 모든 가중치 페이지를 읽고 BLAS 초기화를 끝내 첫 실제 배치의 지연 시간을 없앰
+        model.predict(model.example_input(WARMUP_BATCH))
+        warmed = time.perf_counter()
+
+        result = LoadedModel(
+            version=version, architecture=architecture, model=model, path=path,
+            weight_bytes=model.weight_bytes,
+            load_ms=(loaded - started) * 1000, warmup_ms=(warmed - loaded) * 1000,
+            loaded_at=datetime.datetime.utcnow(),
+        )
+        memory = process_memory()
+        rss = f", rss={memory['rss_bytes'] / 2 ** 20:.1f}MB" if memory["rss_bytes"] else ""
+        logger.info(f"AI model {version} loaded: {result.weight_bytes / 2 ** 20:.1f}MB weights (memory-mapped), "
+                    f"load={result.load_ms:.1f}ms, warm-up={result.warmup_ms:.1f}ms{rss}")
+        return result
+
+    # ---- 상태 ----
+
+    def loaded(self) -> List[LoadedModel]:
+        return list(self._models.values())
+
+    def status(self) -> dict:
+        active = self.active_version
+        resident = mapped_resident_bytes(self.root)
+        return {
+            "active_version": active,
+            "default_version": self.default_version,
+            "available": self.available(),
+            "loaded": [
+                {
+                    "version": m.version,
+                    "architecture": m.architecture,
+                    "active": m.version == active,
+                    "weight_bytes": m.weight_bytes,
+                    "resident_bytes": resident.get(m.path, 0) if resident is not None else None,
+                    "load_ms": round(m.load_ms, 3),
+                    "warmup_ms": round(m.warmup_ms, 3),
+                    "loaded_at": m.loaded_at,
+                }
+                for m in self.loaded()
+            ],
+            "memory": process_memory(),
+        }
+
+
+def _stand_in_module():
+    try:
+        from services import stand_in_model
+    except ImportError:
+        from . import stand_in_model
+    return stand_in_model
+
+
+def process_memory() -> dict:
+    """
+    현재 프로세스 상주 메모리 (Linux /proc/self/status). rss_file_bytes는 파일 매핑 페이지로
+    메모리 매핑한 가중치가 여기에 포함되며 다른 프로세스와 공유됩니다. 다른 OS에서는 최대 RSS만 제공합니다.
+    """
+    memory = {"rss_bytes": None, "rss_anon_bytes": None, "rss_file_bytes": None}
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        for key, name in (("VmRSS", "rss_bytes"), ("RssAnon", "rss_anon_bytes"), ("RssFile", "rss_file_bytes")):
+            if key in fields:
+                memory[name] = int(fields[key].split()[0]) * 1024
+    except OSError:
+        try:
+            import resource
+            import sys
+
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory["rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+        except ImportError:
+            pass
+    return memory
+
+
+def mapped_resident_bytes(root: str) -> Optional[Dict[str, int]]:
+    """root 아래 버전 디렉토리별로 이 프로세스에 매핑되어 상주 중인 바이트 수 (Linux /proc/self/smaps)"""
+    root = os.path.abspath(root) + os.sep
+    resident: Dict[str, int] = {}
+    try:
+        with open("/proc/self/smaps") as f:
+            current = None
+            for line in f:
+                if line.startswith("Rss:"):
+                    if current is not None:
+                        resident[current] = resident.get(current, 0) + int(line.split()[1]) * 1024
+                elif not line.split(None, 1)[0].endswith(":"):
+                    # 매핑 헤더: 주소범위 권한 오프셋 장치 inode [경로]
+                    parts = line.split(None, 5)
+                    path = parts[5].strip() if len(parts) > 5 else ""
+                    current = os.path.dirname(path) if path.startswith(root) else None
+    except OSError:
+        return None
+    return resident
+
+
+def _default_root() -> str:
+    if os.environ.get("AI_MODEL_DIR"):
+        return os.environ["AI_MODEL_DIR"]
+    # Vercel에서는 /tmp 디렉토리만 쓰기 권한이 있음
+    if os.environ.get("VERCEL"):
+        return "/tmp/tree_map_models"
+    return os.path.join(BASE_DIR, "ai_models")
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(_default_root(), os.environ.get("AI_MODEL_VERSION", "sim-1"))
+    return _registry
@@ -0,0 +1,340 @@
+import datetime
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from sqlalchemy import func, or_, select, update
+
+try:
+    import models, metrics
+    from services.job_queue import _ai_service
+except ImportError:
+    from .. import models, metrics
+    from .job_queue import _ai_service
+
+logger = logging.getLogger(__name__)
+
+RUN_RUNNING = "running"
+RUN_PAUSED = "paused"
+RUN_DONE = "done"
+RUN_FAILED = "failed"
+UNFINISHED = (RUN_RUNNING, RUN_PAUSED)
+
+
+class ClaimLost(RuntimeError):
+    """다른 프로세스가 작업을 가져갔거나 (임대 만료 후) 대체함"""
+
+
+def _lower_priority(niceness: int):
+    """프로세스 풀 워커 초기화: 추론 연산이 요청 처리 프로세스의 CPU를 빼앗지 않도록 우선순위를 낮춤"""
+    if niceness > 0 and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class Reprocessor:
+    """
+    전체 재보정 작업. 측정을 id 순서의 청크로 읽어 프로세스 풀에 나눠 추론하고,
+    결과는 청크 단위 일괄 UPDATE로 기록합니다. 체크포인트(reprocess_runs.last_id)를 결과와 같은
+    트랜잭션에 기록하므로 중단 후 다시 시작하면 마지막으로 커밋된 청크 다음부터 이어집니다.
+    실시간 요청과 함께 실행할 수 있도록
+    - 쓰기 트랜잭션은 청크 하나로 짧게 유지하고 커밋 사이에 pause_ms만큼 쉬며 (SQLite 쓰기 잠금 양보)
+    - max_rows_per_sec로 처리량 상한을 두고
+    - 풀 워커 프로세스의 우선순위를 낮춥니다 (niceness).
+    on_write / on_processed는 AI 작업 큐와 같은 후속 처리 훅입니다 (통계, 변경 피드, 응답 캐시).
+    여러 프로세스(서버 워커, CLI)가 같은 작업을 동시에 실행하지 않도록 작업 행을 claim 토큰(owner)으로
+    원자적으로 가져가며, 청크 기록마다 updated_at을 갱신해 임대(lease_seconds)를 유지합니다.
+    기록 시 토큰이 바뀌었으면 (임대 만료 후 다른 프로세스가 가져감) 그 자리에서 멈춥니다.
+    """
+
+    def __init__(self, session_factory, workers: int = 2, chunk_size: int = 500, pause_ms: float = 10.0,
+                 max_rows_per_sec: float = 0.0, niceness: int = 10, on_write=None, on_processed=None,
+                 lease_seconds: float = 120.0):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.pause_seconds = pause_ms / 1000
+        self.max_rows_per_sec = max_rows_per_sec
+        self.niceness = niceness
+        self.on_write = on_write
+        self.on_processed = on_processed
+        self.lease_seconds = lease_seconds
+        self._owner: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._run_id: Optional[int] = None
+        self._rate = 0.0  # 최근 처리량 (rows/s)
+
+    @classmethod
+    def from_env(cls, session_factory, **kwargs):
+        return cls(
+            session_factory,
+            workers=int(os.environ.get("REPROCESS_WORKERS", max(1, (os.cpu_count() or 2) - 1))),
+            chunk_size=int(os.environ.get("REPROCESS_CHUNK_SIZE", "500")),
+            pause_ms=float(os.environ.get("REPROCESS_PAUSE_MS", "10")),
+            max_rows_per_sec=float(os.environ.get("REPROCESS_MAX_ROWS_PER_SEC", "0")),
+            niceness=int(os.environ.get("REPROCESS_NICE", "10")),
+            lease_seconds=float(os.environ.get("REPROCESS_LEASE_S", "120")),
+            **kwargs,
+        )
+
+    # ---- 작업 관리 ----
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def prepare(self, db, only_stale: bool = True):
+        """
+        실행할 작업 행을 claim 하여 반환합니다. 현재 모델 버전과 같은 only_stale의 미완료 작업(일시 중지 /
+        임대가 만료된 running)이 있으면 이어서 실행하고, 없으면 대상 측정 수를 세어 새 작업을 만듭니다.
+        다른 프로세스가 임대 중인 작업이 있으면 RuntimeError.
+        """
+        model_version = _ai_service().model_version()
+        R = models.ReprocessRun
+        token = uuid.uuid4().hex
+        now = datetime.datetime.utcnow()
+        claimable = or_(R.status == RUN_PAUSED, R.updated_at < now - datetime.timedelta(seconds=self.lease_seconds))
+        in_progress = RuntimeError("A reprocess run is already in progress")
+
+        run = db.query(R).filter(R.status.in_(UNFINISHED), R.model_version == model_version) \
+            .order_by(R.id.desc()).first()
+        if run is not None and bool(run.only_stale) == only_stale:
+            # 조건부 UPDATE로 가져감: 동시에 재개한 다른 프로세스(관리 API / CLI)와 한쪽만 성공
+            claimed = db.execute(update(R).where(R.id == run.id, R.status.in_(UNFINISHED), claimable).values(
+                status=RUN_RUNNING, owner=token, error=None, updated_at=now,
+            )).rowcount
+            db.commit()
+            if claimed != 1:
+                raise in_progress
+            self._owner = token
+            db.refresh(run)
+            logger.info(f"Resuming reprocess run {run.id} ({model_version}) after id {run.last_id}.")
+            return run
+
+        if db.query(R.id).filter(R.status.in_(UNFINISHED), ~claimable).first() is not None:
+            raise in_progress
+        # 다른 버전 또는 다른 only_stale의 미완료 작업은 더 이상 이어서 실행하지 않음
+        db.execute(update(R).where(R.status.in_(UNFINISHED), claimable).values(
+            status=RUN_FAILED, error="Superseded", owner=None,
+        ))
+        total = db.scalar(select(func.count(models.TreeMeasurement.id))
+                          .where(*self._target_filter(model_version, only_stale)))
+        run = R(model_version=model_version, status=RUN_RUNNING, only_stale=int(only_stale), last_id=0,
+                total=total, processed=0, owner=token)
+        db.add(run)
+        db.commit()
+        # 동시에 새 작업을 만든 프로세스가 있으면 물러남 (둘 다 물러나도 같은 청크를 두 번 처리하지는 않음)
+        if db.query(R.id).filter(R.status == RUN_RUNNING, R.id != run.id).first() is not None:
+            db.execute(update(R).where(R.id == run.id).values(status=RUN_FAILED, error="Duplicate", owner=None))
+            db.commit()
+            raise in_progress
+        self._owner = token
+        logger.info(f"Reprocess run {run.id} started: {total} measurements, model {model_version}.")
+        return run
+
+    def start(self, only_stale: bool = True) -> int:
+        """백그라운드 스레드에서 작업을 시작(또는 재개)하고 작업 ID를 반환합니다. 이미 실행 중이면 RuntimeError."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise RuntimeError("A reprocess run is already in progress")
+            with self.session_factory() as db:
+                run_id = self.prepare(db, only_stale).id
+            self._stopping.clear()
+            self._run_id = run_id
+            self._thread = threading.Thread(target=self.run, args=(run_id,), name="reprocess", daemon=True)
+            self._thread.start()
+        return run_id
+
+    def pause(self, timeout: float = 30.0) -> bool:
+        """실행 중인 작업을 현재 청크 커밋 후 멈춥니다 (상태 paused, start()로 재개)."""
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return False
+        self._stopping.set()
+        thread.join(timeout=timeout)
+        return True
+
+    def stop(self):
+        self.pause(timeout=5.0)
+
+    # ---- 실행 ----
+
+    @staticmethod
+    def _target_filter(model_version: str, only_stale: bool):
+        M = models.TreeMeasurement
+        if not only_stale:
+            return ()
+        return (or_(M.server_model_version.is_(None), M.server_model_version != model_version),)
+
+    def _next_ids(self, db, after_id: int, model_version: str, only_stale: bool):
+        M = models.TreeMeasurement
+        return db.execute(
+            select(M.id).where(M.id > after_id, *self._target_filter(model_version, only_stale))
+            .order_by(M.id).limit(self.chunk_size)
+        ).scalars().all()
+
+    def run(self, run_id: int):
+        """작업 실행 (현재 스레드). 추론은 최대 workers x 2개 청크를 미리 제출해 풀을 쉬지 않게 합니다."""
+        service = _ai_service()
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority,
+                                       initargs=(self.niceness,)) if self.workers > 0 else None
+        inflight = deque()  # (ids, inputs, future)
+        try:
+            with self.session_factory() as db:
+                run = db.get(models.ReprocessRun, run_id)
+                model_version, only_stale = run.model_version, bool(run.only_stale)
+                # 풀 워커가 fork되기 전에 로드해 두면 워커는 같은 가중치 매핑을 물려받음 (다시 로드하지 않음)
+                service.registry().get(model_version)
+                cursor = run.last_id or 0
+                window_started, window_rows = time.monotonic(), 0
+                exhausted = False
+                while True:
+                    # 읽기: 다음 청크의 입력을 읽어 풀에 제출
+                    while not exhausted and not self._stopping.is_set() \
+                            and len(inflight) < max(1, self.workers * 2):
+                        ids = self._next_ids(db, cursor, model_version, only_stale)
+                        db.rollback()  # 읽기 트랜잭션을 바로 끝내 WAL 체크포인트를 막지 않음
+                        if not ids:
+                            exhausted = True
+                            break
+                        cursor = ids[-1]
+                        inputs = service.load_inputs(db, ids)
+                        db.rollback()
+                        if executor is not None:
+                            future = executor.submit(service.analyze_batch, inputs, model_version)
+                        else:
+                            future = Future()
+                            future.set_result(service.analyze_batch(inputs, model_version))
+                        inflight.append((ids, inputs, future))
+                    if not inflight:
+                        break
+
+                    # 쓰기: 가장 오래된 청크 결과를 id 순서대로 기록 + 체크포인트
+                    ids, inputs, future = inflight.popleft()
+                    results = future.result()
+                    with metrics.stage("reprocess_write"):
+                        updated = self._write(db, run_id, ids[-1], inputs, results)
+                    self._notify(db, updated)
+
+                    window_rows += len(ids)
+                    elapsed = time.monotonic() - window_started
+                    if elapsed >= 1.0:
+                        self._rate = window_rows / elapsed
+                        window_started, window_rows = time.monotonic(), 0
+                    self._throttle(db, run_id, len(ids))
+
+                    if self._stopping.is_set() and not inflight:
+                        break
+
+                status = RUN_PAUSED if self._stopping.is_set() and not exhausted else RUN_DONE
+                self._finish(db, run_id, status)
+        except ClaimLost as e:
+            logger.warning(f"Reprocess run {run_id} stopped: {e}")
+        except Exception as e:
+            logger.error(f"Reprocess run {run_id} failed: {e}")
+            with self.session_factory() as db:
+                self._finish(db, run_id, RUN_FAILED, error=str(e))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._rate = 0.0
+
+    def _write(self, db, run_id: int, checkpoint: int, inputs, results):
+        """청크 결과와 체크포인트를 한 트랜잭션으로 커밋합니다."""
+        service = _ai_service()
+        try:
+            if self.on_write:
+                with self.on_write(db, [i["id"] for i in inputs]):
+                    updated = service.write_results(db, inputs, results)
+            else:
+                updated = service.write_results(db, inputs, results)
+            R = models.ReprocessRun
+            claimed = db.execute(update(R).where(*self._owned(run_id)).values(
+                last_id=checkpoint, processed=R.processed + len(updated), updated_at=datetime.datetime.utcnow(),
+            )).rowcount
+            if claimed != 1:
+                raise ClaimLost("the run was claimed by another process")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        metrics.AI_JOBS.inc(len(updated), result="reprocessed")
+        return updated
+
+    def _notify(self, db, measurement_ids):
+        if self.on_processed and measurement_ids:
+            try:
+                self.on_processed(db, measurement_ids)
+            except Exception as e:
+                logger.error(f"Reprocess post-processing hook failed: {e}")
+
+    def _owned(self, run_id: int):
+        R = models.ReprocessRun
+        return R.id == run_id, R.owner == self._owner, R.status == RUN_RUNNING
+
+    def _throttle(self, db, run_id: int, rows: int):
+        """커밋 사이 휴식 (다른 쓰기 요청에 잠금 양보) 및 처리량 상한. 쉬는 동안에도 임대를 갱신"""
+        delay = self.pause_seconds
+        if self.max_rows_per_sec > 0:
+            delay = max(delay, rows / self.max_rows_per_sec)
+        deadline = time.monotonic() + delay
+        while not self._stopping.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self._stopping.wait(min(remaining, max(self.lease_seconds / 3, 0.1))):
+                break
+            if deadline - time.monotonic() > 0:
+                R = models.ReprocessRun
+                db.execute(update(R).where(*self._owned(run_id)).values(updated_at=datetime.datetime.utcnow()))
+                db.commit()
+
+    def _finish(self, db, run_id: int, status: str, error: Optional[str] = None):
+        R = models.ReprocessRun
+        now = datetime.datetime.utcnow()
+        db.execute(update(R).where(*self._owned(run_id)).values(
+            status=status, error=error, updated_at=now, owner=None,
+            finished_at=now if status in (RUN_DONE, RUN_FAILED) else None,
+        ))
+        db.commit()
+        run = db.get(models.ReprocessRun, run_id)
+        logger.info(f"Reprocess run {run_id} {status}: {run.processed}/{run.total} measurements.")
+
+    # ---- 상태 조회 ----
+
+    def status(self, db, run_id: Optional[int] = None) -> Optional[dict]:
+        """작업 진행 상황 (run_id가 없으면 최근 작업). 처리량과 예상 남은 시간은 이 프로세스에서 실행 중일 때만."""
+        R = models.ReprocessRun
+        run = db.get(R, run_id) if run_id else db.query(R).order_by(R.id.desc()).first()
+        if run is None:
+            return None
+        active = self.running and self._run_id == run.id
+        elapsed = ((run.updated_at or run.started_at) - run.started_at).total_seconds() if run.started_at else 0
+        rate = self._rate if active else 0.0
+        remaining = max((run.total or 0) - (run.processed or 0), 0)
+        return {
+            "id": run.id,
+            "model_version": run.model_version,
+            "status": run.status,
+            "active": active,
+            "total": run.total or 0,
+            "processed": run.processed or 0,
+            "last_id": run.last_id or 0,
+            "progress": round((run.processed or 0) / run.total, 4) if run.total else 1.0,
+            "rows_per_sec": round(rate, 1),
+            "avg_rows_per_sec": round((run.processed or 0) / elapsed, 1) if elapsed > 0 else 0.0,
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+            "workers": self.workers,
+            "error": run.error,
+            "started_at": run.started_at,
+            "updated_at": run.updated_at,
+            "finished_at": run.finished_at,
+        }
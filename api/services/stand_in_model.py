@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from typing import Dict
+
+import numpy as np
+
+ARCHITECTURE = "stand-in-mlp"
+# 입력: dbh(cm), height(m), crown_width(m), ground_clearance(m)
+INPUT_FEATURES = ("dbh", "height", "crown_width", "ground_clearance")
+# 출력 헤드별 범위: 보정 배율 1 +- scale (tanh) 또는 lower + span * sigmoid
+OUTPUTS = (
+    ("server_dbh", "factor", 0.05),
+    ("server_height", "factor", 0.02),
+    ("server_crown_width", "factor", 0.10),
+    ("server_ground_clearance", "factor", 0.10),
+    ("server_health_score", "range", (70.0, 28.0)),
+    ("server_confidence", "range", (0.85, 0.14)),
+)
+# 입력 정규화 기준 (도시 수목 평균 / 표준편차 수준) - 결측값은 평균으로 대체
+INPUT_MEAN = (25.0, 8.0, 5.0, 2.0)
+INPUT_SCALE = (15.0, 4.0, 3.0, 1.0)
+
+
+class StandInModel:
+    """
+    실제 서버 모델(YOLO-seg / SAM / EfficientNet) 대신 CPU에서 쓰는 NumPy MLP.
+    가중치는 읽기 전용 배열(np.memmap)을 그대로 사용하며 복사하지 않습니다.
+    같은 입력에는 항상 같은 보정값을 내므로 같은 버전으로 재보정해도 결과가 바뀌지 않습니다.
+    """
+
+    def __init__(self, weights: Dict[str, np.ndarray]):
+        self.weights = weights
+        self.layers = sorted(name for name in weights if name.startswith("w"))
+
+    @property
+    def weight_bytes(self) -> int:
+        return sum(array.nbytes for array in self.weights.values())
+
+    def predict(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        """features: (n, 4) float64, NaN 허용. 반환: 출력 이름별 (n,) 보정값 (원본 결측이면 NaN)"""
+        mean = self.weights["input_mean"]
+        x = np.where(np.isnan(features), mean, features)
+        h = ((x - mean) / self.weights["input_scale"]).astype(np.float32)
+        for name in self.layers[:-1]:
+            h = np.tanh(h @ self.weights[name] + self.weights["b" + name[1:]])
+        last = self.layers[-1]
+        out = (h @ self.weights[last] + self.weights["b" + last[1:]]).astype(np.float64)
+
+        columns = {}
+        for i, (name, kind, param) in enumerate(OUTPUTS):
+            if kind == "factor":
+                columns[name] = features[:, i] * (1.0 + param * np.tanh(out[:, i]))
+            else:
+                lower, span = param
+                columns[name] = lower + span / (1.0 + np.exp(-out[:, i]))
+        return columns
+
+    @staticmethod
+    def example_input(n: int = 64) -> np.ndarray:
+        """워밍업용 입력 (결측값 포함)"""
+        rng = np.random.default_rng(0)
+        features = rng.normal(INPUT_MEAN, INPUT_SCALE, size=(n, len(INPUT_FEATURES))).clip(0.1)
+        features[::7, 2:] = np.nan
+        return features
+
+
+def create_weights(version: str, hidden: int = 64, layers: int = 2) -> Dict[str, np.ndarray]:
+    """버전 이름으로 시드를 정한 임의 가중치 (같은 버전은 항상 같은 가중치)"""
+    rng = np.random.default_rng(zlib.crc32(version.encode()))
+    sizes = [len(INPUT_FEATURES)] + [hidden] * layers + [len(OUTPUTS)]
+    weights = {
+        "input_mean": np.array(INPUT_MEAN, dtype=np.float32),
+        "input_scale": np.array(INPUT_SCALE, dtype=np.float32),
+    }
+    for i, (fan_in, fan_out) in enumerate(zip(sizes[:-1], sizes[1:])):
+        weights[f"w{i:02d}"] = (rng.standard_normal((fan_in, fan_out)) / np.sqrt(fan_in)).astype(np.float32)
+        weights[f"b{i:02d}"] = (rng.standard_normal(fan_out) * 0.1).astype(np.float32)
+    return weights
+
+
+def save(path: str, version: str, weights: Dict[str, np.ndarray]):
+    """
+    <path>/manifest.json + <이름>.npy 로 저장합니다. 임시 디렉토리에 쓴 뒤 이름을 바꾸므로
+    여러 프로세스가 동시에 만들어도 불완전한 버전이 보이지 않습니다. 이미 있으면 그대로 둡니다.
+    """
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{version}-", dir=parent)
+    try:
+        for name, array in weights.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump({"version": version, "architecture": ARCHITECTURE, "weights": sorted(weights)}, f, indent=2)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            if not os.path.exists(os.path.join(path, "manifest.json")):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
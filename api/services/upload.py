@@ -0,0 +1,164 @@
+import logging
+import os
+from typing import AsyncIterator, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart 0.0.12 이하
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+try:
+    import blob_store
+except ImportError:
+    from .. import blob_store
+
+logger = logging.getLogger(__name__)
+
+# 파트 이름: 측정 메타데이터(JSON, TreeMeasurementCreate와 같은 형식)와 사진(바이너리)
+METADATA_PART = "metadata"
+IMAGE_PART = "image"
+
+MAX_METADATA_BYTES = 64 * 1024
+MAX_IMAGE_BYTES = int(float(os.environ.get("UPLOAD_MAX_IMAGE_MB", "20")) * 1024 * 1024)
+# 파트 헤더 / 경계 문자열 여유분
+_MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadError(ValueError):
+    """잘못된 업로드 요청 (status_code로 응답 코드 지정)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MultipartUpload:
+    """
+    multipart/form-data 측정 업로드를 스트리밍으로 읽습니다.
+    사진 파트는 요청 청크가 도착하는 대로 저장소 writer에 기록하며 SHA-256을 함께 계산하므로,
+    요청당 메모리 사용량은 청크 크기 + 메타데이터 크기로 제한됩니다.
+    파일 쓰기는 스레드 풀에서 실행하여 큰 사진이 이벤트 루프를 막지 않도록 합니다.
+    사진은 commit() 전까지 임시 파일에 남아 있으며, 검증 실패 시 abort()로 버립니다.
+    """
+
+    def __init__(self, content_type: str, store: Optional[blob_store.BlobStore] = None,
+                 max_image_bytes: int = MAX_IMAGE_BYTES):
+        media_type, options = parse_options_header(content_type or "")
+        if media_type != b"multipart/form-data" or not options.get(b"boundary"):
+            raise UploadError("Content-Type must be multipart/form-data with a boundary", status_code=415)
+        self.store = store or blob_store.get_blob_store()
+        self.max_image_bytes = max_image_bytes
+        self.metadata: Optional[bytes] = None
+        self.image: Optional[blob_store.BlobWriter] = None
+
+        self._events: List[tuple] = []
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._part: Optional[str] = None
+        self._metadata = bytearray()
+        self._image_head = b""
+        self._parser = MultipartParser(options[b"boundary"], callbacks={
+            "on_part_begin": lambda: self._events.append(("begin", b"")),
+            "on_header_field": lambda data, start, end: self._events.append(("field", data[start:end])),
+            "on_header_value": lambda data, start, end: self._events.append(("value", data[start:end])),
+            "on_header_end": lambda: self._events.append(("header_end", b"")),
+            "on_headers_finished": lambda: self._events.append(("headers_finished", b"")),
+            "on_part_data": lambda data, start, end: self._events.append(("data", data[start:end])),
+            "on_part_end": lambda: self._events.append(("end", b"")),
+        })
+
+    @property
+    def max_body_bytes(self) -> int:
+        """Content-Length 사전 검사용 최대 요청 크기"""
+        return self.max_image_bytes + MAX_METADATA_BYTES + _MULTIPART_OVERHEAD
+
+    async def read(self, chunks: AsyncIterator[bytes]):
+        """요청 본문을 끝까지 읽습니다. 오류 시 기록 중인 사진을 버리고 UploadError를 발생시킵니다."""
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    self._parser.write(chunk)
+                    await self._handle_events()
+            self._parser.finalize()
+            await self._handle_events()
+        except FormParserError as e:
+            self.abort()
+            raise UploadError(f"Malformed multipart body: {e}")
+        except BaseException:
+            self.abort()
+            raise
+        if self.metadata is None:
+            self.abort()
+            raise UploadError(f"Missing '{METADATA_PART}' part")
+
+    async def _handle_events(self):
+        image_data = []
+        for event, data in self._events:
+            if event == "begin":
+                self._headers = {}
+                self._header_field = self._header_value = b""
+            elif event == "field":
+                self._header_field += data
+            elif event == "value":
+                self._header_value += data
+            elif event == "header_end":
+                self._headers[self._header_field.lower()] = self._header_value
+                self._header_field = self._header_value = b""
+            elif event == "headers_finished":
+                self._begin_part()
+            elif event == "data":
+                if self._part == IMAGE_PART:
+                    image_data.append(data)
+                elif self._part == METADATA_PART:
+                    self._metadata += data
+                    if len(self._metadata) > MAX_METADATA_BYTES:
+                        raise UploadError(f"'{METADATA_PART}' part exceeds {MAX_METADATA_BYTES} bytes",
+                                          status_code=413)
+            elif event == "end":
+                if self._part == METADATA_PART:
+                    self.metadata = bytes(self._metadata)
+                self._part = None
+        self._events.clear()
+        if image_data:
+            await run_in_threadpool(self._write_image, b"".join(image_data))
+
+    def _begin_part(self):
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = disposition.get(b"name", b"").decode("utf-8", "replace")
+        if (name == METADATA_PART and self.metadata is not None) or (name == IMAGE_PART and self.image is not None):
+            raise UploadError(f"Duplicate '{name}' part")
+        if name == IMAGE_PART:
+            # 파트 Content-Type은 사용하지 않고 commit에서 매직 넘버로 형식을 판별
+            self.image = self.store.writer("application/octet-stream", max_bytes=self.max_image_bytes)
+        elif name == METADATA_PART:
+            self._metadata = bytearray()
+        self._part = name if name in (METADATA_PART, IMAGE_PART) else None  # 그 외 파트는 무시
+
+    def _write_image(self, data: bytes):
+        if len(self._image_head) < 16:
+            self._image_head += data[:16]
+        try:
+            self.image.write(data)
+        except blob_store.BlobTooLarge as e:
+            raise UploadError(str(e), status_code=413)
+
+    def commit(self) -> dict:
+        """사진을 저장소에 반영하고 measurements 행에 넣을 참조 컬럼을 반환합니다 (사진이 없으면 빈 dict)."""
+        if self.image is None or not self.image.size:
+            self.abort()
+            return {}
+        # 클라이언트가 보낸 파트 Content-Type 대신 매직 넘버로 판별 (허용된 래스터 형식이 아니면 ValueError)
+        self.image.mime = blob_store.image_mime(self._image_head)
+        ref = self.image.commit()
+        self.image = None
+        return {"image_hash": ref.hash, "image_size": ref.size, "image_mime": ref.mime}
+
+    def abort(self):
+        if self.image is not None:
+            self.image.abort()
+            self.image = None
@@ -0,0 +1,80 @@
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 배포 번들에 포함되는 기본 스냅샷 위치 (tools/build_snapshot.py로 생성)
+DEFAULT_SNAPSHOT = os.path.join(BASE_DIR, "snapshot", "tree_map.db")
+
+
+def snapshot_path() -> Optional[str]:
+    """DB_SNAPSHOT 환경 변수 또는 기본 위치의 스냅샷 파일 (없으면 None). DB_SNAPSHOT=off로 비활성화."""
+    path = os.environ.get("DB_SNAPSHOT", DEFAULT_SNAPSHOT)
+    if path.lower() in ("", "0", "off", "none"):
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def sqlite_file(url: str) -> Optional[str]:
+    """SQLite 파일 DB 경로 (메모리 DB 또는 다른 DB면 None)"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or not parsed.database or parsed.database == ":memory:":
+        return None
+    return parsed.database
+
+
+def _copy_atomic(src: str, dst: str):
+    """임시 파일에 복사한 뒤 교체하여, 동시에 시작한 다른 프로세스가 반쯤 복사된 파일을 열지 않도록 합니다."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out, open(src, "rb") as f:
+            shutil.copyfileobj(f, out, 1024 * 1024)
+        os.replace(tmp_path, dst)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _copy_blobs(src_root: str, dst_root: str) -> int:
+    """스냅샷 사진 저장소에서 대상 저장소에 없는 Blob만 복사합니다."""
+    copied = 0
+    for dirpath, _, filenames in os.walk(src_root):
+        target_dir = os.path.join(dst_root, os.path.relpath(dirpath, src_root))
+        for name in filenames:
+            target = os.path.join(target_dir, name)
+            if not os.path.exists(target):
+                os.makedirs(target_dir, exist_ok=True)
+                _copy_atomic(os.path.join(dirpath, name), target)
+                copied += 1
+    return copied
+
+
+def restore_if_missing(url: str, blob_root: Optional[str] = None) -> bool:
+    """
+    SQLite DB 파일이 없거나 비어 있으면 미리 만들어 둔 스냅샷을 복사합니다.
+    (Vercel 등 /tmp가 매번 비어 있는 환경에서 스키마 생성과 샘플 시딩을 건너뜀)
+    엔진이 DB 파일을 처음 열기 전에 호출해야 하며, 복원했으면 True를 반환합니다.
+    """
+    target = sqlite_file(url)
+    source = snapshot_path()
+    if not target or not source:
+        return False
+    if os.path.exists(target) and os.path.getsize(target) > 0:
+        return False
+
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    _copy_atomic(source, target)
+    blobs = 0
+    source_blobs = os.path.join(os.path.dirname(source), "blobs")
+    if blob_root and os.path.isdir(source_blobs):
+        blobs = _copy_blobs(source_blobs, blob_root)
+    logger.info(f"Restored database snapshot {source} -> {target} ({blobs} blobs)")
+    return True
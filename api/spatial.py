@@ -0,0 +1,188 @@
+import math
+import logging
+from typing import Optional, Tuple
+
+from sqlalchemy import text, func, select, and_
+
+try:
+    import models
+except ImportError:
+    from . import models
+
+logger = logging.getLogger(__name__)
+
+# R*Tree 가상 테이블 이름 (SQLite 전용)
+RTREE_TABLE = "measurements_rtree"
+TREES_RTREE_TABLE = "trees_rtree"
+
+# 위도 1도당 거리 (m) - 반경 검색용 근사값
+METERS_PER_DEGREE = 111_320.0
+
+# 좌표 우선순위: 사용자 보정 좌표 > 산정 좌표
+EFFECTIVE_LATITUDE_SQL = "COALESCE(adjusted_tree_latitude, tree_latitude)"
+EFFECTIVE_LONGITUDE_SQL = "COALESCE(adjusted_tree_longitude, tree_longitude)"
+
+
+def effective_latitude():
+    return func.coalesce(models.TreeMeasurement.adjusted_tree_latitude, models.TreeMeasurement.tree_latitude)
+
+
+def effective_longitude():
+    return func.coalesce(models.TreeMeasurement.adjusted_tree_longitude, models.TreeMeasurement.tree_longitude)
+
+
+def ensure_spatial_index(engine):
+    """
+    측정 좌표(및 수목 개체 위치)에 대한 공간 인덱스를 생성하고 기존 데이터를 채웁니다.
+    SQLite는 R*Tree 가상 테이블과 트리거로 measurements 테이블과 동기화하며,
+    그 외 DB(PostgreSQL 등)는 보정 좌표 표현식 인덱스로 대체합니다.
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name != "sqlite":
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_measurements_effective_latlon "
+                f"ON measurements (({EFFECTIVE_LATITUDE_SQL}), ({EFFECTIVE_LONGITUDE_SQL}))"
+            ))
+            return
+
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} "
+            "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+        ))
+
+        # INSERT / UPDATE / DELETE 시 R*Tree 자동 동기화
+        lat = "COALESCE(new.adjusted_tree_latitude, new.tree_latitude)"
+        lon = "COALESCE(new.adjusted_tree_longitude, new.tree_longitude)"
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_ai AFTER INSERT ON measurements "
+            f"WHEN {lat} IS NOT NULL AND {lon} IS NOT NULL BEGIN "
+            f"INSERT OR REPLACE INTO {RTREE_TABLE} VALUES (new.id, {lat}, {lat}, {lon}, {lon}); "
+            "END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_au AFTER UPDATE OF "
+            "tree_latitude, tree_longitude, adjusted_tree_latitude, adjusted_tree_longitude "
+            "ON measurements BEGIN "
+            f"DELETE FROM {RTREE_TABLE} WHERE id = old.id; "
+            f"INSERT INTO {RTREE_TABLE} SELECT new.id, {lat}, {lat}, {lon}, {lon} "
+            f"WHERE {lat} IS NOT NULL AND {lon} IS NOT NULL; "
+            "END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_ad AFTER DELETE ON measurements BEGIN "
+            f"DELETE FROM {RTREE_TABLE} WHERE id = old.id; "
+            "END"
+        ))
+
+        # 인덱스 도입 이전에 저장된 행 채우기
+        result = conn.execute(text(
+            f"INSERT INTO {RTREE_TABLE} "
+            f"SELECT m.id, {EFFECTIVE_LATITUDE_SQL}, {EFFECTIVE_LATITUDE_SQL}, "
+            f"{EFFECTIVE_LONGITUDE_SQL}, {EFFECTIVE_LONGITUDE_SQL} "
+            "FROM measurements m "
+            f"WHERE {EFFECTIVE_LATITUDE_SQL} IS NOT NULL AND {EFFECTIVE_LONGITUDE_SQL} IS NOT NULL "
+            f"AND NOT EXISTS (SELECT 1 FROM {RTREE_TABLE} r WHERE r.id = m.id)"
+        ))
+        if result.rowcount:
+            logger.info(f"Spatial index backfilled with {result.rowcount} measurements.")
+
+        # 수목 개체 위치 (근접 개체 연결용)
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TREES_RTREE_TABLE} "
+            "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {TREES_RTREE_TABLE}_ai AFTER INSERT ON trees BEGIN "
+            f"INSERT OR REPLACE INTO {TREES_RTREE_TABLE} "
+            "VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude); "
+            "END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {TREES_RTREE_TABLE}_au AFTER UPDATE OF latitude, longitude "
+            "ON trees BEGIN "
+            f"UPDATE {TREES_RTREE_TABLE} SET min_lat = new.latitude, max_lat = new.latitude, "
+            "min_lon = new.longitude, max_lon = new.longitude WHERE id = new.id; "
+            "END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {TREES_RTREE_TABLE}_ad AFTER DELETE ON trees BEGIN "
+            f"DELETE FROM {TREES_RTREE_TABLE} WHERE id = old.id; "
+            "END"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {TREES_RTREE_TABLE} SELECT t.id, t.latitude, t.latitude, t.longitude, t.longitude "
+            f"FROM trees t WHERE NOT EXISTS (SELECT 1 FROM {TREES_RTREE_TABLE} r WHERE r.id = t.id)"
+        ))
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """'minLat,minLon,maxLat,maxLon' 문자열을 파싱합니다."""
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'minLat,minLon,maxLat,maxLon'")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox minimum must not exceed maximum")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def radius_bbox(lat: float, lon: float, radius: float) -> Tuple[float, float, float, float]:
+    """중심점과 반경(m)을 감싸는 bbox를 계산합니다."""
+    if radius <= 0:
+        raise ValueError("radius must be positive")
+    d_lat = radius / METERS_PER_DEGREE
+    d_lon = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
+
+
+def parse_spatial_params(bbox: Optional[str] = None, lat: Optional[float] = None,
+                         lon: Optional[float] = None, radius: Optional[float] = None):
+    """
+    API 쿼리 파라미터(bbox 또는 lat/lon/radius)를 검증하여 (bbox, near) 필터를 반환합니다.
+    형식 오류 시 ValueError
+    """
+    bbox_filter = parse_bbox(bbox) if bbox else None
+    near_filter = None
+    if lat is not None or lon is not None or radius is not None:
+        if lat is None or lon is None or radius is None:
+            raise ValueError("lat, lon and radius must be given together")
+        radius_bbox(lat, lon, radius)
+        near_filter = (lat, lon, radius)
+    return bbox_filter, near_filter
+
+
+def apply_spatial_filter(query, bind, bbox: Optional[Tuple[float, float, float, float]] = None,
+                         near: Optional[Tuple[float, float, float]] = None):
+    """
+    bbox 또는 반경(near = (lat, lon, radius_m)) 조건을 쿼리(Query 또는 select)에 적용합니다.
+    R*Tree로 후보 ID를 좁힌 뒤 실제 좌표로 정확히 재검사합니다.
+    (R*Tree는 32비트 float로 저장되어 경계가 바깥쪽으로 반올림됨)
+    """
+    if near is not None:
+        bbox = radius_bbox(*near)
+    if bbox is None:
+        return query
+
+    min_lat, min_lon, max_lat, max_lon = bbox
+    lat_col, lon_col = effective_latitude(), effective_longitude()
+
+    if bind.dialect.name == "sqlite":
+        candidates = select(text("id")).select_from(text(RTREE_TABLE)).where(text(
+            "min_lat <= :max_lat AND max_lat >= :min_lat AND min_lon <= :max_lon AND max_lon >= :min_lon"
+        ).bindparams(min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon))
+        query = query.filter(models.TreeMeasurement.id.in_(candidates))
+
+    query = query.filter(and_(
+        lat_col.between(min_lat, max_lat),
+        lon_col.between(min_lon, max_lon),
+    ))
+
+    if near is not None:
+        # 등장방형 근사 거리 (수 km 이내에서는 충분히 정확)
+        lat0, lon0, radius = near
+        lon_scale = math.cos(math.radians(lat0))
+        d_lat = (lat_col - lat0) * METERS_PER_DEGREE
+        d_lon = (lon_col - lon0) * (METERS_PER_DEGREE * lon_scale)
+        query = query.filter(d_lat * d_lat + d_lon * d_lon <= radius * radius)
+
+    return query
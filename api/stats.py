@@ -0,0 +1,400 @@
+import math
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+try:
+    import models, spatial
+    from clusters import lonlat_to_tile, tile_bounds
+    from database import additive_upsert
+except ImportError:
+    from . import models, spatial
+    from .clusters import lonlat_to_tile, tile_bounds
+    from .database import additive_upsert
+
+logger = logging.getLogger(__name__)
+
+# 통계 구역 격자: 이 줌의 타일 (서울 위도에서 약 1.9km x 1.9km)
+STATS_ZOOM = 14
+
+# 분포를 집계하는 측정 지표와 고정 히스토그램 구간 (구간 폭, 구간 수 - 마지막 구간은 상한 없음)
+HISTOGRAMS = {
+    "dbh": (10.0, 10),          # cm
+    "height": (2.0, 15),        # m
+    "crown_width": (1.0, 15),   # m
+    "health_score": (10.0, 10), # 0~100
+}
+FIELDS = tuple(HISTOGRAMS)
+# 스마트폰 측정값 대비 서버 AI 보정값 (server_* - 원본)
+SERVER_FIELDS = {name: f"server_{name}" for name in FIELDS}
+
+_SOURCE_COLUMNS = (
+    "id", "species", *FIELDS, "is_server_processed", "server_species", *SERVER_FIELDS.values(),
+)
+
+Cell = Tuple[int, int]
+Range = Tuple[int, int, int, int]  # 셀 범위 (x0, y0, x1, y1), 양 끝 포함
+
+
+def bucket_of(metric: str, value: float) -> int:
+    width, count = HISTOGRAMS[metric]
+    return min(max(int(value // width), 0), count - 1)
+
+
+class Aggregate:
+    """
+    (셀, 수종)별 누적 집계. 삽입은 +1, 보정 결과 교체 전 기존 보정값 제외는 -1 가중치로 더합니다.
+    DB 사전 집계 행과 원시 측정 행(구역 경계)에서 만든 값을 같은 구조로 합칠 수 있습니다.
+    """
+
+    def __init__(self):
+        self.groups = defaultdict(lambda: [0, 0, 0])  # (cx, cy, species) -> count, processed, mismatch
+        self.metrics = defaultdict(lambda: [0, 0.0, 0.0, 0.0])  # (cx, cy, species, metric) -> n, sum, sq, abs
+        self.histograms = defaultdict(int)  # (cx, cy, species, metric, bucket) -> count
+
+    def add_measurement(self, cell: Cell, row, sign: int = 1):
+        key = (*cell, row.species or "")
+        self.groups[key][0] += sign
+        for name in FIELDS:
+            value = getattr(row, name)
+            if value is None:
+                continue
+            agg = self.metrics[(*key, name)]
+            agg[0] += sign
+            agg[1] += sign * value
+            agg[2] += sign * value * value
+            agg[3] += sign * abs(value)
+            self.histograms[(*key, name, bucket_of(name, value))] += sign
+
+    def add_corrections(self, cell: Cell, row, sign: int = 1):
+        if not row.is_server_processed:
+            return
+        key = (*cell, row.species or "")
+        group = self.groups[key]
+        group[1] += sign
+        # 서버 재식별 수종이 원본 수종명으로 시작하면 (세부 수종 / 검증 표기 추가) 일치로 봄
+        if row.server_species and row.species and not row.server_species.startswith(row.species):
+            group[2] += sign
+        for name, server_name in SERVER_FIELDS.items():
+            value, server_value = getattr(row, name), getattr(row, server_name)
+            if value is None or server_value is None:
+                continue
+            delta = server_value - value
+            agg = self.metrics[(*key, f"delta_{name}")]
+            agg[0] += sign
+            agg[1] += sign * delta
+            agg[2] += sign * delta * delta
+            agg[3] += sign * abs(delta)
+
+    def prune(self):
+        """증감이 상쇄된 항목 제거 (재보정처럼 빼고 더한 값이 대부분 같은 경우 UPSERT 수를 줄임)"""
+        self.groups = {k: v for k, v in self.groups.items() if any(v)}
+        self.metrics = {k: v for k, v in self.metrics.items() if v[0] or v[1] or v[2] or v[3]}
+        self.histograms = {k: v for k, v in self.histograms.items() if v}
+
+    def write(self, db):
+        additive_upsert(db, models.StatsGroup.__table__, ("cell_x", "cell_y", "species"), [
+            {"cell_x": cx, "cell_y": cy, "species": s, "count": a[0], "processed": a[1], "species_mismatch": a[2]}
+            for (cx, cy, s), a in self.groups.items()
+        ])
+        additive_upsert(db, models.StatsMetric.__table__, ("cell_x", "cell_y", "species", "metric"), [
+            {"cell_x": cx, "cell_y": cy, "species": s, "metric": m,
+             "n": a[0], "total": a[1], "total_sq": a[2], "total_abs": a[3]}
+            for (cx, cy, s, m), a in self.metrics.items()
+        ])
+        additive_upsert(db, models.StatsHistogram.__table__, ("cell_x", "cell_y", "species", "metric", "bucket"), [
+            {"cell_x": cx, "cell_y": cy, "species": s, "metric": m, "bucket": b, "count": c}
+            for (cx, cy, s, m, b), c in self.histograms.items()
+        ])
+
+
+def _cell(lat, lon) -> Optional[Cell]:
+    if lat is None or lon is None:
+        return None
+    return lonlat_to_tile(lat, lon, STATS_ZOOM)
+
+
+def _interior(bbox) -> Optional[Range]:
+    """bbox 안에 완전히 포함되는 셀 범위 (없으면 None)"""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    x0, y0 = lonlat_to_tile(max_lat, min_lon, STATS_ZOOM)
+    x1, y1 = lonlat_to_tile(min_lat, max_lon, STATS_ZOOM)
+    # 모서리 셀은 bbox 경계와 정확히 맞을 때만 포함
+    if tile_bounds(STATS_ZOOM, x0, y0)[1] < min_lon:
+        x0 += 1
+    if tile_bounds(STATS_ZOOM, x0, y0)[2] > max_lat:
+        y0 += 1
+    if tile_bounds(STATS_ZOOM, x1, y1)[3] > max_lon:
+        x1 -= 1
+    if tile_bounds(STATS_ZOOM, x1, y1)[0] < min_lat:
+        y1 -= 1
+    if x0 > x1 or y0 > y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def _strips(bbox, interior: Optional[Range]) -> List[Tuple[float, float, float, float]]:
+    """bbox에서 내부 셀 영역을 뺀 경계 영역 (최대 4개 띠)"""
+    if interior is None:
+        return [bbox]
+    min_lat, min_lon, max_lat, max_lon = bbox
+    x0, y0, x1, y1 = interior
+    south, west, _, _ = tile_bounds(STATS_ZOOM, x0, y1)
+    _, _, north, east = tile_bounds(STATS_ZOOM, x1, y0)
+    strips = [
+        (north, min_lon, max_lat, max_lon),
+        (min_lat, min_lon, south, max_lon),
+        (south, min_lon, north, west),
+        (south, east, north, max_lon),
+    ]
+    return [s for s in strips if s[0] <= s[2] and s[1] <= s[3]]
+
+
+def _summary(n, total, total_sq, total_abs=None) -> dict:
+    if not n:
+        return {"count": 0, "mean": None, "std": None}
+    mean = total / n
+    variance = max(total_sq / n - mean * mean, 0.0)
+    summary = {"count": n, "mean": round(mean, 3), "std": round(math.sqrt(variance), 3)}
+    if total_abs is not None:
+        summary["mean_abs"] = round(total_abs / n, 3)
+    return summary
+
+
+class StatsIndex:
+    """
+    인벤토리 통계 (수종별 개체 수, 지표 분포, 평균 건강도, 서버 AI 보정량)를 격자 셀 x 수종 단위
+    누적 합과 고정 구간 히스토그램으로 유지합니다. 측정 삽입 시, 그리고 AI 보정 결과 기록 시
+    같은 트랜잭션에서 증분 갱신하므로, 조회 비용은 전체 측정 수가 아니라 셀 x 수종 수에 비례합니다.
+    bbox 조회는 bbox 안에 완전히 포함된 셀은 사전 집계를, 경계에 걸친 부분은 공간 인덱스로 원시 행을
+    읽어 합치므로 결과는 정확합니다 (원시 행 조회 범위는 bbox 둘레의 띠로 제한됨).
+    """
+
+    # ---- 집계 갱신 ----
+
+    @staticmethod
+    def _source_columns():
+        return (
+            spatial.effective_latitude().label("lat"),
+            spatial.effective_longitude().label("lon"),
+            *(getattr(models.TreeMeasurement, name) for name in _SOURCE_COLUMNS),
+        )
+
+    def _rows(self, db, measurement_ids):
+        return db.execute(
+            select(*self._source_columns()).where(models.TreeMeasurement.id.in_(measurement_ids))
+        ).all()
+
+    def record(self, db, measurement_ids):
+        """새 측정을 통계에 반영합니다 (측정 저장과 같은 트랜잭션)."""
+        if not measurement_ids:
+            return
+        agg = Aggregate()
+        for row in self._rows(db, measurement_ids):
+            cell = _cell(row.lat, row.lon)
+            if cell is not None:
+                agg.add_measurement(cell, row)
+                agg.add_corrections(cell, row)
+        agg.write(db)
+
+    def _add_corrections(self, agg: Aggregate, rows, sign: int):
+        for row in rows:
+            cell = _cell(row.lat, row.lon)
+            if cell is not None:
+                agg.add_corrections(cell, row, sign)
+
+    @contextmanager
+    def tracking_corrections(self, db, measurement_ids):
+        """
+        서버 AI 보정 결과 기록을 감쌉니다 (같은 트랜잭션): 기록 전 기존 보정값을 빼고 기록 후 새 값을 더하므로
+        재처리해도 중복 집계되지 않습니다. 전후 차이만 한 번에 기록하며, 변화가 없는 집계 행은 건너뜁니다.
+        """
+        before = self._rows(db, measurement_ids)
+        yield
+        agg = Aggregate()
+        self._add_corrections(agg, before, -1)
+        self._add_corrections(agg, self._rows(db, measurement_ids), 1)
+        agg.prune()
+        agg.write(db)
+
+    def rebuild(self, db, chunk_size: int = 5000) -> int:
+        """전체 측정 데이터로 통계를 다시 만듭니다 (초기 구축 / 수동 복구용)."""
+        db.query(models.StatsHistogram).delete()
+        db.query(models.StatsMetric).delete()
+        db.query(models.StatsGroup).delete()
+        total = 0
+        result = db.execute(select(*self._source_columns()).execution_options(yield_per=chunk_size))
+        for partition in result.partitions(chunk_size):
+            agg = Aggregate()
+            for row in partition:
+                cell = _cell(row.lat, row.lon)
+                if cell is not None:
+                    agg.add_measurement(cell, row)
+                    agg.add_corrections(cell, row)
+            agg.write(db)
+            total += len(partition)
+        db.commit()
+        logger.info(f"Inventory statistics rebuilt from {total} measurements.")
+        return total
+
+    def ensure_built(self, db):
+        """통계 테이블이 비어 있고 측정 데이터가 있으면 재구축합니다."""
+        has_groups = db.query(models.StatsGroup.cell_x).first() is not None
+        if not has_groups and db.query(models.TreeMeasurement.id).first() is not None:
+            self.rebuild(db)
+
+    # ---- 조회 ----
+
+    def query(self, db, bbox=None, species: Optional[Sequence[str]] = None, by_cell: bool = False) -> dict:
+        """
+        통계 조회. bbox가 없으면 전체, species는 수종 목록 (정확히 일치).
+        by_cell이면 구역(격자 셀)별 개체 수 / 평균 DBH / 평균 건강도를 함께 반환합니다.
+        """
+        interior = _interior(bbox) if bbox else None
+        agg = Aggregate()
+        if bbox is None or interior is not None:
+            self._load_summaries(db, agg, interior, species, by_cell)
+        if bbox is not None:
+            self._load_boundary(db, agg, bbox, interior, species, by_cell)
+        return self._result(agg, by_cell)
+
+    def _filters(self, model, interior: Optional[Range], species):
+        conditions = []
+        if interior is not None:
+            x0, y0, x1, y1 = interior
+            conditions += [model.cell_x.between(x0, x1), model.cell_y.between(y0, y1)]
+        if species:
+            conditions.append(model.species.in_([s or "" for s in species]))
+        return conditions
+
+    def _load_summaries(self, db, agg: Aggregate, interior, species, by_cell: bool):
+        """사전 집계 행을 (셀 생략 시 수종 단위로) 합산해 읽습니다."""
+        cells = lambda model: (model.cell_x, model.cell_y) if by_cell else ()
+        unpack = (lambda row: ((row[0], row[1]), row[2:])) if by_cell else (lambda row: ((0, 0), row))
+
+        G = models.StatsGroup
+        for row in db.query(*cells(G), G.species, func.sum(G.count), func.sum(G.processed),
+                            func.sum(G.species_mismatch)) \
+                .filter(*self._filters(G, interior, species)).group_by(*cells(G), G.species):
+            cell, (name, count, processed, mismatch) = unpack(row)
+            group = agg.groups[(*cell, name)]
+            group[0] += count or 0
+            group[1] += processed or 0
+            group[2] += mismatch or 0
+
+        M = models.StatsMetric
+        for row in db.query(*cells(M), M.species, M.metric, func.sum(M.n), func.sum(M.total),
+                            func.sum(M.total_sq), func.sum(M.total_abs)) \
+                .filter(*self._filters(M, interior, species)).group_by(*cells(M), M.species, M.metric):
+            cell, (name, metric, n, total, total_sq, total_abs) = unpack(row)
+            values = agg.metrics[(*cell, name, metric)]
+            values[0] += n or 0
+            values[1] += total or 0.0
+            values[2] += total_sq or 0.0
+            values[3] += total_abs or 0.0
+
+        # 히스토그램은 수종 / 셀 구분 없이 지표별로만 사용
+        H = models.StatsHistogram
+        for metric, bucket, count in db.query(H.metric, H.bucket, func.sum(H.count)) \
+                .filter(*self._filters(H, interior, species)).group_by(H.metric, H.bucket):
+            agg.histograms[(0, 0, "", metric, bucket)] += count or 0
+
+    def _load_boundary(self, db, agg: Aggregate, bbox, interior, species, by_cell: bool):
+        """bbox 경계에 걸친 셀 부분은 공간 인덱스로 원시 행을 읽어 집계합니다."""
+        boundary = Aggregate()
+        seen = set()
+        min_lat, min_lon, max_lat, max_lon = bbox
+        for strip in _strips(bbox, interior):
+            query = select(*self._source_columns())
+            if species:
+                query = query.where(models.TreeMeasurement.species.in_(species))
+            query = spatial.apply_spatial_filter(query, db.get_bind(), bbox=strip)
+            for row in db.execute(query):
+                # 띠끼리 맞닿은 경계의 행은 한 번만, bbox 밖 / 사전 집계에 포함된 셀의 행은 제외
+                if row.id in seen or not (min_lat <= row.lat <= max_lat and min_lon <= row.lon <= max_lon):
+                    continue
+                seen.add(row.id)
+                cell = _cell(row.lat, row.lon)
+                if interior is not None and interior[0] <= cell[0] <= interior[2] \
+                        and interior[1] <= cell[1] <= interior[3]:
+                    continue
+                if not by_cell:
+                    cell = (0, 0)
+                boundary.add_measurement(cell, row)
+                boundary.add_corrections(cell, row)
+
+        for key, values in boundary.groups.items():
+            target = agg.groups[key]
+            for i, v in enumerate(values):
+                target[i] += v
+        for key, values in boundary.metrics.items():
+            target = agg.metrics[key]
+            for i, v in enumerate(values):
+                target[i] += v
+        for (_, _, _, metric, bucket), count in boundary.histograms.items():
+            agg.histograms[(0, 0, "", metric, bucket)] += count
+
+    @staticmethod
+    def _result(agg: Aggregate, by_cell: bool) -> dict:
+        totals = [0, 0, 0]
+        species_counts = defaultdict(int)
+        cell_counts = defaultdict(int)
+        for (cx, cy, name), (count, processed, mismatch) in agg.groups.items():
+            totals[0] += count
+            totals[1] += processed
+            totals[2] += mismatch
+            species_counts[name] += count
+            cell_counts[(cx, cy)] += count
+
+        metric_totals = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        species_metrics = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        cell_metrics = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        for (cx, cy, name, metric), values in agg.metrics.items():
+            for target in (metric_totals[metric], species_metrics[(name, metric)], cell_metrics[(cx, cy, metric)]):
+                for i, v in enumerate(values):
+                    target[i] += v
+
+        histograms = defaultdict(dict)
+        for (_, _, _, metric, bucket), count in agg.histograms.items():
+            histograms[metric][bucket] = histograms[metric].get(bucket, 0) + count
+
+        def mean(values):
+            return round(values[1] / values[0], 3) if values[0] else None
+
+        metrics_out = {}
+        for name in FIELDS:
+            width, buckets = HISTOGRAMS[name]
+            summary = _summary(*metric_totals[name][:3])
+            summary["histogram"] = [
+                {"lower": i * width, "upper": (i + 1) * width if i < buckets - 1 else None,
+                 "count": histograms[name].get(i, 0)}
+                for i in range(buckets)
+            ]
+            metrics_out[name] = summary
+
+        result = {
+            "count": totals[0],
+            "processed": totals[1],
+            "species_mismatch": totals[2],
+            "metrics": metrics_out,
+            "corrections": {name: _summary(*metric_totals[f"delta_{name}"]) for name in FIELDS},
+            "species": sorted(
+                ({"species": name or None, "count": count,
+                  "mean_dbh": mean(species_metrics[(name, "dbh")]),
+                  "mean_height": mean(species_metrics[(name, "height")]),
+                  "mean_health": mean(species_metrics[(name, "health_score")])}
+                 for name, count in species_counts.items() if count > 0),
+                key=lambda s: (-s["count"], s["species"] or ""),
+            ),
+        }
+        if by_cell:
+            result["cells"] = [
+                {"cell_x": cx, "cell_y": cy, "bounds": list(tile_bounds(STATS_ZOOM, cx, cy)), "count": count,
+                 "mean_dbh": mean(cell_metrics[(cx, cy, "dbh")]),
+                 "mean_health": mean(cell_metrics[(cx, cy, "health_score")])}
+                for (cx, cy), count in sorted(cell_counts.items()) if count > 0
+            ]
+        return result
@@ -0,0 +1,170 @@
+import logging
+import sys
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect, insert, select, text
+from sqlalchemy.exc import DBAPIError
+
+try:
+    import models
+except ImportError:
+    from . import models
+
+logger = logging.getLogger(__name__)
+
+TABLE = "measurement_telemetry"
+# 분리 이전 measurements 컬럼 구성의 호환 뷰 (읽기 전용)
+VIEW = "measurements_full"
+
+# 측정 행에서 분리한 원시 센서 컬럼 (분리 이전 measurements 컬럼 순서)
+IMU_FIELDS = (
+    "accelerometer_x", "accelerometer_y", "accelerometer_z",
+    "gyroscope_x", "gyroscope_y", "gyroscope_z",
+    "magnetometer_x", "magnetometer_y", "magnetometer_z",
+    "device_pitch", "device_roll", "device_azimuth",
+)
+ENVIRONMENT_FIELDS = ("ambient_light", "pressure", "altitude", "temperature")
+CAMERA_FIELDS = ("image_width", "image_height", "focal_length", "camera_distance")
+DEVICE_FIELDS = ("device_model", "os_version", "app_version")
+FIELDS = IMU_FIELDS + ENVIRONMENT_FIELDS + CAMERA_FIELDS + DEVICE_FIELDS
+
+# 센서 샘플 시퀀스: <센서>_samples BLOB에 float32 (x, y, z)를 반복해 담음
+SAMPLE_SENSORS = ("accelerometer", "gyroscope", "magnetometer")
+SAMPLE_COLUMNS = ("sample_interval_ms",) + tuple(f"{sensor}_samples" for sensor in SAMPLE_SENSORS)
+COLUMNS = FIELDS + SAMPLE_COLUMNS
+_COLUMN_SET = frozenset(COLUMNS)
+
+
+def _view_columns() -> List[str]:
+    # 분리 이전에는 센서 컬럼이 measured_at 바로 뒤에 있었음
+    names = [column.name for column in models.TreeMeasurement.__table__.columns]
+    at = names.index("measured_at") + 1
+    return names[:at] + list(FIELDS) + names[at:]
+
+
+VIEW_COLUMNS = _view_columns()
+
+
+# ---- float32 배열 BLOB ----
+
+def pack_vectors(vectors: Optional[Sequence[Sequence[float]]]) -> Optional[bytes]:
+    """[(x, y, z), ...] -> 리틀 엔디언 float32 BLOB (12바이트 x 샘플 수). 비어 있으면 None"""
+    if not vectors:
+        return None
+    values = array("f", [value for vector in vectors for value in vector])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_vectors(blob: Optional[bytes], width: int = 3) -> Optional[List[List[float]]]:
+    """pack_vectors의 역변환. 값은 float32 정밀도의 짧은 십진 표현으로 돌려줌 (0.02 -> 0.02, 0.0199999995... 아님)"""
+    if blob is None:
+        return None
+    values = array("f")
+    values.frombytes(blob)
+    if sys.byteorder != "little":
+        values.byteswap()
+    decoded = [float(format(value, ".7g")) for value in values]
+    return [decoded[i:i + width] for i in range(0, len(decoded), width)]
+
+
+def sample_columns(samples) -> dict:
+    """schemas.IMUSamples (또는 None) -> 샘플 컬럼 값 (모든 행이 같은 키를 갖도록 항상 전체 컬럼)"""
+    if samples is None:
+        return dict.fromkeys(SAMPLE_COLUMNS)
+    values = {"sample_interval_ms": samples.interval_ms}
+    for sensor in SAMPLE_SENSORS:
+        values[f"{sensor}_samples"] = pack_vectors(getattr(samples, sensor))
+    return values
+
+
+# ---- 저장 ----
+
+def split(row: dict) -> Tuple[dict, dict]:
+    """측정 행 dict -> (measurements 컬럼, measurement_telemetry 컬럼). 없는 센서 컬럼은 None"""
+    measurement = {name: value for name, value in row.items() if name not in _COLUMN_SET}
+    return measurement, {name: row.get(name) for name in COLUMNS}
+
+
+def insert_rows(db, measurement_ids: Sequence[int], rows: Sequence[dict]):
+    """측정 ID별 센서 데이터 일괄 INSERT (값이 하나도 없는 측정은 행을 만들지 않음, 커밋은 호출 측 책임)"""
+    params = [
+        dict(values, measurement_id=measurement_id)
+        for measurement_id, values in zip(measurement_ids, rows)
+        if any(value is not None for value in values.values())
+    ]
+    if params:
+        db.execute(insert(models.MeasurementTelemetry.__table__), params)
+
+
+# ---- 조회 ----
+
+def read(db, measurement_id: int) -> Optional[dict]:
+    """측정 하나의 센서 데이터 (schemas.MeasurementTelemetry 필드). 측정이 없으면 None"""
+    M, T = models.TreeMeasurement, models.MeasurementTelemetry.__table__
+    row = db.execute(
+        select(M.id, *[T.c[name] for name in COLUMNS])
+        .select_from(M).outerjoin(T, T.c.measurement_id == M.id)
+        .where(M.id == measurement_id)
+    ).first()
+    if row is None:
+        return None
+    values = dict(zip(COLUMNS, row[1:]))
+    result = {name: values[name] for name in FIELDS}
+    result["measurement_id"] = measurement_id
+    samples = {sensor: unpack_vectors(values[f"{sensor}_samples"]) for sensor in SAMPLE_SENSORS}
+    if any(samples.values()) or values["sample_interval_ms"] is not None:
+        result["imu_samples"] = {"interval_ms": values["sample_interval_ms"], **samples}
+    else:
+        result["imu_samples"] = None
+    return result
+
+
+# ---- 스키마 ----
+
+def ensure_schema(engine):
+    """시작 시 스키마 점검: 분리 이전 DB의 센서 컬럼 이전 후 호환 뷰 생성 (measurement_telemetry는 create_all)"""
+    migrate_legacy_columns(engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP VIEW IF EXISTS {VIEW}"))
+        select_list = ", ".join(
+            f"t.{name} AS {name}" if name in _COLUMN_SET else f"m.{name} AS {name}" for name in VIEW_COLUMNS
+        )
+        conn.execute(text(
+            f"CREATE VIEW {VIEW} AS SELECT {select_list} "
+            f"FROM measurements m LEFT JOIN {TABLE} t ON t.measurement_id = m.id"
+        ))
+
+
+def migrate_legacy_columns(engine) -> int:
+    """
+    measurements에 분리 이전 센서 컬럼이 남아 있으면 값을 measurement_telemetry로 옮기고 컬럼을 삭제합니다.
+    DROP COLUMN을 지원하지 않는 SQLite(3.35 미만)에서는 컬럼 값만 비웁니다 (NULL은 행 헤더 1바이트).
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns("measurements")}
+    legacy = [name for name in FIELDS if name in existing]
+    if not legacy:
+        return 0
+
+    columns = ", ".join(legacy)
+    has_values = " OR ".join(f"m.{name} IS NOT NULL" for name in legacy)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP VIEW IF EXISTS {VIEW}"))
+        moved = conn.execute(text(
+            f"INSERT INTO {TABLE} (measurement_id, {columns}) SELECT m.id, {columns} FROM measurements m "
+            f"WHERE ({has_values}) AND NOT EXISTS (SELECT 1 FROM {TABLE} t WHERE t.measurement_id = m.id)"
+        )).rowcount
+    logger.info(f"Moved telemetry of {moved} measurements to {TABLE}.")
+
+    try:
+        with engine.begin() as conn:
+            for name in legacy:
+                conn.execute(text(f"ALTER TABLE measurements DROP COLUMN {name}"))
+        logger.info(f"Dropped {len(legacy)} telemetry columns from measurements.")
+    except DBAPIError as e:
+        logger.warning(f"Could not drop legacy telemetry columns ({e}). Clearing their values instead.")
+        with engine.begin() as conn:
+            conn.execute(text(f"UPDATE measurements SET {', '.join(f'{name} = NULL' for name in legacy)}"))
+    return moved
@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow 미설치 시 파생 이미지 없이 원본 사진을 제공
+    Image = None
+
+try:
+    import blob_store
+except ImportError:
+    from . import blob_store
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 파생 이미지 크기: 긴 변 최대 픽셀
+SIZES = {"thumb": 256, "medium": 1024}
+# 인코딩 형식: (Pillow 형식 이름, MIME, 확장자)
+FORMATS = {"webp": ("WEBP", "image/webp", "webp"), "jpeg": ("JPEG", "image/jpeg", "jpg")}
+
+Key = Tuple[str, str]  # (원본 해시, 크기 이름)
+
+
+def render(data: bytes, max_side: int, fmt: str, quality: int) -> bytes:
+    """
+    원본 사진을 긴 변 max_side 이하로 축소해 다시 인코딩합니다.
+    (프로세스 풀에서도 실행할 수 있도록 모듈 최상위 함수로 둠)
+    """
+    with Image.open(BytesIO(data)) as source:
+        # JPEG는 디코딩 단계에서 1/2~1/8로 축소하여 디코딩 비용 절감
+        source.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(source)
+        if fmt == "WEBP" and image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        out = BytesIO()
+        options = {"method": 4} if fmt == "WEBP" else {"optimize": True}
+        image.save(out, fmt, quality=quality, **options)
+    return out.getvalue()
+
+
+def _default_root() -> str:
+    if os.environ.get("THUMBNAIL_DIR"):
+        return os.environ["THUMBNAIL_DIR"]
+    # Vercel에서는 /tmp 디렉토리만 쓰기 권한이 있음
+    if os.environ.get("VERCEL"):
+        return "/tmp/tree_map_thumbs"
+    return os.path.join(BASE_DIR, "thumbs")
+
+
+class ThumbnailCache:
+    """
+    측정 사진 파생 이미지(썸네일 / 중간 크기) 캐시.
+    - 메모리 계층: 최근 사용 파생 이미지 LRU (memory_bytes 제한) - 적중 시 디코딩/파일 읽기 없음
+    - 디스크 계층: {root}/{size}/{hash[:2]}/{hash}.{ext}, 전체 크기 max_bytes 초과 시 오래된 파일부터 삭제
+      (사용 순서는 파일 수정 시각으로 유지하여 재시작 후에도 이어짐)
+    - 생성: 워커 풀(스레드 또는 프로세스)에서 실행하여 요청 처리(이벤트 루프)를 막지 않으며,
+      같은 이미지에 대한 동시 요청은 한 번만 생성합니다.
+    원본은 콘텐츠 해시로 식별되어 바뀌지 않으므로 별도 무효화가 필요 없습니다.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024,
+                 memory_bytes: int = 32 * 1024 * 1024, workers: int = 2, mode: str = "thread",
+                 fmt: str = "webp", quality: int = 80):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown thumbnail worker mode: {mode}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown thumbnail format: {fmt} (available: {', '.join(FORMATS)})")
+        if Image is not None and fmt == "webp" and not features.check("webp"):
+            logger.warning("Pillow was built without WebP support. Using JPEG thumbnails.")
+            fmt = "jpeg"
+        self.root = root or _default_root()
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.quality = quality
+        self.pil_format, self.media_type, self.extension = FORMATS[fmt]
+
+        self._memory: "OrderedDict[Key, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "Optional[OrderedDict[Key, int]]" = None  # 첫 사용 시 디렉토리 스캔
+        self._disk_size = 0
+        self._inflight: Dict[Key, Future] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.generated = 0
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        return cls(
+            max_bytes=int(float(os.environ.get("THUMBNAIL_CACHE_MB", "256")) * 1024 * 1024),
+            memory_bytes=int(float(os.environ.get("THUMBNAIL_MEMORY_MB", "32")) * 1024 * 1024),
+            workers=int(os.environ.get("THUMBNAIL_WORKERS", "2")),
+            mode=os.environ.get("THUMBNAIL_WORKER_MODE", "thread"),
+            fmt=os.environ.get("THUMBNAIL_FORMAT", "webp"),
+            quality=int(os.environ.get("THUMBNAIL_QUALITY", "80")),
+            **kwargs,
+        )
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def etag(self, digest: str, size: str) -> str:
+        return f'"{digest}-{size}.{self.extension}"'
+
+    def stop(self):
+        with self._lock:
+            pool, process_pool = self._pool, self._process_pool
+            self._pool = self._process_pool = None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---- 조회 ----
+
+    async def get(self, digest: str, size: str) -> bytes:
+        """
+        파생 이미지 바이트를 반환합니다. 메모리 적중은 바로 반환하고, 그 외(디스크 읽기 / 생성)는
+        워커 스레드에서 처리합니다. 원본이 없으면 FileNotFoundError, 디코딩할 수 없으면 ValueError.
+        """
+        key = (digest, size)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+            future = self._inflight.get(key)
+            if future is None:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbnail")
+                future = self._pool.submit(self._load, key)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._finish(key))
+        return await asyncio.wrap_future(future)
+
+    def _finish(self, key: Key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _load(self, key: Key) -> bytes:
+        self._load_disk_index()
+        data = self._read_disk(key)
+        generated = data is None
+        if generated:
+            data = self._generate(key)
+            self._write_disk(key, data)
+        with self._lock:
+            if generated:
+                self.generated += 1
+            else:
+                self.disk_hits += 1
+        self._remember(key, data)
+        return data
+
+    def _generate(self, key: Key) -> bytes:
+        digest, size = key
+        store = blob_store.get_blob_store()
+        if not store.exists(digest):
+            raise FileNotFoundError(digest)
+        with store.open(digest) as f:
+            source = f.read()
+        args = (source, SIZES[size], self.pil_format, self.quality)
+        try:
+            if self.mode == "process":
+                with self._lock:
+                    if self._process_pool is None:
+                        self._process_pool = ProcessPoolExecutor(max_workers=self.workers)
+                    process_pool = self._process_pool
+                return process_pool.submit(render, *args).result()
+            return render(*args)
+        except OSError as e:  # PIL.UnidentifiedImageError 포함
+            raise ValueError(f"Image cannot be decoded: {e}")
+
+    # ---- 메모리 계층 ----
+
+    def _remember(self, key: Key, data: bytes):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old)
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    # ---- 디스크 계층 ----
+
+    def _path(self, key: Key) -> str:
+        digest, size = key
+        return os.path.join(self.root, size, digest[:2], f"{digest}.{self.extension}")
+
+    def _load_disk_index(self):
+        """디스크 캐시 목록을 수정 시각 순(오래된 것 먼저)으로 읽습니다 (첫 사용 시 워커 스레드에서 한 번)."""
+        if self._disk is not None:
+            return
+        entries = []
+        suffix = f".{self.extension}"
+        for size in SIZES:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, size)):
+                for name in filenames:
+                    if not name.endswith(suffix):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(dirpath, name))
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, (name[:-len(suffix)], size), stat.st_size))
+        entries.sort()
+        with self._lock:
+            if self._disk is not None:
+                return
+            self._disk = OrderedDict((key, nbytes) for _, key, nbytes in entries)
+            self._disk_size = sum(self._disk.values())
+            evicted = self._evict_disk()  # 캐시 크기 설정이 줄어든 경우
+        self._remove_files(evicted)
+
+    def _read_disk(self, key: Key) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 재시작 후에도 사용 순서 유지
+            return data
+        except FileNotFoundError:
+            with self._lock:
+                nbytes = self._disk.pop(key, None)
+                if nbytes is not None:
+                    self._disk_size -= nbytes
+            return None
+
+    def _write_disk(self, key: Key, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            old = self._disk.pop(key, None)
+            self._disk_size += len(data) - (old or 0)
+            self._disk[key] = len(data)
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def _evict_disk(self) -> list:
+        """max_bytes를 넘는 만큼 오래된 항목을 목록에서 제거하고 그 키를 반환합니다 (잠금 안에서 호출)."""
+        evicted = []
+        while self._disk_size > self.max_bytes and self._disk:
+            key, nbytes = self._disk.popitem(last=False)
+            self._disk_size -= nbytes
+            evicted.append(key)
+        return evicted
+
+    def _remove_files(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory), "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk) if self._disk is not None else 0, "disk_bytes": self._disk_size,
+                "memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "generated": self.generated,
+                "inflight": len(self._inflight),
+            }
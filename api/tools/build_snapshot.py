@@ -0,0 +1,51 @@
+"""
+콜드 스타트용 SQLite 스냅샷 생성
+
+스키마, 공간 인덱스, 샘플 데이터, 클러스터 집계, 스키마 스탬프까지 준비된 DB를 만들어
+배포 번들에 포함합니다. 서버는 DB 파일이 비어 있으면 이 스냅샷을 복사해 시작합니다.
+
+    python api/tools/build_snapshot.py                 # api/snapshot/tree_map.db (+ blobs/)
+    python api/tools/build_snapshot.py -o /path/to/tree_map.db
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트용 DB 스냅샷 생성")
+    parser.add_argument("--output", "-o", default=os.path.join(API_DIR, "snapshot", "tree_map.db"))
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix="treemap_snapshot_")
+    working = os.path.join(workdir, "tree_map.db")
+
+    # 앱 모듈은 환경 변수를 임포트 시점에 읽으므로 설정 후 임포트
+    # (롤백 저널로 만들어 스냅샷 파일 하나에 모든 내용이 담기도록 함, 사진은 스냅샷 옆 blobs/에 저장)
+    os.environ["DATABASE_URL"] = f"sqlite:///{working}"
+    os.environ["DB_PROFILE"] = "legacy"
+    os.environ["DB_SNAPSHOT"] = "off"
+    os.environ["TREEMAP_BLOB_DIR"] = os.path.join(os.path.dirname(output), "blobs")
+    sys.path.append(API_DIR)
+
+    import database
+    import index
+
+    index.prepare_database()
+    if os.path.exists(output):
+        os.remove(output)
+    with database.engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM INTO ?", (output,))
+    database.engine.dispose()
+    os.remove(working)
+    os.rmdir(workdir)
+    print(f"Snapshot written to {output} ({os.path.getsize(output):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,11 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 try:
-    from api import models, database
+    from api import models, database, telemetry
 except ImportError:
     # 경로가 꼬일 경우를 대비한 대체 임포트
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from api import models, database
+    from api import models, database, telemetry
 
 def create_samples():
     db = database.SessionLocal()
@@ -84,8 +84,11 @@ def create_samples():
         print(f"Creating 5 sample tree measurements in {database.SQLALCHEMY_DATABASE_URL}...")
         
         for s in samples:
+            s, telemetry_row = telemetry.split(s)
             db_sample = models.TreeMeasurement(**s)
             db.add(db_sample)
+            db.flush()
+            telemetry.insert_rows(db, [db_sample.id], [telemetry_row])
         
         db.commit()
         print("Successfully created 5 sample data points!")
@@ -0,0 +1,52 @@
+"""
+서버 AI 대체 모델(NumPy MLP) 가중치 생성
+
+실제 모델 가중치 대신 CPU에서 쓸 수 있는 버전을 만듭니다 (같은 버전 이름은 항상 같은 가중치).
+--hidden / --layers로 가중치 크기를 키워 메모리 매핑 공유와 로드/워밍업 시간을 확인할 수 있습니다.
+만든 뒤 로드 + 워밍업 시간과 상주 메모리를 출력하고, --activate면 활성 버전으로 지정합니다.
+
+    python api/tools/create_stand_in_model.py sim-2
+    python api/tools/create_stand_in_model.py sim-large --hidden 4096 --layers 4 --activate
+"""
+import argparse
+import os
+import sys
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 AI 대체 모델 가중치 생성")
+    parser.add_argument("version", help="모델 버전 이름 (AI_MODEL_DIR/<version>/ 에 저장)")
+    parser.add_argument("--hidden", type=int, default=64, help="은닉층 크기")
+    parser.add_argument("--layers", type=int, default=2, help="은닉층 수")
+    parser.add_argument("--activate", action="store_true", help="활성 버전으로 지정")
+    args = parser.parse_args()
+
+    sys.path.append(API_DIR)
+    from services import model_registry, stand_in_model
+
+    registry = model_registry.get_registry()
+    path = os.path.join(registry.root, args.version)
+    if os.path.exists(path):
+        sys.exit(f"Error: model version {args.version} already exists in {registry.root}")
+    stand_in_model.save(path, args.version,
+                        stand_in_model.create_weights(args.version, hidden=args.hidden, layers=args.layers))
+
+    model = registry.activate(args.version) if args.activate else registry.get(args.version)
+    memory = model_registry.process_memory()
+    resident = (model_registry.mapped_resident_bytes(registry.root) or {}).get(model.path)
+    print(f"Model {model.version} written to {model.path}")
+    print(f"  weights   {model.weight_bytes / 2 ** 20:,.1f} MB")
+    print(f"  load      {model.load_ms:,.1f} ms")
+    print(f"  warm-up   {model.warmup_ms:,.1f} ms")
+    if resident is not None:
+        print(f"  mapped    {resident / 2 ** 20:,.1f} MB resident")
+    if memory["rss_bytes"] is not None:
+        print(f"  rss       {memory['rss_bytes'] / 2 ** 20:,.1f} MB")
+    if args.activate:
+        print(f"Active model version: {registry.active_version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+
+# api 디렉토리를 sys.path에 추가하여 index.py와 동일한 방식으로 모듈 임포트
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import exporter
+import spatial
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수목 측정 데이터 스트리밍 내보내기 (CSV / NDJSON / Parquet / Arrow)")
+    parser.add_argument("--format", default="csv", choices=list(exporter.FORMATS))
+    parser.add_argument("--output", "-o", default=None, help="출력 파일 경로 (기본: measurements.{확장자}, '-'는 표준 출력)")
+    parser.add_argument("--columns", default=None, help="내보낼 컬럼 (콤마 구분, 기본: 사진 제외 전체)")
+    parser.add_argument("--include-images", action="store_true", help="사진을 data URL로 포함")
+    parser.add_argument("--bbox", default=None, help="minLat,minLon,maxLat,maxLon")
+    parser.add_argument("--lat", type=float, default=None)
+    parser.add_argument("--lon", type=float, default=None)
+    parser.add_argument("--radius", type=float, default=None, help="반경 (m)")
+    parser.add_argument("--batch-size", type=int, default=exporter.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    try:
+        bbox, near = spatial.parse_spatial_params(args.bbox, args.lat, args.lon, args.radius)
+        columns = exporter.resolve_columns(args.columns)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output = args.output or f"measurements.{exporter.FORMATS[args.format][1]}"
+    stats = exporter.ExportStats()
+    session = database.SessionLocal()
+    out = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        for chunk in exporter.export(session, args.format, columns, bbox=bbox, near=near,
+                                     include_images=args.include_images, batch_size=args.batch_size,
+                                     stats=stats):
+            out.write(chunk)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        session.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    print(f"Exported {stats.rows} measurements to {output} in {stats.elapsed:.2f}s "
+          f"({stats.rows_per_sec:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+전체 재보정 (서버 AI 모델 업그레이드 후 기존 측정의 server_* 값 재계산)
+
+현재 활성 모델 버전으로 보정되지 않은 측정을 id 순서 청크로 나눠 프로세스 풀에서 추론하고
+청크마다 결과와 체크포인트를 커밋합니다. 중단(Ctrl+C / 비정상 종료) 후 다시 실행하면 이어서 처리합니다.
+결과는 change_log에 기록되므로 실행 중인 서버의 응답 / 타일 캐시도 다음 요청부터 갱신됩니다.
+서버(POST /api/admin/reprocess)와 같은 작업을 동시에 실행하지 않도록 작업 행을 원자적으로 가져갑니다.
+
+    python api/tools/reprocess.py                      # REPROCESS_* 환경 변수 설정 사용
+    python api/tools/reprocess.py --workers 8 --chunk-size 1000 --all
+"""
+import argparse
+import os
+import sys
+import time
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 측정 서버 AI 재보정")
+    parser.add_argument("--workers", type=int, default=None, help="추론 프로세스 수 (0: 현재 프로세스에서 실행)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--pause-ms", type=float, default=None, help="청크 커밋 사이 휴식 시간")
+    parser.add_argument("--max-rows-per-sec", type=float, default=None, help="처리량 상한 (0: 제한 없음)")
+    parser.add_argument("--all", action="store_true", help="현재 모델 버전으로 보정된 측정도 다시 계산")
+    parser.add_argument("--interval", type=float, default=5.0, help="진행 상황 출력 간격 (초)")
+    args = parser.parse_args()
+
+    sys.path.append(API_DIR)
+    import database
+    import index
+
+    reprocessor = index.reprocessor
+    for name in ("workers", "chunk_size", "max_rows_per_sec"):
+        if getattr(args, name) is not None:
+            setattr(reprocessor, name, getattr(args, name))
+    if args.pause_ms is not None:
+        reprocessor.pause_seconds = args.pause_ms / 1000
+
+    index.prepare_database()
+    run_id = reprocessor.start(only_stale=not args.all)
+
+    def report():
+        with database.SessionLocal() as db:
+            s = reprocessor.status(db, run_id)
+        eta = f", ETA {s['eta_seconds']:.0f}s" if s["eta_seconds"] is not None else ""
+        print(f"  [{s['status']}] {s['processed']:,}/{s['total']:,} ({s['progress']:.1%}) "
+              f"{s['rows_per_sec']:,.0f} rows/s{eta}", file=sys.stderr, flush=True)
+        return s
+
+    try:
+        while reprocessor.running:
+            time.sleep(args.interval)
+            report()
+    except KeyboardInterrupt:
+        print("Pausing after the current chunk...", file=sys.stderr)
+        reprocessor.pause()
+
+    s = report()
+    print(f"Reprocess run {run_id} {s['status']}: {s['processed']:,} measurements "
+          f"(model {s['model_version']}, {s['avg_rows_per_sec']:,.0f} rows/s)")
+    if s["status"] == "failed":
+        sys.exit(f"Error: {s['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import math
+import os
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import bindparam, insert, select, text, update
+
+try:
+    import models, spatial
+except ImportError:
+    from . import models, spatial
+
+logger = logging.getLogger(__name__)
+
+# 같은 나무로 볼 최대 거리 (m) - 스마트폰 GPS 오차 수준
+MATCH_RADIUS_M = float(os.environ.get("TREE_MATCH_RADIUS_M", "4"))
+
+# 연간 성장률을 계산할 최소 측정 기간 (일) - 짧은 기간의 측정 오차가 연 단위로 부풀려지지 않도록
+MIN_GROWTH_SPAN_DAYS = 180
+
+# 생육 이력에서 보정값이 있으면 우선 사용하는 지표
+HISTORY_FIELDS = ("dbh", "height", "crown_width", "ground_clearance", "health_score")
+
+
+def species_key(species: Optional[str]) -> str:
+    """수종 비교용 키: 괄호 안 학명 / 대소문자 / 공백 차이는 무시 ('느티나무 (Zelkova serrata)' == '느티나무')"""
+    if not species:
+        return ""
+    return species.split("(", 1)[0].strip().lower()
+
+
+def species_match(a: Optional[str], b: Optional[str]) -> bool:
+    """수종이 같거나 한쪽이 미기록이면 같은 나무일 수 있음"""
+    key_a, key_b = species_key(a), species_key(b)
+    return not key_a or not key_b or key_a == key_b
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """등장방형 근사 거리 (수십 m 이내에서는 충분히 정확)"""
+    d_lat = (lat2 - lat1) * spatial.METERS_PER_DEGREE
+    d_lon = (lon2 - lon1) * spatial.METERS_PER_DEGREE * math.cos(math.radians((lat1 + lat2) / 2))
+    return math.hypot(d_lat, d_lon)
+
+
+class TreeLinker:
+    """
+    측정 -> 수목 개체 연결. 새 측정 좌표에서 radius_m 이내의 개체를 공간 인덱스(SQLite R*Tree, 그 외 DB는
+    (latitude, longitude) 인덱스)로 찾아, 수종이 맞는 가장 가까운 개체에 연결하고 없으면 새 개체를 만듭니다.
+    후보 검색은 반경을 감싸는 작은 bbox 범위 탐색이므로 개체 수와 무관하게 측정당 SQL 몇 번으로 끝납니다.
+    측정 저장과 같은 트랜잭션에서 실행되며, 같은 배치 안의 측정끼리도 순서대로 연결됩니다.
+    """
+
+    def __init__(self, radius_m: float = MATCH_RADIUS_M):
+        self.radius_m = radius_m
+
+    # ---- 연결 ----
+
+    def link(self, db, measurement_ids):
+        """측정들을 개체에 연결합니다 (측정 시각 순). 좌표가 없는 측정은 연결하지 않습니다."""
+        if not measurement_ids:
+            return
+        M = models.TreeMeasurement
+        rows = db.execute(
+            select(M.id, M.species, M.measured_at,
+                   spatial.effective_latitude().label("lat"), spatial.effective_longitude().label("lon"))
+            .where(M.id.in_(measurement_ids), M.tree_id.is_(None))
+            .order_by(M.measured_at, M.id)
+        ).all()
+        self._link_rows(db, rows)
+
+    def _link_rows(self, db, rows):
+        links = []
+        for row in rows:
+            if row.lat is None or row.lon is None:
+                continue
+            tree = self.nearest(db, row.lat, row.lon, row.species)
+            links.append({"measurement_id": row.id,
+                          "tree_id": self._attach(db, tree, row) if tree else self._create(db, row)})
+        if links:
+            M = models.TreeMeasurement.__table__
+            db.execute(
+                update(M).where(M.c.id == bindparam("measurement_id")).values(tree_id=bindparam("tree_id")), links
+            )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _candidates_query(dialect_name: str):
+        """반경 bbox 안의 개체 후보 조회문 (값은 바인드 파라미터로만 바뀌므로 컴파일 캐시를 재사용)"""
+        T = models.Tree
+        query = select(T.id, T.species, T.latitude, T.longitude, T.measurement_count,
+                       T.first_measured_at, T.last_measured_at)
+        if dialect_name == "sqlite":
+            return query.where(T.id.in_(
+                select(text("id")).select_from(text(spatial.TREES_RTREE_TABLE)).where(text(
+                    "min_lat <= :max_lat AND max_lat >= :min_lat AND min_lon <= :max_lon AND max_lon >= :min_lon"
+                ))
+            ))
+        return query.where(T.latitude.between(bindparam("min_lat"), bindparam("max_lat")),
+                           T.longitude.between(bindparam("min_lon"), bindparam("max_lon")))
+
+    def nearest(self, db, lat: float, lon: float, species: Optional[str] = None):
+        """radius_m 이내에서 수종이 맞는 가장 가까운 개체 (없으면 None)"""
+        min_lat, min_lon, max_lat, max_lon = spatial.radius_bbox(lat, lon, self.radius_m)
+        query = self._candidates_query(db.get_bind().dialect.name)
+        params = {"min_lat": min_lat, "min_lon": min_lon, "max_lat": max_lat, "max_lon": max_lon}
+
+        best, best_distance = None, self.radius_m
+        for tree in db.execute(query, params):
+            distance = distance_m(lat, lon, tree.latitude, tree.longitude)
+            if distance <= best_distance and species_match(species, tree.species):
+                best, best_distance = tree, distance
+        return best
+
+    def _create(self, db, row) -> int:
+        result = db.execute(insert(models.Tree.__table__).values(
+            species=row.species, latitude=row.lat, longitude=row.lon, measurement_count=1,
+            first_measured_at=row.measured_at, last_measured_at=row.measured_at, latest_measurement_id=row.id,
+        ))
+        return result.inserted_primary_key[0]
+
+    def _attach(self, db, tree, row) -> int:
+        # 위치는 연결된 측정 좌표의 누적 평균 (측정이 쌓일수록 GPS 오차가 줄어듦)
+        n = (tree.measurement_count or 0) + 1
+        values = {
+            "latitude": tree.latitude + (row.lat - tree.latitude) / n,
+            "longitude": tree.longitude + (row.lon - tree.longitude) / n,
+            "measurement_count": n,
+        }
+        if not tree.species and row.species:
+            values["species"] = row.species
+        if tree.first_measured_at is None or (row.measured_at and row.measured_at < tree.first_measured_at):
+            values["first_measured_at"] = row.measured_at
+        if tree.last_measured_at is None or (row.measured_at and row.measured_at >= tree.last_measured_at):
+            values["last_measured_at"] = row.measured_at
+            values["latest_measurement_id"] = row.id
+        db.execute(update(models.Tree.__table__).where(models.Tree.id == tree.id).values(**values))
+        return tree.id
+
+    def rebuild(self, db, chunk_size: int = 5000) -> int:
+        """
+        전체 측정으로 개체를 다시 만듭니다 (초기 구축 / 수동 복구용).
+        측정 시각 순으로 읽으며 메모리 격자(셀 크기 = radius_m)에서 근접 개체를 찾고,
+        개체와 측정 연결은 일괄 INSERT / UPDATE로 기록하므로 행 단위 연결보다 훨씬 빠릅니다.
+        """
+        M = models.TreeMeasurement
+        db.execute(update(M.__table__).values(tree_id=None))
+        db.query(models.Tree).delete()
+        grid = _Grid(self.radius_m)
+        tree_list = []
+        links = []
+        result = db.execute(
+            select(M.id, M.species, M.measured_at,
+                   spatial.effective_latitude().label("lat"), spatial.effective_longitude().label("lon"))
+            .order_by(M.measured_at, M.id).execution_options(yield_per=chunk_size)
+        )
+        for partition in result.partitions(chunk_size):
+            for row in partition:
+                if row.lat is None or row.lon is None:
+                    continue
+                tree = grid.nearest(row.lat, row.lon, row.species)
+                if tree is None:
+                    tree = {"id": len(tree_list) + 1, "species": row.species, "latitude": row.lat,
+                            "longitude": row.lon, "measurement_count": 1, "first_measured_at": row.measured_at,
+                            "last_measured_at": row.measured_at, "latest_measurement_id": row.id}
+                    tree_list.append(tree)
+                    grid.add(tree)
+                else:
+                    n = tree["measurement_count"] + 1
+                    grid.move(tree, tree["latitude"] + (row.lat - tree["latitude"]) / n,
+                              tree["longitude"] + (row.lon - tree["longitude"]) / n)
+                    tree["measurement_count"] = n
+                    tree["species"] = tree["species"] or row.species
+                    tree["last_measured_at"], tree["latest_measurement_id"] = row.measured_at, row.id
+                links.append({"measurement_id": row.id, "tree_id": tree["id"]})
+
+        for start in range(0, len(tree_list), chunk_size):
+            db.execute(insert(models.Tree.__table__), tree_list[start:start + chunk_size])
+        table = M.__table__
+        for start in range(0, len(links), chunk_size):
+            db.execute(update(table).where(table.c.id == bindparam("measurement_id"))
+                       .values(tree_id=bindparam("tree_id")), links[start:start + chunk_size])
+        db.commit()
+        logger.info(f"Trees rebuilt: {len(links)} measurements linked to {len(tree_list)} trees.")
+        return len(tree_list)
+
+    def ensure_linked(self, db, chunk_size: int = 5000) -> int:
+        """
+        개체에 연결되지 않은 기존 측정을 측정 시각 순으로 연결합니다 (개체 식별 도입 이전 데이터 / 시작 시).
+        개체가 하나도 없으면 일괄 재구축합니다.
+        """
+        M = models.TreeMeasurement
+        lat, lon = spatial.effective_latitude(), spatial.effective_longitude()
+        pending = (M.tree_id.is_(None), lat.isnot(None), lon.isnot(None))
+        if db.query(M.id).filter(*pending).first() is None:
+            return 0
+        if db.query(models.Tree.id).first() is None:
+            self.rebuild(db, chunk_size)
+            return db.query(M.id).filter(M.tree_id.isnot(None)).count()
+        total = 0
+        while True:
+            rows = db.execute(
+                select(M.id, M.species, M.measured_at, lat.label("lat"), lon.label("lon"))
+                .where(*pending).order_by(M.measured_at, M.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            self._link_rows(db, rows)
+            db.commit()
+            total += len(rows)
+        logger.info(f"Linked {total} measurements to trees.")
+        return total
+
+    # ---- 조회 ----
+
+    @staticmethod
+    def history(db, tree_id: int) -> Optional[dict]:
+        """개체 정보와 측정 시각 순 생육 이력, 연간 성장률 (없는 개체면 None)"""
+        tree = db.get(models.Tree, tree_id)
+        if tree is None:
+            return None
+        M = models.TreeMeasurement
+        columns = [M.id, M.measured_at, M.species, M.is_server_processed, M.image_hash, M.server_species]
+        for name in HISTORY_FIELDS:
+            columns += [getattr(M, name), getattr(M, f"server_{name}")]
+        rows = db.execute(select(*columns).where(M.tree_id == tree_id).order_by(M.measured_at, M.id)).all()
+
+        measurements = []
+        for row in rows:
+            item = {
+                "measurement_id": row.id,
+                "measured_at": row.measured_at,
+                "species": row.server_species or row.species,
+                "is_server_processed": row.is_server_processed or 0,
+                "image_url": f"/api/measurements/{row.id}/image" if row.image_hash else None,
+            }
+            for name in HISTORY_FIELDS:
+                server_value = getattr(row, f"server_{name}")
+                item[name] = server_value if server_value is not None else getattr(row, name)
+                item[f"raw_{name}"] = getattr(row, name)
+            measurements.append(item)
+
+        return {
+            "id": tree.id,
+            "species": tree.species,
+            "latitude": tree.latitude,
+            "longitude": tree.longitude,
+            "measurement_count": tree.measurement_count,
+            "first_measured_at": tree.first_measured_at,
+            "last_measured_at": tree.last_measured_at,
+            "growth": {name: _annual_rate(measurements, name) for name in ("dbh", "height", "crown_width")},
+            "measurements": measurements,
+        }
+
+
+class _Grid:
+    """재구축용 메모리 격자 인덱스: 셀 크기 radius_m, 조회는 주변 셀만 검사"""
+
+    def __init__(self, radius_m: float):
+        self.radius_m = radius_m
+        self.step = radius_m / spatial.METERS_PER_DEGREE
+        self.cells = {}
+
+    def _key(self, lat: float, lon: float):
+        return int(math.floor(lat / self.step)), int(math.floor(lon / self.step))
+
+    def add(self, tree: dict):
+        self.cells.setdefault(self._key(tree["latitude"], tree["longitude"]), []).append(tree)
+
+    def move(self, tree: dict, lat: float, lon: float):
+        old, new = self._key(tree["latitude"], tree["longitude"]), self._key(lat, lon)
+        tree["latitude"], tree["longitude"] = lat, lon
+        if old != new:
+            self.cells[old].remove(tree)
+            self.cells.setdefault(new, []).append(tree)
+
+    def nearest(self, lat: float, lon: float, species: Optional[str]):
+        cy, cx = self._key(lat, lon)
+        # 경도 1칸은 cos(위도)만큼 짧으므로 그만큼 더 넓게 검사
+        span = int(math.ceil(1 / max(math.cos(math.radians(lat)), 1e-6)))
+        best, best_distance = None, self.radius_m
+        for y in (cy - 1, cy, cy + 1):
+            for x in range(cx - span, cx + span + 1):
+                for tree in self.cells.get((y, x), ()):
+                    distance = distance_m(lat, lon, tree["latitude"], tree["longitude"])
+                    if distance <= best_distance and species_match(species, tree["species"]):
+                        best, best_distance = tree, distance
+        return best
+
+
+def _annual_rate(measurements, name: str) -> Optional[float]:
+    """측정 시각에 대한 최소제곱 기울기 (단위/년). 측정 기간이 MIN_GROWTH_SPAN_DAYS 이상이어야 계산됩니다."""
+    points = [(m["measured_at"].timestamp() / (365.25 * 86400), m[name])
+              for m in measurements if m["measured_at"] is not None and m[name] is not None]
+    if len(points) < 2 or (points[-1][0] - points[0][0]) * 365.25 < MIN_GROWTH_SPAN_DAYS:
+        return None
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    var_t = sum((t - mean_t) ** 2 for t, _ in points)
+    if var_t <= 0:
+        return None
+    return round(sum((t - mean_t) * (v - mean_v) for t, v in points) / var_t, 3)
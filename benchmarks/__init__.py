@@ -0,0 +1,20 @@
+"""
+TreeMap 백엔드 성능 측정 도구 모음
+
+- generator: 도시 규모 합성 측정 데이터 생성 (python -m benchmarks.generator)
+- bench_api: API 시나리오별 p50/p99 지연 시간 및 처리량 (python -m benchmarks.bench_api)
+- bench_writes: 저장소 프로파일/커밋 방식별 동시 쓰기 처리량 (python -m benchmarks.bench_writes)
+- bench_serialization: 목록 응답 직렬화 경로별 rows/s (python -m benchmarks.bench_serialization)
+- bench_startup: 콜드 스타트 임포트 / 첫 요청 시간 (python -m benchmarks.bench_startup)
+- bench_concurrency: 동시 접속 시 요청별 커밋 / 그룹 커밋 처리량 및 꼬리 지연 시간 (python -m benchmarks.bench_concurrency)
+- bench_row_layout: 센서 데이터 분리 전후 측정 행 크기 및 목록 / 공간 조회 속도 (python -m benchmarks.bench_row_layout)
+- compare: 커밋 간 결과 JSON 비교 (python -m benchmarks.compare base.json head.json)
+
+api/ 모듈을 index.py와 동일한 방식(평면 임포트)으로 사용합니다.
+"""
+import os
+import sys
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
@@ -0,0 +1,101 @@
+"""
+API 지연 시간 / 처리량 벤치마크
+
+합성 데이터셋(benchmarks.generator)을 준비한 뒤 시나리오별 p50/p90/p99 지연 시간과
+처리량을 측정하고 결과를 JSON으로 저장합니다. 기본은 앱을 프로세스 내(TestClient)로
+실행하며, --base-url을 주면 이미 실행 중인 서버를 대상으로 합니다
+(이 경우 서버 DB는 같은 --rows/--seed로 생성해 두어야 조회 위치가 데이터와 일치합니다).
+
+    python -m benchmarks.bench_api --rows 100000 --requests 200
+    python -m benchmarks.bench_api --rows 1000000 --scenarios bbox,tile,list_cursor --concurrency 8
+    python -m benchmarks.compare <base.json> <head.json>
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from . import results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TreeMap API 벤치마크 (p50/p99 지연 시간, 처리량)")
+    parser.add_argument("--rows", type=int, default=100_000, help="데이터셋 측정 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--images", type=float, default=0.0, help="데이터셋 사진 포함 비율 (0~1)")
+    parser.add_argument("--db", default=None, help="데이터셋 SQLite 파일 (기본: benchmarks/data/treemap_<rows>_<seed>.db)")
+    parser.add_argument("--base-url", default=None, help="실행 중인 서버 주소 (예: http://localhost:8000)")
+    parser.add_argument("--scenarios", default=None, help="실행할 시나리오 (콤마 구분, 기본: 전체)")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--output", "-o", default=None, help="결과 JSON 경로 (기본: benchmarks/results/api-<commit>-<시각>.json)")
+    parser.add_argument("--list", action="store_true", help="시나리오 목록 출력")
+    args = parser.parse_args()
+
+    # 앱 모듈은 DATABASE_URL 등 환경 변수를 임포트 시점에 읽으므로 설정 후 임포트
+    from . import generator
+    from . import scenarios as scenario_defs
+
+    if args.list:
+        for name, (description, _) in scenario_defs.SCENARIOS.items():
+            print(f"{name:<16}{description}")
+        return
+
+    names = args.scenarios.split(",") if args.scenarios else list(scenario_defs.SCENARIOS)
+    unknown = [n for n in names if n not in scenario_defs.SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    workdir = tempfile.mkdtemp(prefix="treemap_bench_")
+    try:
+        if args.base_url:
+            import httpx
+
+            client_cm = httpx.Client(base_url=args.base_url, timeout=60.0)
+        else:
+            # 데이터셋은 한 번 생성해 재사용하고, 실행마다 복사본을 사용 (create 시나리오가 원본을 바꾸지 않도록)
+            dataset = args.db or generator.default_db_path(args.rows, args.seed)
+            blob_dir = os.path.join(os.path.dirname(os.path.abspath(dataset)), "blobs")
+            os.environ.setdefault("TREEMAP_BLOB_DIR", blob_dir)
+            working = os.path.join(workdir, "treemap.db")
+            os.environ["DATABASE_URL"] = f"sqlite:///{working}"
+            print(f"Preparing dataset {dataset} ({args.rows:,} rows, seed={args.seed})", file=sys.stderr)
+            generator.generate(f"sqlite:///{dataset}", args.rows, args.seed, images=args.images)
+            shutil.copyfile(dataset, working)
+            logging.disable(logging.ERROR)
+
+            from fastapi.testclient import TestClient
+            import index
+
+            client_cm = TestClient(index.app)
+
+        ctx = scenario_defs.ScenarioContext(args.rows, args.seed)
+        measured = {}
+        with client_cm as client:
+            for name in names:
+                started = time.perf_counter()
+                measured[name] = scenario_defs.run_scenario(
+                    client, ctx, name, args.requests, concurrency=args.concurrency, warmup=args.warmup,
+                )
+                print(f"  {name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    config = {
+        "dataset": {"rows": args.rows, "seed": args.seed, "images": args.images},
+        "target": args.base_url or "in-process",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+    }
+    results.print_table(measured)
+    path = results.save("api", config, measured, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
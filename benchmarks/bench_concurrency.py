@@ -0,0 +1,164 @@
+"""
+동시 접속 벤치마크: 요청별 커밋 vs 그룹 커밋(DB_GROUP_COMMIT=1)
+
+모드마다 같은 데이터셋 복사본으로 uvicorn 서버(단일 프로세스)를 띄우고, 다수의 클라이언트가
+동시에 측정 저장(POST)과 목록/bbox 조회(GET)를 섞어 요청할 때의 처리량과 꼬리 지연 시간을 비교합니다.
+클라이언트는 asyncio(httpx.AsyncClient) 하나로 실행되므로 클라이언트별 연결을 유지합니다.
+
+    python -m benchmarks.bench_concurrency --clients 500 --requests 10
+    python -m benchmarks.bench_concurrency --modes group --write-ratio 0.5
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from . import API_DIR
+from . import generator, results
+from .scenarios import MAP_FIELDS, ScenarioContext
+
+# 모드별 서버 환경 변수
+MODES = {"commit": {}, "group": {"DB_GROUP_COMMIT": "1"}}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(dataset: str, workdir: str, mode: str, port: int) -> subprocess.Popen:
+    working = os.path.join(workdir, f"{mode}.db")
+    shutil.copyfile(dataset, working)
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{working}",
+        "TREEMAP_BLOB_DIR": os.path.join(os.path.dirname(os.path.abspath(dataset)), "blobs"),
+        "DB_SNAPSHOT": "off",
+        **MODES[mode],
+    })
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "index:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log"],
+        cwd=API_DIR, env=env,
+    )
+    import httpx
+
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def run_clients(base_url: str, ctx: ScenarioContext, clients: int, requests: int, write_ratio: float,
+                      seed: int) -> dict:
+    """clients개 코루틴이 각자 requests회 요청 (write_ratio 비율은 측정 저장, 나머지는 bbox 목록 조회)"""
+    import httpx
+
+    latencies = {"create": [], "read": []}
+    errors = {"create": 0, "read": 0}
+    start = asyncio.Event()
+
+    async def client(client_id: int, http):
+        rng = np.random.default_rng([seed, 300, client_id])
+        await start.wait()
+        for _ in range(requests):
+            kind = "create" if rng.random() < write_ratio else "read"
+            started = time.perf_counter()
+            try:
+                if kind == "create":
+                    payload = ctx.payloads[int(rng.integers(0, len(ctx.payloads)))]
+                    response = await http.post("/api/measurements", json=payload)
+                else:
+                    response = await http.get("/api/measurements", params={
+                        "bbox": ctx.bbox(rng, 500), "fields": MAP_FIELDS, "limit": 100,
+                    })
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[kind].append((time.perf_counter() - started) * 1000)
+            else:
+                errors[kind] += 1
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as http:
+        tasks = [asyncio.create_task(client(i, http)) for i in range(clients)]
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        start.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    summary = {kind: results.summarize(latencies[kind], elapsed, errors[kind]) for kind in latencies}
+    summary["all"] = results.summarize(latencies["create"] + latencies["read"], elapsed, sum(errors.values()))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="요청별 커밋 / 그룹 커밋 동시 접속 처리량 및 꼬리 지연 시간 비교")
+    parser.add_argument("--rows", type=int, default=100_000, help="데이터셋 측정 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clients", type=int, default=500, help="동시 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=10, help="클라이언트당 요청 수")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="측정 저장(POST) 비율")
+    parser.add_argument("--modes", default="commit,group", help="비교할 모드 (commit, group)")
+    parser.add_argument("--output", "-o", default=None)
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    dataset = generator.default_db_path(args.rows, args.seed)
+    print(f"Preparing dataset {dataset} ({args.rows:,} rows, seed={args.seed})", file=sys.stderr)
+    generator.generate(f"sqlite:///{dataset}", args.rows, args.seed)
+    ctx = ScenarioContext(args.rows, args.seed)
+
+    measured = {}
+    workdir = tempfile.mkdtemp(prefix="treemap_concurrency_")
+    try:
+        for mode in modes:
+            port = _free_port()
+            server = start_server(dataset, workdir, mode, port)
+            try:
+                print(f"  {mode}: {args.clients} clients x {args.requests} requests", file=sys.stderr)
+                summary = asyncio.run(run_clients(f"http://127.0.0.1:{port}", ctx, args.clients, args.requests,
+                                                  args.write_ratio, args.seed))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            for kind, values in summary.items():
+                measured[f"{mode}.{kind}"] = values
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    config = {
+        "dataset": {"rows": args.rows, "seed": args.seed},
+        "clients": args.clients,
+        "requests_per_client": args.requests,
+        "write_ratio": args.write_ratio,
+    }
+    results.print_table(measured)
+    path = results.save("concurrency", config, measured, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+측정 행 레이아웃 벤치마크: 센서 원시 데이터 분리(split) vs 분리 이전 단일 테이블(wide)
+
+같은 데이터셋을 두 레이아웃으로 준비합니다.
+- split: 현재 스키마 (measurements + measurement_telemetry, generator로 생성)
+- wide: 분리 이전처럼 센서 컬럼 23개가 measured_at 뒤에 있는 measurements (호환 뷰에서 복사)
+두 DB 모두 VACUUM 후 dbstat으로 measurements 행 크기/페이지 수를 비교하고,
+앱과 같은 쿼리 빌더(serializers / queries / spatial)로 목록 / 공간 조회 지연 시간을 측정합니다.
+쿼리는 TreeMeasurement 모델 컬럼만 사용하므로 두 레이아웃에서 같은 SQL이 실행됩니다.
+
+    python -m benchmarks.bench_row_layout --rows 100000
+    python -m benchmarks.bench_row_layout --rows 1000000 --repeat 50
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from . import generator, results
+from .scenarios import MAP_FIELDS, ScenarioContext
+
+LAYOUTS = ("wide", "split")
+
+
+def build_wide(split_path: str, wide_path: str):
+    """split DB의 호환 뷰(measurements_full)로 분리 이전 구조의 measurements를 만들어 채웁니다."""
+    import database
+    import models
+    import spatial
+    import telemetry
+    from sqlalchemy import Index, MetaData, Table, text
+
+    measurements = models.TreeMeasurement.__table__
+    sensors = models.MeasurementTelemetry.__table__
+    metadata = MetaData()
+    columns = [(sensors.c[name] if name in telemetry.FIELDS else measurements.c[name])._copy()
+               for name in telemetry.VIEW_COLUMNS]
+    for column in columns:
+        column.index = None  # 인덱스는 아래에서 원본 이름 그대로 생성
+    wide = Table(measurements.name, metadata, *columns)
+    for index in measurements.indexes:
+        Index(index.name, *[wide.c[column.name] for column in index.columns], unique=index.unique)
+
+    engine = database.create_db_engine(f"sqlite:///{wide_path}")
+    metadata.create_all(bind=engine)
+    models.Tree.__table__.create(bind=engine, checkfirst=True)
+    column_list = ", ".join(telemetry.VIEW_COLUMNS)
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE :path AS src"), {"path": split_path})
+        conn.execute(text(
+            f"INSERT INTO measurements ({column_list}) SELECT {column_list} FROM src.{telemetry.VIEW} ORDER BY id"
+        ))
+    with engine.begin() as conn:
+        conn.execute(text("DETACH DATABASE src"))
+    spatial.ensure_spatial_index(engine)
+    engine.dispose()
+
+
+def _vacuum(path: str):
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+
+
+def table_stats(path: str, table: str) -> dict:
+    """dbstat 가상 테이블로 본 테이블 B-tree 크기와 행당 평균 크기 (payload + 셀 헤더)"""
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    try:
+        rows = connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        pages, size, payload, leaf_pages = connection.execute(
+            "SELECT count(*), sum(pgsize), sum(payload), sum(pagetype = 'leaf') FROM dbstat WHERE name = ?",
+            (table,),
+        ).fetchone()
+    finally:
+        connection.close()
+    return {
+        "rows": rows,
+        "pages": pages or 0,
+        "leaf_pages": leaf_pages or 0,
+        "bytes": size or 0,
+        "avg_payload_bytes": round(payload / rows, 1) if rows else 0.0,
+        "rows_per_leaf_page": round(rows / leaf_pages, 1) if leaf_pages else 0.0,
+    }
+
+
+def _scenarios(ctx: ScenarioContext, rows: int, seed: int) -> Dict[str, Callable]:
+    """쿼리 시나리오: (db, rng) -> 읽은 행 수. 목록 조회는 list 엔드포인트의 fetch와 같은 쿼리 + 직렬화"""
+    import models
+    import queries
+    import serializers
+    import spatial
+    from sqlalchemy import func, select
+
+    M = models.TreeMeasurement
+    full = serializers.for_fields(None)
+    map_fields = serializers.for_fields(queries.parse_fields(MAP_FIELDS))
+    page_cursor: Dict[str, str] = {}
+
+    def page(db, serializer, bbox=None, cursor=None, skip=0, limit=100):
+        query = db.query(*serializer.select_columns())
+        query = spatial.apply_spatial_filter(query, db.get_bind(), bbox=bbox)
+        query = queries.keyset_order(query)
+        query = queries.apply_cursor(query, cursor) if cursor else query.offset(skip)
+        page_rows = query.limit(limit).all()
+        serializer.serialize(page_rows)
+        return page_rows
+
+    def scan_aggregate(db, rng):
+        # 인덱스 없이 measurements 전체를 읽는 집계 (server_* 컬럼은 분리 이전 레이아웃에서 센서 컬럼 뒤)
+        db.execute(select(func.count(M.id), func.avg(M.dbh), func.avg(M.server_dbh),
+                          func.max(M.server_height))).one()
+        return rows
+
+    def list_offset(db, rng):
+        return len(page(db, full, skip=int(rng.integers(0, max(rows - 100, 1)))))
+
+    def list_cursor(db, rng):
+        # 1000행 페이지로 전체를 순회 (끝에 도달하면 처음부터)
+        page_rows = page(db, full, cursor=page_cursor.get("full"), limit=1000)
+        page_cursor["full"] = queries.encode_cursor(page_rows[-1].measured_at, page_rows[-1].id) \
+            if len(page_rows) == 1000 else None
+        return len(page_rows)
+
+    def bbox_map(db, rng):
+        return len(page(db, map_fields, bbox=spatial.parse_bbox(ctx.bbox(rng, 500)), limit=100))
+
+    def bbox_wide(db, rng):
+        return len(page(db, map_fields, bbox=spatial.parse_bbox(ctx.bbox(rng, 2000)), limit=5000))
+
+    return {
+        "scan_aggregate": scan_aggregate,
+        "list_offset": list_offset,
+        "list_cursor": list_cursor,
+        "bbox_500m": bbox_map,
+        "bbox_2km": bbox_wide,
+    }
+
+
+def run(path: str, ctx: ScenarioContext, rows: int, seed: int, repeat: int) -> Dict[str, dict]:
+    import database
+    from sqlalchemy.orm import sessionmaker
+
+    engine = database.create_db_engine(f"sqlite:///{path}")
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    measured = {}
+    try:
+        with Session() as db:
+            for index, (name, scenario) in enumerate(_scenarios(ctx, rows, seed).items()):
+                # 레이아웃마다 같은 난수열 (같은 offset / bbox)
+                rng = np.random.default_rng([seed, 400, index])
+                scenario(db, rng)  # 워밍업 (페이지 캐시 적재)
+                latencies: List[float] = []
+                scanned = 0
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    call_started = time.perf_counter()
+                    scanned += scenario(db, rng)
+                    latencies.append((time.perf_counter() - call_started) * 1000)
+                    db.rollback()
+                elapsed = time.perf_counter() - started
+                summary = results.summarize(latencies, elapsed)
+                summary["rows_per_sec"] = round(scanned / elapsed, 1) if elapsed else 0.0
+                measured[name] = summary
+    finally:
+        engine.dispose()
+    return measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description="센서 데이터 분리 전후 measurements 행 크기 및 조회 속도 비교")
+    parser.add_argument("--rows", type=int, default=100_000, help="데이터셋 측정 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=30, help="시나리오별 반복 횟수")
+    parser.add_argument("--output", "-o", default=None)
+    args = parser.parse_args()
+
+    dataset = generator.default_db_path(args.rows, args.seed)
+    print(f"Preparing dataset {dataset} ({args.rows:,} rows, seed={args.seed})", file=sys.stderr)
+    generator.generate(f"sqlite:///{dataset}", args.rows, args.seed)
+    ctx = ScenarioContext(args.rows, args.seed)
+
+    measured = {}
+    sizes = {}
+    workdir = tempfile.mkdtemp(prefix="treemap_row_layout_")
+    try:
+        paths = {layout: os.path.join(workdir, f"{layout}.db") for layout in LAYOUTS}
+        shutil.copyfile(dataset, paths["split"])
+        print("  building wide layout copy", file=sys.stderr)
+        build_wide(paths["split"], paths["wide"])
+        for layout in LAYOUTS:
+            _vacuum(paths[layout])
+            sizes[layout] = {"measurements": table_stats(paths[layout], "measurements"),
+                             "file_bytes": os.path.getsize(paths[layout])}
+            print(f"  {layout}: {args.repeat} runs per scenario", file=sys.stderr)
+            for name, values in run(paths[layout], ctx, args.rows, args.seed, args.repeat).items():
+                measured[f"{layout}.{name}"] = values
+        sizes["split"]["measurement_telemetry"] = table_stats(paths["split"], "measurement_telemetry")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for layout in LAYOUTS:
+        stats = sizes[layout]["measurements"]
+        print(f"{layout:>6}: measurements {stats['avg_payload_bytes']} B/row, {stats['pages']:,} pages "
+              f"({stats['bytes'] / 2 ** 20:.1f} MB), {stats['rows_per_leaf_page']} rows/leaf page")
+    results.print_table(measured)
+
+    config = {
+        "dataset": {"rows": args.rows, "seed": args.seed},
+        "repeat": args.repeat,
+        "sizes": sizes,
+    }
+    path = results.save("row_layout", config, measured, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+목록 응답 직렬화 벤치마크
+
+GET /api/measurements 페이지 하나를 만드는 두 경로를 비교합니다.
+- orm_pydantic: ORM 객체 조회 -> 행별 schemas.TreeMeasurement 검증(from_attributes) -> dump_json
+  (FastAPI response_model 경로)
+- row_tuples: 필요한 컬럼만 조회 -> serializers.RowSerializer (orjson / pydantic-core)
+각 경로를 조회 포함 / 직렬화만 두 가지로 측정하고, 두 경로의 출력 바이트가 같은지 확인합니다.
+
+    python -m benchmarks.bench_serialization --rows 50000 --page-size 1000
+"""
+import argparse
+import sys
+import time
+from typing import List
+
+from . import generator, results
+
+
+def _pages(session, serializer, page_size: int, pages: int, orm: bool):
+    import models
+    import queries
+
+    entity = [models.TreeMeasurement] if orm else serializer.select_columns()
+    cursor = None
+    for _ in range(pages):
+        query = queries.keyset_order(session.query(*entity))
+        if cursor:
+            query = queries.apply_cursor(query, cursor)
+        rows = query.limit(page_size).all()
+        if len(rows) < page_size:
+            cursor = None
+        else:
+            cursor = queries.encode_cursor(rows[-1].measured_at, rows[-1].id)
+        yield rows
+
+
+def run(session, page_size: int, pages: int) -> dict:
+    from typing import List as ListType
+
+    from pydantic import TypeAdapter
+
+    import schemas
+    import serializers
+
+    adapter = TypeAdapter(ListType[schemas.TreeMeasurement])
+    serializer = serializers.MEASUREMENT
+
+    def orm_serialize(rows) -> bytes:
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True), by_alias=True)
+
+    paths = {
+        "orm_pydantic": (True, orm_serialize),
+        "row_tuples": (False, serializer.serialize),
+    }
+    measured = {}
+    outputs = {}
+    for name, (orm, serialize) in paths.items():
+        total_latencies: List[float] = []
+        serialize_latencies: List[float] = []
+        serialized_rows = 0
+        started = time.perf_counter()
+        serialize_elapsed = 0.0
+        page_started = time.perf_counter()
+        for index, rows in enumerate(_pages(session, serializer, page_size, pages, orm)):
+            serialize_started = time.perf_counter()
+            body = serialize(rows)
+            finished = time.perf_counter()
+            serialize_elapsed += finished - serialize_started
+            serialize_latencies.append((finished - serialize_started) * 1000)
+            total_latencies.append((finished - page_started) * 1000)
+            serialized_rows += len(rows)
+            if index == 0:
+                outputs[name] = body
+            page_started = time.perf_counter()
+        elapsed = time.perf_counter() - started
+
+        end_to_end = results.summarize(total_latencies, elapsed)
+        end_to_end["rows_per_sec"] = round(serialized_rows / elapsed, 1) if elapsed else 0.0
+        serialize_only = results.summarize(serialize_latencies, serialize_elapsed)
+        serialize_only["rows_per_sec"] = round(serialized_rows / serialize_elapsed, 1) if serialize_elapsed else 0.0
+        measured[f"{name}"] = end_to_end
+        measured[f"{name}_serialize"] = serialize_only
+        session.expunge_all()
+
+    identical = outputs["orm_pydantic"] == outputs["row_tuples"]
+    return measured, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description="목록 응답 직렬화 경로 비교 (ORM+Pydantic vs 행 튜플)")
+    parser.add_argument("--rows", type=int, default=50_000, help="데이터셋 측정 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="데이터셋 SQLite 파일 (기본: benchmarks/data/treemap_<rows>_<seed>.db)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--output", "-o", default=None)
+    args = parser.parse_args()
+
+    import database
+    import serializers
+    from sqlalchemy.orm import sessionmaker
+
+    url = f"sqlite:///{args.db or generator.default_db_path(args.rows, args.seed)}"
+    generator.generate(url, args.rows, args.seed, progress=False)
+    engine = database.create_db_engine(url)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as session:
+        measured, identical = run(session, args.page_size, args.pages)
+    engine.dispose()
+
+    results.print_table(measured)
+    old, new = measured["orm_pydantic"]["rows_per_sec"], measured["row_tuples"]["rows_per_sec"]
+    old_s, new_s = measured["orm_pydantic_serialize"]["rows_per_sec"], measured["row_tuples_serialize"]["rows_per_sec"]
+    print(f"rows/s (query + serialize): {old:,.0f} -> {new:,.0f} ({new / old:.1f}x)")
+    print(f"rows/s (serialize only):    {old_s:,.0f} -> {new_s:,.0f} ({new_s / old_s:.1f}x)")
+    print(f"encoder: {'orjson' if serializers.orjson is not None else 'pydantic-core'}, "
+          f"output identical: {identical}")
+    if not identical:
+        print("error: serialized output differs from the response_model path", file=sys.stderr)
+
+    config = {"dataset": {"rows": args.rows, "seed": args.seed}, "page_size": args.page_size, "pages": args.pages,
+              "encoder": "orjson" if serializers.orjson is not None else "pydantic-core", "identical": identical}
+    path = results.save("serialization", config, measured, args.output)
+    print(f"Results written to {path}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
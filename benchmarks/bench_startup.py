@@ -0,0 +1,110 @@
+"""
+콜드 스타트 벤치마크
+
+매 실행마다 새 Python 프로세스에서 api/index.py를 임포트하고 lifespan 시작과 첫 요청까지의
+시간을 측정합니다 (서버리스 인스턴스가 새로 뜰 때와 같은 조건).
+- empty_db: 빈 DB, 스냅샷 없음 (스키마 생성 + 샘플 시딩)
+- snapshot: 빈 DB, 미리 만든 스냅샷 복사 (api/tools/build_snapshot.py)
+- warm_db: 스키마 스탬프가 기록된 기존 DB (스키마 점검 생략)
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import API_DIR
+from . import results
+
+PHASES = ("import", "startup", "first_req", "total")
+SCENARIOS = ("empty_db", "snapshot", "warm_db")
+
+
+def child():
+    """자식 프로세스: 임포트 / lifespan 시작 / 첫 요청 시간을 JSON으로 출력"""
+    # 측정 도구(httpx)의 임포트 시간은 제외
+    from fastapi.testclient import TestClient
+
+    started = time.perf_counter()
+    import index
+    imported = time.perf_counter()
+
+    with TestClient(index.app) as client:
+        ready = time.perf_counter()
+        response = client.get("/api/measurements", params={"limit": 100})
+        finished = time.perf_counter()
+    response.raise_for_status()
+    print(json.dumps({
+        "import": (imported - started) * 1000,
+        "startup": (ready - imported) * 1000,
+        "first_req": (finished - ready) * 1000,
+        "total": (finished - started) * 1000,
+    }))
+
+
+def _run_child(env: dict) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        cwd=os.path.dirname(API_DIR), env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(workdir: str, runs: int) -> dict:
+    snapshot = os.path.join(workdir, "snapshot", "tree_map.db")
+    subprocess.run([sys.executable, os.path.join(API_DIR, "tools", "build_snapshot.py"), "-o", snapshot],
+                   check=True, capture_output=True)
+
+    timings = {f"{scenario}.{phase}": [] for scenario in SCENARIOS for phase in PHASES}
+    for i in range(runs):
+        for scenario in SCENARIOS:
+            instance = os.path.join(workdir, f"{scenario}-{i}")
+            os.makedirs(instance)
+            env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+            env.update({
+                "DATABASE_URL": f"sqlite:///{os.path.join(instance, 'tree_map.db')}",
+                "TREEMAP_BLOB_DIR": os.path.join(instance, "blobs"),
+                "DB_SNAPSHOT": snapshot if scenario == "snapshot" else "off",
+                "AI_WORKERS": "0",
+                "AI_MODEL_PRELOAD": "0",
+            })
+            if scenario == "warm_db":
+                _run_child(env)  # 첫 실행으로 DB 생성 및 스탬프 기록
+            sample = _run_child(env)
+            for phase in PHASES:
+                timings[f"{scenario}.{phase}"].append(sample[phase])
+            shutil.rmtree(instance, ignore_errors=True)
+        print(f"  run {i + 1}/{runs}", file=sys.stderr)
+
+    return {name: results.summarize(values, sum(values) / 1000) for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="콜드 스타트 (임포트 / 첫 요청) 시간 측정")
+    parser.add_argument("--runs", type=int, default=10, help="시나리오별 프로세스 실행 횟수")
+    parser.add_argument("--output", "-o", default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    workdir = tempfile.mkdtemp(prefix="treemap_startup_")
+    try:
+        measured = run(workdir, args.runs)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results.print_table(measured)
+    path = results.save("startup", {"runs": args.runs}, measured, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+두 벤치마크 결과 파일 비교
+
+    python -m benchmarks.compare benchmarks/results/api-abc1234-....json benchmarks/results/api-def5678-....json
+
+지표가 --threshold 비율 이상 나빠진 항목이 있으면 종료 코드 1을 반환합니다 (CI 회귀 검사용).
+"""
+import argparse
+import sys
+
+from . import results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교 (base -> head)")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀 판정 변화율 (기본 10%%)")
+    args = parser.parse_args()
+
+    base, head = results.load(args.base), results.load(args.head)
+    if base["suite"] != head["suite"]:
+        parser.error(f"suite mismatch: {base['suite']} vs {head['suite']}")
+    if base.get("config", {}).get("dataset") != head.get("config", {}).get("dataset"):
+        print("warning: dataset settings differ between runs", file=sys.stderr)
+
+    base_commit = (base["environment"].get("commit") or "?")[:8]
+    head_commit = (head["environment"].get("commit") or "?")[:8]
+    print(f"{base['suite']}: {base_commit} -> {head_commit}")
+    print(f"{'scenario':<16}{'metric':<16}{'base':>12}{'head':>12}{'change':>10}")
+    rows = results.compare(base, head, args.threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ("  improved" if row["improvement"] else "")
+        print(f"{row['scenario']:<16}{row['metric']:<16}{row['base']:>12.2f}{row['head']:>12.2f}"
+              f"{row['change'] * 100:>+9.1f}%{flag}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
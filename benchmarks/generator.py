@@ -0,0 +1,336 @@
+"""
+도시 규모 합성 측정 데이터 생성기
+
+가로수는 도로를 따라 줄지어 심어지므로, 시드로부터 구(district) 중심과 도로 선분을 만든 뒤
+도로 양쪽에 일정 간격으로 나무를 배치합니다. 같은 도로의 나무는 대부분 같은 수종입니다.
+같은 (seed, rows) 조합은 항상 같은 데이터를 만들며 (삽입 배치 크기와 무관), 결과는
+커밋 간 벤치마크 비교에 그대로 사용할 수 있습니다.
+
+    python -m benchmarks.generator --rows 1000000 --db /tmp/treemap_bench.db
+"""
+import argparse
+import datetime
+import math
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from . import API_DIR  # noqa: F401  (api 모듈 경로 설정)
+
+# 서울 시가지 대략 범위 (minLat, minLon, maxLat, maxLon)
+CITY_BBOX = (37.43, 126.80, 37.70, 127.18)
+DISTRICTS = 25
+TREE_SPACING_M = 8.0  # 가로수 식재 간격
+METERS_PER_DEG_LAT = 111_320.0
+
+# (수종, 가로수 구성비, 평균 흉고직경 cm, 수고 계수)
+SPECIES = [
+    ("은행나무 (Ginkgo biloba)", 0.34, 32.0, 1.00),
+    ("벚나무 (Prunus serrulata)", 0.22, 26.0, 0.80),
+    ("양버즘나무 (Platanus occidentalis)", 0.12, 45.0, 1.15),
+    ("이팝나무 (Chionanthus retusus)", 0.10, 18.0, 0.75),
+    ("느티나무 (Zelkova serrata)", 0.09, 38.0, 1.05),
+    ("회화나무 (Styphnolobium japonicum)", 0.06, 30.0, 0.95),
+    ("소나무 (Pinus densiflora)", 0.04, 28.0, 0.90),
+    ("메타세쿼이아 (Metasequoia glyptostroboides)", 0.03, 40.0, 1.40),
+]
+SPECIES_NAMES = [s[0] for s in SPECIES]
+SPECIES_WEIGHTS = np.array([s[1] for s in SPECIES]) / sum(s[1] for s in SPECIES)
+
+DEVICES = [
+    ("iPhone 15 Pro", "iOS 17.4"),
+    ("iPhone 14", "iOS 17.2"),
+    ("Samsung Galaxy S24", "Android 14"),
+    ("Samsung Galaxy S23", "Android 14"),
+    ("Google Pixel 8", "Android 14"),
+    ("Samsung Galaxy A54", "Android 13"),
+]
+APP_VERSIONS = ["1.2.0", "1.3.0", "1.3.1"]
+
+# 측정 일시 범위 (1년)
+MEASURED_FROM = datetime.datetime(2025, 1, 1)
+MEASURED_SPAN_S = 365 * 24 * 3600
+
+# 난수 블록 크기: 삽입 배치 크기가 달라도 같은 데이터가 생성되도록 고정
+BLOCK_SIZE = 10_000
+
+# 이미지 페이로드 (JPEG 시그니처로 시작하는 합성 바이트)
+JPEG_MAGIC = b"\xff\xd8\xff\xe0"
+
+
+class CityModel:
+    """시드로부터 만든 구 중심과 도로 선분 집합. 나무 좌표와 조회 지점 샘플링에 사용합니다."""
+
+    def __init__(self, seed: int, rows: int):
+        rng = np.random.default_rng([seed, 0])
+        min_lat, min_lon, max_lat, max_lon = CITY_BBOX
+        self.lon_scale = METERS_PER_DEG_LAT * math.cos(math.radians((min_lat + max_lat) / 2))
+
+        centers_lat = rng.uniform(min_lat + 0.02, max_lat - 0.02, DISTRICTS)
+        centers_lon = rng.uniform(min_lon + 0.02, max_lon - 0.02, DISTRICTS)
+
+        # 도로 한 개에 평균 약 150그루 (양쪽 식재, 8m 간격 -> 약 600m)
+        streets = max(1, rows // 150)
+        district = rng.integers(0, DISTRICTS, streets)
+        spread_m = rng.gamma(2.0, 900.0, streets)
+        angle = rng.uniform(0, 2 * math.pi, streets)
+        self.start_lat = centers_lat[district] + spread_m * np.sin(angle) / METERS_PER_DEG_LAT
+        self.start_lon = centers_lon[district] + spread_m * np.cos(angle) / self.lon_scale
+        # 도로 방향은 격자형 도로망을 흉내내 대부분 남북/동서 방향
+        self.bearing = rng.choice([0.0, 0.5 * math.pi], streets) + rng.normal(0, 0.15, streets)
+        self.length_m = rng.uniform(200.0, 1500.0, streets)
+        self.species = rng.choice(len(SPECIES), streets, p=SPECIES_WEIGHTS)
+        self.street_weights = self.length_m / self.length_m.sum()
+
+    def sample_streets(self, rng, n: int) -> np.ndarray:
+        return rng.choice(len(self.length_m), n, p=self.street_weights)
+
+    def sample_points(self, rng, n: int):
+        """도로 위 임의 지점 (lat, lon) 배열 - 나무 배치와 공간 조회 중심 샘플링에 공통 사용"""
+        street = self.sample_streets(rng, n)
+        along = np.floor(rng.uniform(0, 1, n) * self.length_m[street] / TREE_SPACING_M) * TREE_SPACING_M
+        side = rng.choice([-6.0, 6.0], n) + rng.normal(0, 0.8, n)  # 도로 중심선에서 보도까지
+        bearing = self.bearing[street]
+        north = along * np.cos(bearing) - side * np.sin(bearing)
+        east = along * np.sin(bearing) + side * np.cos(bearing)
+        lat = self.start_lat[street] + north / METERS_PER_DEG_LAT
+        lon = self.start_lon[street] + east / self.lon_scale
+        return street, lat, lon
+
+
+def _block(city: CityModel, seed: int, index: int, size: int, images: float, processed: float,
+           image_pool: List[dict]) -> List[dict]:
+    rng = np.random.default_rng([seed, 1, index])
+    street, tree_lat, tree_lon = city.sample_points(rng, size)
+
+    # 80%는 도로 대표 수종, 나머지는 전체 구성비에서 선택
+    species = np.where(rng.uniform(0, 1, size) < 0.8, city.species[street],
+                       rng.choice(len(SPECIES), size, p=SPECIES_WEIGHTS))
+    mean_dbh = np.array([s[2] for s in SPECIES])[species]
+    height_factor = np.array([s[3] for s in SPECIES])[species]
+    dbh = np.clip(rng.lognormal(np.log(mean_dbh), 0.3), 5.0, 150.0)
+    height = np.clip(height_factor * 1.3 * dbh ** 0.6 * rng.normal(1.0, 0.08, size), 2.0, 40.0)
+    crown_width = np.clip(0.18 * dbh * rng.normal(1.0, 0.12, size), 1.0, 25.0)
+    ground_clearance = np.clip(rng.normal(2.2, 0.5, size), 0.5, 6.0)
+    health = np.clip(100 - rng.gamma(2.0, 6.0, size), 20.0, 100.0)
+
+    # 측정자는 나무에서 3~12m 떨어져 촬영
+    camera_distance = rng.uniform(3.0, 12.0, size)
+    azimuth = rng.uniform(0, 360, size)
+    device_lat = tree_lat - camera_distance * np.cos(np.radians(azimuth)) / METERS_PER_DEG_LAT
+    device_lon = tree_lon - camera_distance * np.sin(np.radians(azimuth)) / city.lon_scale
+    gps_noise = rng.normal(0, 3.0, (2, size))
+    device_lat += gps_noise[0] / METERS_PER_DEG_LAT
+    device_lon += gps_noise[1] / city.lon_scale
+
+    measured_s = np.sort(rng.uniform(0, MEASURED_SPAN_S, size))
+    device = rng.integers(0, len(DEVICES), size)
+    app_version = rng.integers(0, len(APP_VERSIONS), size)
+    has_image = rng.uniform(0, 1, size) < images
+    image_index = rng.integers(0, max(1, len(image_pool)), size)
+    is_processed = rng.uniform(0, 1, size) < processed
+    correction = rng.normal(1.0, 0.02, (4, size))
+    confidence = rng.uniform(0.85, 0.99, size)
+
+    columns = {
+        "species": [SPECIES_NAMES[s] for s in species],
+        "dbh": np.round(dbh, 1).tolist(),
+        "height": np.round(height, 1).tolist(),
+        "crown_width": np.round(crown_width, 1).tolist(),
+        "ground_clearance": np.round(ground_clearance, 1).tolist(),
+        "health_score": np.round(health, 0).tolist(),
+        "tree_latitude": tree_lat.tolist(),
+        "tree_longitude": tree_lon.tolist(),
+        "device_latitude": device_lat.tolist(),
+        "device_longitude": device_lon.tolist(),
+        "device_pitch": np.round(rng.normal(88.0, 3.0, size), 1).tolist(),
+        "device_roll": np.round(rng.normal(0.0, 2.0, size), 1).tolist(),
+        "device_azimuth": np.round(azimuth, 1).tolist(),
+        "ambient_light": np.round(rng.uniform(800, 60000, size), 0).tolist(),
+        "pressure": np.round(rng.normal(1013.0, 6.0, size), 1).tolist(),
+        "altitude": np.round(rng.uniform(10, 120, size), 1).tolist(),
+        "temperature": np.round(rng.normal(14.0, 9.0, size), 1).tolist(),
+        "focal_length": [4.25] * size,
+        "camera_distance": np.round(camera_distance, 2).tolist(),
+    }
+
+    # 촬영 순간 IMU 값 (기존 컬럼과 다른 난수 스트림 - 추가 이전 데이터셋과 나머지 값이 같도록)
+    imu_rng = np.random.default_rng([seed, 3, index])
+    pitch = np.radians(columns["device_pitch"])
+    columns.update({
+        "accelerometer_x": np.round(imu_rng.normal(0.0, 0.05, size), 3).tolist(),
+        "accelerometer_y": np.round(-9.81 * np.sin(pitch) + imu_rng.normal(0, 0.05, size), 3).tolist(),
+        "accelerometer_z": np.round(-9.81 * np.cos(pitch) + imu_rng.normal(0, 0.05, size), 3).tolist(),
+        "gyroscope_x": np.round(imu_rng.normal(0.0, 0.01, size), 4).tolist(),
+        "gyroscope_y": np.round(imu_rng.normal(0.0, 0.01, size), 4).tolist(),
+        "gyroscope_z": np.round(imu_rng.normal(0.0, 0.01, size), 4).tolist(),
+        "magnetometer_x": np.round(imu_rng.normal(-5.0, 8.0, size), 1).tolist(),
+        "magnetometer_y": np.round(imu_rng.normal(25.0, 8.0, size), 1).tolist(),
+        "magnetometer_z": np.round(imu_rng.normal(-40.0, 8.0, size), 1).tolist(),
+    })
+
+    rows = []
+    for i in range(size):
+        row = {name: values[i] for name, values in columns.items()}
+        model, os_version = DEVICES[device[i]]
+        row["device_model"] = model
+        row["os_version"] = os_version
+        row["app_version"] = APP_VERSIONS[app_version[i]]
+        row["measured_at"] = MEASURED_FROM + datetime.timedelta(seconds=float(measured_s[i]))
+        if has_image[i] and image_pool:
+            row.update(image_pool[image_index[i]])
+        else:
+            row.update({"image_hash": None, "image_size": None, "image_mime": None,
+                        "image_width": None, "image_height": None})
+        if is_processed[i]:
+            row.update({
+                "is_server_processed": 1,
+                "server_processed_at": row["measured_at"] + datetime.timedelta(seconds=30),
+                "server_species": row["species"],
+                "server_dbh": round(row["dbh"] * correction[0, i], 1),
+                "server_height": round(row["height"] * correction[1, i], 1),
+                "server_crown_width": round(row["crown_width"] * correction[2, i], 1),
+                "server_ground_clearance": round(row["ground_clearance"] * correction[3, i], 1),
+                "server_health_score": row["health_score"],
+                "server_confidence": round(float(confidence[i]), 2),
+            })
+        else:
+            row.update({
+                "is_server_processed": 0, "server_processed_at": None, "server_species": None,
+                "server_dbh": None, "server_height": None, "server_crown_width": None,
+                "server_ground_clearance": None, "server_health_score": None, "server_confidence": None,
+            })
+        rows.append(row)
+    return rows
+
+
+def make_image_pool(seed: int, count: int, size_kb: int) -> List[dict]:
+    """합성 사진 페이로드를 Blob 저장소에 기록하고 행에 넣을 참조 컬럼 목록을 반환합니다."""
+    import blob_store
+
+    rng = np.random.default_rng([seed, 2])
+    pool = []
+    for _ in range(count):
+        data = JPEG_MAGIC + rng.integers(0, 256, size_kb * 1024, dtype=np.uint8).tobytes()
+        ref = blob_store.get_blob_store().put(data, "image/jpeg")
+        pool.append({"image_hash": ref.hash, "image_size": ref.size, "image_mime": ref.mime,
+                     "image_width": 1080, "image_height": 1920})
+    return pool
+
+
+def iter_measurements(rows: int, seed: int = 42, images: float = 0.0, processed: float = 0.8,
+                      image_pool: Optional[List[dict]] = None) -> Iterator[List[dict]]:
+    """measurements 행(dict)을 BLOCK_SIZE 단위 목록으로 생성합니다."""
+    city = CityModel(seed, rows)
+    for index, start in enumerate(range(0, rows, BLOCK_SIZE)):
+        yield _block(city, seed, index, min(BLOCK_SIZE, rows - start), images, processed, image_pool or [])
+
+
+def api_payload(row: Dict) -> Dict:
+    """생성된 행을 POST /api/measurements 요청 본문으로 변환합니다 (원본 측정 필드만)."""
+    from services import ingest
+
+    payload = {name: row.get(name) for name in ingest.RAW_FIELDS}
+    payload.pop("measured_at", None)
+    return payload
+
+
+def prepare_schema(engine):
+    """index.py 시작 단계와 같은 순서로 테이블, 누락 컬럼/인덱스, 공간 인덱스를 준비합니다."""
+    import database
+    import models
+    import spatial
+    import telemetry
+
+    models.Base.metadata.create_all(bind=engine)
+    database.ensure_columns(engine, models.TreeMeasurement.__table__)
+    database.ensure_indexes(engine, models.TreeMeasurement.__table__)
+    database.ensure_columns(engine, models.AIJob.__table__)
+    database.ensure_columns(engine, models.ReprocessRun.__table__)
+    telemetry.ensure_schema(engine)
+    spatial.ensure_spatial_index(engine)
+
+
+def generate(url: str, rows: int, seed: int = 42, images: float = 0.0, processed: float = 0.8,
+             image_pool_size: int = 64, image_kb: int = 200, batch_size: int = 5000,
+             progress: bool = True) -> dict:
+    """
+    합성 데이터를 일괄 INSERT로 기록하고 지도 클러스터 집계, 인벤토리 통계, 수목 개체를 재구축합니다.
+    기존 측정 데이터가 있으면 생성하지 않습니다 (같은 DB를 여러 벤치마크 실행에 재사용).
+    """
+    import clusters
+    import database
+    import models
+    import stats
+    import trees
+    from services import ingest
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import sessionmaker
+
+    engine = database.create_db_engine(url)
+    prepare_schema(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    started = time.perf_counter()
+    with Session() as db:
+        existing = db.scalar(select(func.count(models.TreeMeasurement.id)))
+        if existing:
+            engine.dispose()
+            return {"rows": existing, "inserted": 0, "elapsed_s": 0.0, "rows_per_sec": 0.0}
+
+        image_pool = make_image_pool(seed, image_pool_size, image_kb) if images > 0 else []
+        inserted = 0
+        for block in iter_measurements(rows, seed, images, processed, image_pool):
+            for start in range(0, len(block), batch_size):
+                chunk = block[start:start + batch_size]
+                # 모든 행이 같은 키를 가지므로 executemany 한 번 (센서 컬럼은 measurement_telemetry로 분리)
+                ingest.insert_rows(db, chunk)
+                db.commit()
+                inserted += len(chunk)
+            if progress:
+                rate = inserted / (time.perf_counter() - started)
+                print(f"  generated {inserted:,}/{rows:,} measurements ({rate:,.0f} rows/s)", flush=True)
+        insert_elapsed = time.perf_counter() - started
+        clusters.ClusterIndex().rebuild(db)
+        stats.StatsIndex().rebuild(db)
+        trees.TreeLinker().rebuild(db)
+
+    engine.dispose()
+    return {
+        "rows": inserted,
+        "inserted": inserted,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "rows_per_sec": round(inserted / insert_elapsed, 1) if insert_elapsed else 0.0,
+    }
+
+
+def default_db_path(rows: int, seed: int) -> str:
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, f"treemap_{rows}_{seed}.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="도시 규모 합성 수목 측정 데이터 생성")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=None, help="SQLite 파일 경로 (기본: benchmarks/data/treemap_<rows>_<seed>.db)")
+    parser.add_argument("--database-url", default=None, help="SQLite 대신 사용할 DB URL")
+    parser.add_argument("--images", type=float, default=0.0, help="사진 포함 비율 (0~1)")
+    parser.add_argument("--image-pool", type=int, default=64, help="서로 다른 사진 페이로드 수")
+    parser.add_argument("--image-kb", type=int, default=200, help="사진 크기 (KB)")
+    parser.add_argument("--processed", type=float, default=0.8, help="AI 보정 완료 비율 (0~1)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{args.db or default_db_path(args.rows, args.seed)}"
+    stats = generate(url, args.rows, args.seed, images=args.images, processed=args.processed,
+                     image_pool_size=args.image_pool, image_kb=args.image_kb, batch_size=args.batch_size)
+    print(f"{url}: {stats['rows']:,} measurements ({stats['rows_per_sec']:,.0f} rows/s insert, "
+          f"{stats['elapsed_s']}s total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+벤치마크 결과 파일 (JSON) 기록 / 비교
+
+결과 파일에는 실행 환경(커밋, Python, CPU)과 데이터셋 설정이 함께 기록되므로
+서로 다른 커밋의 결과를 benchmarks.compare로 바로 비교할 수 있습니다.
+"""
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+from typing import Dict, List, Optional, Sequence
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+FORMAT_VERSION = 1
+
+# 비교 지표: (이름, 값이 클수록 좋은지)
+METRICS = (
+    ("p50_ms", False),
+    ("p99_ms", False),
+    ("throughput_rps", True),
+)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """정렬된 값의 분위수 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms: List[float], elapsed_s: float, errors: int = 0) -> dict:
+    """요청별 지연 시간 목록을 p50/p90/p99, 평균, 처리량으로 요약합니다."""
+    values = sorted(latencies_ms)
+    count = len(values)
+
+    def rounded(value):
+        return round(value, 3) if value is not None else None
+
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": rounded(percentile(values, 50)),
+        "p90_ms": rounded(percentile(values, 90)),
+        "p99_ms": rounded(percentile(values, 99)),
+        "mean_ms": rounded(sum(values) / count) if count else None,
+        "max_ms": rounded(values[-1]) if count else None,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(count / elapsed_s, 1) if elapsed_s else 0.0,
+    }
+
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=os.path.dirname(RESULTS_DIR),
+            capture_output=True, text=True, timeout=10, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def default_path(suite: str) -> str:
+    commit = (_git("rev-parse", "--short", "HEAD") or "nogit")
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(RESULTS_DIR, f"{suite}-{commit}-{stamp}.json")
+
+
+def save(suite: str, config: dict, scenarios: Dict[str, dict], path: Optional[str] = None) -> str:
+    path = path or default_path(suite)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        "format": FORMAT_VERSION,
+        "suite": suite,
+        "environment": environment(),
+        "config": config,
+        "scenarios": scenarios,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported results format {document.get('format')}")
+    return document
+
+
+def compare(base: dict, head: dict, threshold: float = 0.10) -> List[dict]:
+    """
+    시나리오/지표별 변화율을 계산합니다. 변화가 threshold(비율)를 넘어 나빠지면 regression으로 표시합니다.
+    """
+    rows = []
+    for name, head_result in head["scenarios"].items():
+        base_result = base["scenarios"].get(name)
+        if base_result is None:
+            continue
+        for metric, higher_is_better in METRICS:
+            old, new = base_result.get(metric), head_result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append({
+                "scenario": name, "metric": metric, "base": old, "head": new,
+                "change": round(change, 4), "regression": worse > threshold,
+                "improvement": -worse > threshold,
+            })
+    return rows
+
+
+def print_table(scenarios: Dict[str, dict]):
+    print(f"{'scenario':<20}{'requests':>9}{'errors':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, r in scenarios.items():
+        print(f"{name:<20}{r['requests']:>9}{r['errors']:>7}{_fmt(r['p50_ms']):>10}{_fmt(r['p90_ms']):>10}"
+              f"{_fmt(r['p99_ms']):>10}{r['throughput_rps']:>10.1f}")
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
@@ -0,0 +1,201 @@
+"""
+API 부하 시나리오
+
+각 시나리오는 (client, ctx, rng, local) -> Response 함수이며, 조회 위치/페이지는 시드 난수로
+정해지므로 같은 설정이면 항상 같은 요청 순서가 재현됩니다. 조회 파라미터가 요청마다 달라
+응답 캐시 적중 없이 실제 조회 비용을 측정합니다 (캐시 경로는 cached 시나리오에서 별도 측정).
+"""
+import datetime
+import json
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from . import generator, results
+
+MAP_FIELDS = ("id,species,measured_at,dbh,height,crownWidth,groundClearance,treeLatitude,treeLongitude,"
+              "adjustedTreeLatitude,adjustedTreeLongitude,deviceLatitude,deviceLongitude")
+
+
+class ScenarioContext:
+    """시나리오가 공유하는 데이터셋 정보 (도로 모델, 생성 요청 본문)"""
+
+    def __init__(self, rows: int, seed: int, payloads: int = 1000):
+        self.rows = rows
+        self.seed = seed
+        self.city = generator.CityModel(seed, rows)
+        # 저장 요청 본문은 데이터셋과 다른 시드로 미리 만들어 둠
+        block = next(generator.iter_measurements(payloads, seed + 1, processed=0.0))
+        self.payloads = [generator.api_payload(row) for row in block]
+        # multipart 업로드용 사진 (휴대폰 사진 크기, 같은 내용이라 저장소에는 한 번만 기록됨)
+        self.photo = b"\xff\xd8\xff\xe0" + np.random.default_rng(seed).bytes(3 * 1024 * 1024)
+
+    def point(self, rng) -> Tuple[float, float]:
+        _, lat, lon = self.city.sample_points(rng, 1)
+        return float(lat[0]), float(lon[0])
+
+    def bbox(self, rng, size_m: float) -> str:
+        lat, lon = self.point(rng)
+        dlat = size_m / 2 / generator.METERS_PER_DEG_LAT
+        dlon = size_m / 2 / self.city.lon_scale
+        return f"{lat - dlat:.6f},{lon - dlon:.6f},{lat + dlat:.6f},{lon + dlon:.6f}"
+
+
+def _walk(client, rng, local, key: str, params: dict):
+    """
+    X-Next-Cursor를 따라 다음 페이지를 요청합니다. 끝에 도달하면 임의 측정 시각에서 다시 시작하여
+    같은 페이지(응답 캐시 적중)를 반복하지 않습니다.
+    """
+    import queries
+
+    cursor = getattr(local, key, None)
+    if cursor is None:
+        offset = datetime.timedelta(seconds=float(rng.uniform(0, generator.MEASURED_SPAN_S)))
+        cursor = queries.encode_cursor(generator.MEASURED_FROM + offset, 0)
+    response = client.get("/api/measurements", params={**params, "cursor": cursor})
+    setattr(local, key, response.headers.get("x-next-cursor"))
+    return response
+
+
+def health(client, ctx, rng, local):
+    return client.get("/")
+
+
+def create(client, ctx, rng, local):
+    return client.post("/api/measurements", json=ctx.payloads[int(rng.integers(0, len(ctx.payloads)))])
+
+
+def upload(client, ctx, rng, local):
+    """사진을 multipart 바이너리 파트로 전송 (Base64 JSON 대비)"""
+    payload = ctx.payloads[int(rng.integers(0, len(ctx.payloads)))]
+    return client.post("/api/measurements/upload", files={
+        "metadata": (None, json.dumps(payload), "application/json"),
+        "image": ("tree.jpg", ctx.photo, "image/jpeg"),
+    })
+
+
+def list_offset(client, ctx, rng, local):
+    skip = int(rng.integers(0, max(1, min(ctx.rows, 5000))))
+    return client.get("/api/measurements", params={"limit": 100, "skip": skip})
+
+
+def list_cursor(client, ctx, rng, local):
+    return _walk(client, rng, local, "list_cursor", {"limit": 100})
+
+
+def list_fields(client, ctx, rng, local):
+    return _walk(client, rng, local, "list_fields", {"limit": 1000, "fields": MAP_FIELDS})
+
+
+def bbox(client, ctx, rng, local):
+    return client.get("/api/measurements", params={"bbox": ctx.bbox(rng, 500), "limit": 500})
+
+
+def radius(client, ctx, rng, local):
+    lat, lon = ctx.point(rng)
+    return client.get("/api/measurements", params={"lat": lat, "lon": lon, "radius": 100, "limit": 500})
+
+
+def tile(client, ctx, rng, local):
+    lat, lon = ctx.point(rng)
+    z = int(rng.integers(10, 18))
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return client.get(f"/api/tiles/{z}/{x}/{y}")
+
+
+def export_bbox(client, ctx, rng, local):
+    return client.get("/api/measurements/export", params={"format": "ndjson", "bbox": ctx.bbox(rng, 300)})
+
+
+def stats(client, ctx, rng, local):
+    return client.get("/api/stats", params={"bbox": ctx.bbox(rng, 3000), "groupBy": "cell"})
+
+
+def cached(client, ctx, rng, local):
+    """같은 목록 요청 반복 (If-None-Match -> 304 경로)"""
+    etag = getattr(local, "etag", None)
+    response = client.get("/api/measurements", params={"limit": 100},
+                          headers={"If-None-Match": etag} if etag else {})
+    local.etag = response.headers.get("etag", etag)
+    return response
+
+
+def status(client, ctx, rng, local):
+    return client.get(f"/api/measurements/{int(rng.integers(1, ctx.rows + 1))}/status")
+
+
+def jobs(client, ctx, rng, local):
+    return client.get("/api/jobs")
+
+
+# 실행 순서대로 (쓰기 시나리오는 조회 시나리오 뒤에 실행)
+SCENARIOS: Dict[str, Tuple[str, Callable]] = {
+    "health": ("GET /", health),
+    "list_offset": ("GET /api/measurements?skip=N&limit=100", list_offset),
+    "list_cursor": ("GET /api/measurements?cursor=...&limit=100", list_cursor),
+    "list_fields": ("GET /api/measurements?fields=(지도)&limit=1000", list_fields),
+    "bbox": ("GET /api/measurements?bbox=(500m)", bbox),
+    "radius": ("GET /api/measurements?lat&lon&radius=100", radius),
+    "tile": ("GET /api/tiles/{z}/{x}/{y} (z=10~17)", tile),
+    "stats": ("GET /api/stats?bbox=(3km)&groupBy=cell", stats),
+    "export_bbox": ("GET /api/measurements/export?format=ndjson&bbox=(300m)", export_bbox),
+    "cached": ("GET /api/measurements (If-None-Match)", cached),
+    "status": ("GET /api/measurements/{id}/status", status),
+    "jobs": ("GET /api/jobs", jobs),
+    "create": ("POST /api/measurements", create),
+    "upload": ("POST /api/measurements/upload (multipart, 3MB 사진)", upload),
+}
+
+
+def run_scenario(client, ctx: ScenarioContext, name: str, requests: int, concurrency: int = 1,
+                 warmup: int = 10) -> dict:
+    """시나리오를 concurrency개 스레드로 총 requests회 실행하고 지연 시간 분포를 요약합니다."""
+    fn = SCENARIOS[name][1]
+    index = list(SCENARIOS).index(name)
+
+    warm_local = threading.local()
+    warm_rng = np.random.default_rng([ctx.seed, 100, index])
+    for _ in range(warmup):
+        fn(client, ctx, warm_rng, warm_local)
+
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    per_worker = [requests // concurrency + (1 if w < requests % concurrency else 0) for w in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(worker_id: int):
+        rng = np.random.default_rng([ctx.seed, 200, index, worker_id])
+        local = threading.local()
+        timings, failed = [], 0
+        barrier.wait()
+        for _ in range(per_worker[worker_id]):
+            started = time.perf_counter()
+            try:
+                response = fn(client, ctx, rng, local)
+                response.read()
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if ok:
+                timings.append(elapsed_ms)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(timings)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(concurrency)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    return results.summarize(latencies, time.perf_counter() - started, errors[0])
@@ -62,7 +62,7 @@ interface TreeData {
     imageHeight?: number;
     focalLength?: number;
     cameraDistance?: number;
-    imageData?: string; // Base64 이미지 데이터
+    imageUrl?: string; // 원본 사진 URL (/api/measurements/{id}/image)
 
     // 시스템 정보
     deviceModel?: string;
@@ -181,170 +181,175 @@ const TreeViewMap: React.FC<TreeViewMapProps> = ({ focusTarget, onSelectTarget }
 
 
             sortedTrees.forEach((tree, index) => {
-                // 센서 데이터 유무 확인 (null과 undefined 모두 체크)
-                const hasSensorData = tree.devicePitch != null || tree.ambientLight != null;
-
-                const popupContent = `
-                    <div style="min-width: 280px; max-width: 400px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;">
-                        ${tree.imageData ? `
-                        <div style="position: relative; margin-bottom: 12px;">
-                            <img src="${tree.imageData}" style="width: 100%; height: 200px; object-fit: cover; border-radius: 12px; border: 1px solid #ddd; box-shadow: 0 4px 12px rgba(0,0,0,0.15);" />
-                            <div style="position: absolute; bottom: 8px; right: 8px; background: rgba(0,0,0,0.6); color: white; padding: 2px 8px; border-radius: 4px; font-size: 10px;">ID: ${tree.id}</div>
-                        </div>
-                        ` : ''}
-                        
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px; border-bottom: 2px solid #4CAF50; padding-bottom: 5px;">
-                            <h3 style="margin: 0; color: #2c3e50; font-size: 1.2em;">${tree.species}</h3>
-                            <span style="font-size: 11px; color: #666;">${new Date(tree.measured_at).toLocaleString('ko-KR')}</span>
-                        </div>
-                        
-                        <!-- 주요 측정 수치 (Grid) -->
-                        <div style="background: #f0f4f7; padding: 12px; border-radius: 10px; border: 1px solid #e0e6ed; margin-bottom: 15px;">
-                             <div style="font-size: 10px; color: #455a64; font-weight: bold; margin-bottom: 8px; border-bottom: 1px solid #d1d9e6; padding-bottom: 4px; display: flex; justify-content: space-between;">
-                                <span>📊 측정 수치 비교</span>
-                                <span style="color: #2e7d32;">(Smartphone vs Server AI)</span>
-                             </div>
-                             <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 8px;">
-                                <!-- 1. 흉고직경 (DBH) -->
-                                <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
-                                    <div style="font-size: 8px; color: #78909c;">흉고직경 (DBH)</div>
-                                    <div style="font-size: 13px; font-weight: 800;">
-                                        <span style="color: #666; font-size: 10px;">${tree.dbh}</span> 
-                                        <span style="margin: 0 2px; color: #ccc;">→</span> 
-                                        <span style="color: #d32f2f;">${tree.serverDbh || '-'}</span>
-                                        <small style="font-size: 8px; color: #999;">cm</small>
+                // 센서 원시 데이터는 목록 응답에 없으므로 팝업을 열 때 불러와 다시 그림
+                const renderPopup = (tree: TreeData) => {
+                    // 센서 데이터 유무 확인 (null과 undefined 모두 체크)
+                    const hasSensorData = tree.devicePitch != null || tree.ambientLight != null;
+
+                    const popupContent = `
+                        <div style="min-width: 280px; max-width: 400px; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;">
+                            ${tree.imageUrl ? `
+                            <div style="position: relative; margin-bottom: 12px;">
+                                <img src="${tree.imageUrl}" loading="lazy" style="width: 100%; height: 200px; object-fit: cover; border-radius: 12px; border: 1px solid #ddd; box-shadow: 0 4px 12px rgba(0,0,0,0.15);" />
+                                <div style="position: absolute; bottom: 8px; right: 8px; background: rgba(0,0,0,0.6); color: white; padding: 2px 8px; border-radius: 4px; font-size: 10px;">ID: ${tree.id}</div>
+                            </div>
+                            ` : ''}
+                            
+                            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px; border-bottom: 2px solid #4CAF50; padding-bottom: 5px;">
+                                <h3 style="margin: 0; color: #2c3e50; font-size: 1.2em;">${tree.species}</h3>
+                                <span style="font-size: 11px; color: #666;">${new Date(tree.measured_at).toLocaleString('ko-KR')}</span>
+                            </div>
+                            
+                            <!-- 주요 측정 수치 (Grid) -->
+                            <div style="background: #f0f4f7; padding: 12px; border-radius: 10px; border: 1px solid #e0e6ed; margin-bottom: 15px;">
+                                 <div style="font-size: 10px; color: #455a64; font-weight: bold; margin-bottom: 8px; border-bottom: 1px solid #d1d9e6; padding-bottom: 4px; display: flex; justify-content: space-between;">
+                                    <span>📊 측정 수치 비교</span>
+                                    <span style="color: #2e7d32;">(Smartphone vs Server AI)</span>
+                                 </div>
+                                 <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 8px;">
+                                    <!-- 1. 흉고직경 (DBH) -->
+                                    <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
+                                        <div style="font-size: 8px; color: #78909c;">흉고직경 (DBH)</div>
+                                        <div style="font-size: 13px; font-weight: 800;">
+                                            <span style="color: #666; font-size: 10px;">${tree.dbh}</span> 
+                                            <span style="margin: 0 2px; color: #ccc;">→</span> 
+                                            <span style="color: #d32f2f;">${tree.serverDbh || '-'}</span>
+                                            <small style="font-size: 8px; color: #999;">cm</small>
+                                        </div>
                                     </div>
-                                </div>
-                                <!-- 2. 수고 (Height) -->
-                                <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
-                                    <div style="font-size: 8px; color: #78909c;">수고 (Height)</div>
-                                    <div style="font-size: 13px; font-weight: 800;">
-                                        <span style="color: #666; font-size: 10px;">${tree.height}</span> 
-                                        <span style="margin: 0 2px; color: #ccc;">→</span> 
-                                        <span style="color: #2e7d32;">${tree.serverHeight || '-'}</span>
-                                        <small style="font-size: 8px; color: #999;">m</small>
+                                    <!-- 2. 수고 (Height) -->
+                                    <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
+                                        <div style="font-size: 8px; color: #78909c;">수고 (Height)</div>
+                                        <div style="font-size: 13px; font-weight: 800;">
+                                            <span style="color: #666; font-size: 10px;">${tree.height}</span> 
+                                            <span style="margin: 0 2px; color: #ccc;">→</span> 
+                                            <span style="color: #2e7d32;">${tree.serverHeight || '-'}</span>
+                                            <small style="font-size: 8px; color: #999;">m</small>
+                                        </div>
                                     </div>
-                                </div>
-                                <!-- 3. 수관폭 (Crown Width) -->
-                                <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
-                                    <div style="font-size: 8px; color: #78909c;">수관폭 (Width)</div>
-                                    <div style="font-size: 13px; font-weight: 800;">
-                                        <span style="color: #666; font-size: 10px;">${tree.crownWidth || '-'}</span> 
-                                        <span style="margin: 0 2px; color: #ccc;">→</span> 
-                                        <span style="color: #1b5e20;">${tree.serverCrownWidth || '-'}</span>
-                                        <small style="font-size: 8px; color: #999;">m</small>
+                                    <!-- 3. 수관폭 (Crown Width) -->
+                                    <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
+                                        <div style="font-size: 8px; color: #78909c;">수관폭 (Width)</div>
+                                        <div style="font-size: 13px; font-weight: 800;">
+                                            <span style="color: #666; font-size: 10px;">${tree.crownWidth || '-'}</span> 
+                                            <span style="margin: 0 2px; color: #ccc;">→</span> 
+                                            <span style="color: #1b5e20;">${tree.serverCrownWidth || '-'}</span>
+                                            <small style="font-size: 8px; color: #999;">m</small>
+                                        </div>
                                     </div>
-                                </div>
-                                <!-- 4. 지하고 (Ground Clr.) -->
-                                <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
-                                    <div style="font-size: 8px; color: #78909c;">지하고 (Clr.)</div>
-                                    <div style="font-size: 13px; font-weight: 800;">
-                                        <span style="color: #666; font-size: 10px;">${tree.groundClearance || '-'}</span> 
-                                        <span style="margin: 0 2px; color: #ccc;">→</span> 
-                                        <span style="color: #0277bd;">${tree.serverGroundClearance || '-'}</span>
-                                        <small style="font-size: 8px; color: #999;">m</small>
+                                    <!-- 4. 지하고 (Ground Clr.) -->
+                                    <div style="text-align: center; background: white; padding: 6px; border-radius: 6px; border: 1px solid #d1d9e6;">
+                                        <div style="font-size: 8px; color: #78909c;">지하고 (Clr.)</div>
+                                        <div style="font-size: 13px; font-weight: 800;">
+                                            <span style="color: #666; font-size: 10px;">${tree.groundClearance || '-'}</span> 
+                                            <span style="margin: 0 2px; color: #ccc;">→</span> 
+                                            <span style="color: #0277bd;">${tree.serverGroundClearance || '-'}</span>
+                                            <small style="font-size: 8px; color: #999;">m</small>
+                                        </div>
                                     </div>
-                                </div>
-                             </div>
-                        </div>
+                                 </div>
+                            </div>
 
-                        <div style="max-height: 250px; overflow-y: auto; padding-right: 5px; font-size: 12px; line-height: 1.6;">
-                            <!-- 서버 AI 처리 상태 정보 -->
-                            <div style="background: #fff9c4; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #fbc02d; box-shadow: 0 2px 4px rgba(0,0,0,0.05);">
-                                <strong>🤖 서버 AI 정밀 분석</strong><br/>
-                                <div style="display: flex; justify-content: space-between; margin-top: 4px; font-size: 11px;">
-                                    <span>상태:</span>
-                                    <span style="font-weight: bold; color: ${tree.isServerProcessed ? '#2e7d32' : '#f57c00'}">
-                                        ${tree.isServerProcessed ? '분석 완료' : '대기 중'}
-                                    </span>
-                                </div>
-                                ${tree.serverConfidence ? `
-                                <div style="display: flex; justify-content: space-between; font-size: 11px;">
-                                    <span>AI 확신도:</span>
-                                    <span style="font-weight: bold;">${(tree.serverConfidence * 100).toFixed(1)}%</span>
-                                </div>
-                                ` : ''}
-                                ${tree.serverSpecies ? `
-                                <div style="display: flex; justify-content: space-between; font-size: 11px;">
-                                    <span>정밀 판독 수종:</span>
-                                    <span style="font-weight: bold; color: #1565c0;">${tree.serverSpecies}</span>
+                            <div style="max-height: 250px; overflow-y: auto; padding-right: 5px; font-size: 12px; line-height: 1.6;">
+                                <!-- 서버 AI 처리 상태 정보 -->
+                                <div style="background: #fff9c4; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #fbc02d; box-shadow: 0 2px 4px rgba(0,0,0,0.05);">
+                                    <strong>🤖 서버 AI 정밀 분석</strong><br/>
+                                    <div style="display: flex; justify-content: space-between; margin-top: 4px; font-size: 11px;">
+                                        <span>상태:</span>
+                                        <span style="font-weight: bold; color: ${tree.isServerProcessed ? '#2e7d32' : '#f57c00'}">
+                                            ${tree.isServerProcessed ? '분석 완료' : '대기 중'}
+                                        </span>
+                                    </div>
+                                    ${tree.serverConfidence ? `
+                                    <div style="display: flex; justify-content: space-between; font-size: 11px;">
+                                        <span>AI 확신도:</span>
+                                        <span style="font-weight: bold;">${(tree.serverConfidence * 100).toFixed(1)}%</span>
+                                    </div>
+                                    ` : ''}
+                                    ${tree.serverSpecies ? `
+                                    <div style="display: flex; justify-content: space-between; font-size: 11px;">
+                                        <span>정밀 판독 수종:</span>
+                                        <span style="font-weight: bold; color: #1565c0;">${tree.serverSpecies}</span>
+                                    </div>
+                                    ` : ''}
                                 </div>
-                                ` : ''}
-                            </div>
 
-                            <!-- 건강도 및 기본 정보 -->
-                            <div style="background: #ffffff; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #4CAF50; box-shadow: 0 2px 4px rgba(0,0,0,0.05);">
-                                <strong>🌿 생육 상태 및 정보</strong><br/>
-                                <div style="display: flex; justify-content: space-between; margin-top: 4px;">
-                                    <span>활력도(Health):</span>
-                                    <span style="font-weight: bold; color: ${tree.healthScore > 70 ? '#2e7d32' : '#f57c00'}">${tree.healthScore}%</span>
+                                <!-- 건강도 및 기본 정보 -->
+                                <div style="background: #ffffff; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #4CAF50; box-shadow: 0 2px 4px rgba(0,0,0,0.05);">
+                                    <strong>🌿 생육 상태 및 정보</strong><br/>
+                                    <div style="display: flex; justify-content: space-between; margin-top: 4px;">
+                                        <span>활력도(Health):</span>
+                                        <span style="font-weight: bold; color: ${tree.healthScore > 70 ? '#2e7d32' : '#f57c00'}">${tree.healthScore}%</span>
+                                    </div>
                                 </div>
-                            </div>
-                            
-                            <!-- 센서 및 환경 -->
-                            <div style="background: #e3f2fd; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #2196F3;">
-                                <strong>📱 기기 센서 및 환경</strong><br/>
-                                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 4px; margin-top: 5px; font-size: 11px;">
-                                    ${tree.devicePitch != null ? `<div>Pitch: ${tree.devicePitch.toFixed(1)}°</div>` : ''}
-                                    ${tree.deviceRoll != null ? `<div>Roll: ${tree.deviceRoll.toFixed(1)}°</div>` : ''}
-                                    ${tree.deviceAzimuth != null ? `<div>Azimuth: ${tree.deviceAzimuth.toFixed(1)}°</div>` : ''}
-                                    ${tree.ambientLight != null ? `<div>Light: ${tree.ambientLight.toFixed(0)} lx</div>` : ''}
-                                    ${tree.pressure != null ? `<div>Pressure: ${tree.pressure.toFixed(1)} hPa</div>` : ''}
-                                    ${tree.temperature != null ? `<div>Temp: ${tree.temperature.toFixed(1)}°C</div>` : ''}
-                                    ${tree.altitude != null ? `<div>Altitude: ${tree.altitude.toFixed(1)} m</div>` : ''}
+                                
+                                <!-- 센서 및 환경 -->
+                                <div style="background: #e3f2fd; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #2196F3;">
+                                    <strong>📱 기기 센서 및 환경</strong><br/>
+                                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 4px; margin-top: 5px; font-size: 11px;">
+                                        ${tree.devicePitch != null ? `<div>Pitch: ${tree.devicePitch.toFixed(1)}°</div>` : ''}
+                                        ${tree.deviceRoll != null ? `<div>Roll: ${tree.deviceRoll.toFixed(1)}°</div>` : ''}
+                                        ${tree.deviceAzimuth != null ? `<div>Azimuth: ${tree.deviceAzimuth.toFixed(1)}°</div>` : ''}
+                                        ${tree.ambientLight != null ? `<div>Light: ${tree.ambientLight.toFixed(0)} lx</div>` : ''}
+                                        ${tree.pressure != null ? `<div>Pressure: ${tree.pressure.toFixed(1)} hPa</div>` : ''}
+                                        ${tree.temperature != null ? `<div>Temp: ${tree.temperature.toFixed(1)}°C</div>` : ''}
+                                        ${tree.altitude != null ? `<div>Altitude: ${tree.altitude.toFixed(1)} m</div>` : ''}
+                                    </div>
                                 </div>
-                            </div>
 
-                            <!-- IMU 원시 데이터 -->
-                            ${tree.accelerometerX != null || tree.gyroscopeX != null ? `
-                            <div style="background: #f1f8e9; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #8bc34a;">
-                                <strong>📊 IMU Raw Data</strong>
-                                <div style="font-size: 10px; color: #555; margin-top: 4px;">
-                                    ${tree.accelerometerX != null ? `<div>Acc: ${tree.accelerometerX.toFixed(3)}, ${tree.accelerometerY?.toFixed(3)}, ${tree.accelerometerZ?.toFixed(3)}</div>` : ''}
-                                    ${tree.gyroscopeX != null ? `<div>Gyro: ${tree.gyroscopeX.toFixed(4)}, ${tree.gyroscopeY?.toFixed(4)}, ${tree.gyroscopeZ?.toFixed(4)}</div>` : ''}
-                                    ${tree.magnetometerX != null ? `<div>Mag: ${tree.magnetometerX.toFixed(1)}, ${tree.magnetometerY?.toFixed(1)}, ${tree.magnetometerZ?.toFixed(1)}</div>` : ''}
+                                <!-- IMU 원시 데이터 -->
+                                ${tree.accelerometerX != null || tree.gyroscopeX != null ? `
+                                <div style="background: #f1f8e9; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #8bc34a;">
+                                    <strong>📊 IMU Raw Data</strong>
+                                    <div style="font-size: 10px; color: #555; margin-top: 4px;">
+                                        ${tree.accelerometerX != null ? `<div>Acc: ${tree.accelerometerX.toFixed(3)}, ${tree.accelerometerY?.toFixed(3)}, ${tree.accelerometerZ?.toFixed(3)}</div>` : ''}
+                                        ${tree.gyroscopeX != null ? `<div>Gyro: ${tree.gyroscopeX.toFixed(4)}, ${tree.gyroscopeY?.toFixed(4)}, ${tree.gyroscopeZ?.toFixed(4)}</div>` : ''}
+                                        ${tree.magnetometerX != null ? `<div>Mag: ${tree.magnetometerX.toFixed(1)}, ${tree.magnetometerY?.toFixed(1)}, ${tree.magnetometerZ?.toFixed(1)}</div>` : ''}
+                                    </div>
                                 </div>
-                            </div>
-                            ` : ''}
+                                ` : ''}
 
-                            <!-- 카메라 및 시스템 -->
-                            <div style="background: #fff3e0; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #ff9800;">
-                                <strong>📷 촬영 및 기기 정보</strong><br/>
-                                <div style="font-size: 11px; margin-top: 4px;">
-                                    <strong>해상도:</strong> ${tree.imageWidth} × ${tree.imageHeight}<br/>
-                                    <strong>초점/거리:</strong> ${tree.focalLength}mm / ${tree.cameraDistance}m<br/>
-                                    <strong>기기:</strong> ${tree.deviceModel} (${tree.osVersion})
+                                <!-- 카메라 및 시스템 -->
+                                <div style="background: #fff3e0; padding: 10px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid #ff9800;">
+                                    <strong>📷 촬영 및 기기 정보</strong><br/>
+                                    <div style="font-size: 11px; margin-top: 4px;">
+                                        <strong>해상도:</strong> ${tree.imageWidth} × ${tree.imageHeight}<br/>
+                                        <strong>초점/거리:</strong> ${tree.focalLength}mm / ${tree.cameraDistance}m<br/>
+                                        <strong>기기:</strong> ${tree.deviceModel} (${tree.osVersion})
+                                    </div>
                                 </div>
-                            </div>
 
-                            <!-- GPS 정보 (정밀 비교) -->
-                            <div style="background: #f8f9fa; padding: 10px; border-radius: 8px; border-left: 4px solid #607d8b;">
-                                <strong style="color: #455a64;">📍 위치 정보 (3종 통합)</strong>
-                                <div style="margin-top: 6px; font-size: 10.5px; color: #333;">
-                                    <div style="display: flex; justify-content: space-between; margin-bottom: 2px;">
-                                        <span style="color: #78909c;">📱 기기 GPS:</span>
-                                        <span style="font-family: monospace;">${tree.deviceLatitude?.toFixed(7)}, ${tree.deviceLongitude?.toFixed(7)}</span>
-                                    </div>
-                                    <div style="display: flex; justify-content: space-between; margin-bottom: 2px;">
-                                        <span style="color: #78909c;">🌳 산정 위치:</span>
-                                        <span style="font-family: monospace;">${tree.treeLatitude?.toFixed(7)}, ${tree.treeLongitude?.toFixed(7)}</span>
-                                    </div>
-                                    ${tree.adjustedTreeLatitude ? `
-                                    <div style="display: flex; justify-content: space-between; margin-top: 4px; padding-top: 4px; border-top: 1px dotted #bccad1; color: #d32f2f; font-weight: bold;">
-                                        <span>📍 최종 보정:</span>
-                                        <span style="font-family: monospace;">${tree.adjustedTreeLatitude.toFixed(7)}, ${tree.adjustedTreeLongitude?.toFixed(7)}</span>
-                                    </div>
-                                    ` : `
-                                    <div style="display: flex; justify-content: space-between; margin-top: 4px; padding-top: 4px; border-top: 1px dotted #bccad1; color: #78909c;">
-                                        <span>📍 최종 보정:</span>
-                                        <span>미보정 (산정 위치 사용)</span>
+                                <!-- GPS 정보 (정밀 비교) -->
+                                <div style="background: #f8f9fa; padding: 10px; border-radius: 8px; border-left: 4px solid #607d8b;">
+                                    <strong style="color: #455a64;">📍 위치 정보 (3종 통합)</strong>
+                                    <div style="margin-top: 6px; font-size: 10.5px; color: #333;">
+                                        <div style="display: flex; justify-content: space-between; margin-bottom: 2px;">
+                                            <span style="color: #78909c;">📱 기기 GPS:</span>
+                                            <span style="font-family: monospace;">${tree.deviceLatitude?.toFixed(7)}, ${tree.deviceLongitude?.toFixed(7)}</span>
+                                        </div>
+                                        <div style="display: flex; justify-content: space-between; margin-bottom: 2px;">
+                                            <span style="color: #78909c;">🌳 산정 위치:</span>
+                                            <span style="font-family: monospace;">${tree.treeLatitude?.toFixed(7)}, ${tree.treeLongitude?.toFixed(7)}</span>
+                                        </div>
+                                        ${tree.adjustedTreeLatitude ? `
+                                        <div style="display: flex; justify-content: space-between; margin-top: 4px; padding-top: 4px; border-top: 1px dotted #bccad1; color: #d32f2f; font-weight: bold;">
+                                            <span>📍 최종 보정:</span>
+                                            <span style="font-family: monospace;">${tree.adjustedTreeLatitude.toFixed(7)}, ${tree.adjustedTreeLongitude?.toFixed(7)}</span>
+                                        </div>
+                                        ` : `
+                                        <div style="display: flex; justify-content: space-between; margin-top: 4px; padding-top: 4px; border-top: 1px dotted #bccad1; color: #78909c;">
+                                            <span>📍 최종 보정:</span>
+                                            <span>미보정 (산정 위치 사용)</span>
+                                        </div>
+                                        `}
                                     </div>
-                                    `}
                                 </div>
                             </div>
                         </div>
-                    </div>
-                `;
+                    `;
+                };
+
+                const popupContent = renderPopup(tree);
 
                 // 마커 수순: 보정 위치 > 나무 위치 > 기기 위치
                 const markerLat = tree.adjustedTreeLatitude ?? tree.treeLatitude ?? tree.deviceLatitude ?? 0;
@@ -355,6 +360,18 @@ const TreeViewMap: React.FC<TreeViewMapProps> = ({ focusTarget, onSelectTarget }
                         .bindPopup(popupContent, { maxWidth: 400 })
                         .addTo(markersLayer.current!);
 
+                    marker.once('popupopen', async () => {
+                        try {
+                            const response = await fetch(`/api/measurements/${tree.id}/telemetry`);
+                            if (response.ok) {
+                                const telemetry = await response.json();
+                                marker.setPopupContent(renderPopup({ ...tree, ...telemetry }));
+                            }
+                        } catch (error) {
+                            console.error('Failed to fetch telemetry:', error);
+                        }
+                    });
+
                     // 리스트 연동: 마커 클릭 시 부모 컴포넌트에 알림
                     marker.on('click', () => {
                         onSelectTarget?.({ lat: markerLat, lng: markerLon, id: tree.id });
@@ -39,7 +39,9 @@ const MapDashboard = () => {
 
     const fetchTrees = async () => {
         try {
-            const response = await fetch(`/api/measurements`);
+            // 대시보드에 필요한 필드만 요청 (IMU/카메라 메타데이터 제외)
+            const fields = 'id,species,measured_at,dbh,height,crownWidth,groundClearance,treeLatitude,treeLongitude,adjustedTreeLatitude,adjustedTreeLongitude,deviceLatitude,deviceLongitude';
+            const response = await fetch(`/api/measurements?fields=${fields}`);
             if (response.ok) {
                 const data = await response.json();
                 setTrees(data);
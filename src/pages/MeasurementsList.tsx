@@ -54,7 +54,7 @@ interface TreeData {
     deviceModel?: string;
     osVersion?: string;
     appVersion?: string;
-    imageData?: string;
+    imageUrl?: string;
 
     // Server AI Results
     isServerProcessed?: number;
@@ -98,12 +98,59 @@ const MeasurementsList = () => {
         tree.id.toString().includes(searchTerm)
     );
 
-    const handleExportCSV = () => {
+    // 센서 원시 데이터는 목록 응답에 없으므로 상세 보기 시 따로 불러옴
+    const openReport = async (tree: TreeData) => {
+        setSelectedTree(tree);
+        try {
+            const response = await fetch(`/api/measurements/${tree.id}/telemetry`);
+            if (response.ok) {
+                const telemetry = await response.json();
+                setSelectedTree(current => (current && current.id === tree.id ? { ...current, ...telemetry } : current));
+            }
+        } catch (error) {
+            console.error('Failed to fetch telemetry:', error);
+        }
+    };
+
+    // CSV에 넣을 센서 컬럼은 export 엔드포인트(ndjson)로 한 번에 받아 측정 ID별로 합침
+    const fetchExportTelemetry = async (): Promise<Map<number, Partial<TreeData>>> => {
+        const telemetry = new Map<number, Partial<TreeData>>();
+        const columns = [
+            "id", "deviceModel", "osVersion", "appVersion", "focalLength", "cameraDistance", "imageWidth", "imageHeight",
+            "temperature", "pressure", "ambientLight", "altitude", "devicePitch", "deviceRoll", "deviceAzimuth",
+            "accelerometerX", "accelerometerY", "accelerometerZ", "gyroscopeX", "gyroscopeY", "gyroscopeZ"
+        ];
+        const response = await fetch(`/api/measurements/export?format=ndjson&columns=${columns.join(",")}`);
+        if (!response.ok) {
+            return telemetry;
+        }
+        const text = await response.text();
+        for (const line of text.split("\n")) {
+            if (!line) continue;
+            const row = JSON.parse(line);
+            const values: Record<string, unknown> = {};
+            for (const [key, value] of Object.entries(row)) {
+                // export 출력은 snake_case 컬럼명
+                values[key.replace(/_([a-z])/g, (_, c) => c.toUpperCase())] = value;
+            }
+            telemetry.set(row.id, values as Partial<TreeData>);
+        }
+        return telemetry;
+    };
+
+    const handleExportCSV = async () => {
         if (filteredTrees.length === 0) {
             alert("No data to export.");
             return;
         }
 
+        let telemetry = new Map<number, Partial<TreeData>>();
+        try {
+            telemetry = await fetchExportTelemetry();
+        } catch (error) {
+            console.error('Failed to fetch telemetry:', error);
+        }
+
         // Define headers (excluding imageData)
         const headers = [
             "ID", "Species", "DBH(cm)", "Height(m)", "Health(%)", "Measured At",
@@ -116,7 +163,7 @@ const MeasurementsList = () => {
             "AccelX", "AccelY", "AccelZ", "GyroX", "GyroY", "GyroZ"
         ];
 
-        const rows = filteredTrees.map(t => [
+        const rows = filteredTrees.map(tree => ({ ...tree, ...telemetry.get(tree.id) })).map(t => [
             t.id, t.species, t.dbh.toFixed(2), t.height.toFixed(2), t.healthScore, t.measured_at,
             t.deviceModel || "", t.osVersion || "", t.appVersion || "",
             t.treeLatitude, t.treeLongitude, t.deviceLatitude, t.deviceLongitude,
@@ -233,7 +280,7 @@ const MeasurementsList = () => {
                                         <td style={tdStyle}>{new Date(tree.measured_at).toLocaleString()}</td>
                                         <td style={tdStyle}>
                                             <button
-                                                onClick={() => setSelectedTree(tree)}
+                                                onClick={() => openReport(tree)}
                                                 style={{
                                                     background: 'none', border: 'none', color: '#3b82f6',
                                                     cursor: 'pointer', display: 'flex', alignItems: 'center', gap: '4px', fontWeight: 'bold'
@@ -275,8 +322,8 @@ const MeasurementsList = () => {
                             {/* Left Panel: Visuals & Summary */}
                             <div style={{ display: 'flex', flexDirection: 'column', gap: '20px' }}>
                                 <div style={imageContainerStyle}>
-                                    {selectedTree.imageData ? (
-                                        <img src={selectedTree.imageData} alt="Tree" style={imageStyle} />
+                                    {selectedTree.imageUrl ? (
+                                        <img src={selectedTree.imageUrl} alt="Tree" style={imageStyle} />
                                     ) : (
                                         <div style={placeholderImageStyle}>NO IMAGE CAPTURED</div>
                                     )}
@@ -0,0 +1,78 @@
+"""
+백엔드 테스트 공통 설정
+
+api/ 모듈을 index.py와 같은 방식(평면 임포트)으로 사용합니다. database 모듈은 임포트 시점에
+엔진을 만들므로, DB / 저장소 경로 환경 변수는 어떤 api 모듈보다 먼저 임시 디렉토리로 지정합니다.
+
+    python -m pytest -q
+"""
+import datetime
+import os
+import sys
+import tempfile
+
+import pytest
+
+_WORKDIR = tempfile.mkdtemp(prefix="treemap_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_WORKDIR, 'tree_map.db')}"
+os.environ["TREEMAP_BLOB_DIR"] = os.path.join(_WORKDIR, "blobs")
+os.environ["THUMBNAIL_DIR"] = os.path.join(_WORKDIR, "thumbs")
+os.environ["DB_SNAPSHOT"] = "off"
+os.environ["AI_MODEL_PRELOAD"] = "0"
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """스키마와 공간 인덱스(R*Tree + 트리거)를 만든 빈 SQLite 파일 DB"""
+    import database
+    import models
+    import spatial
+
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    spatial.ensure_spatial_index(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+def measurement(**values) -> dict:
+    """measurements 행 값 (필수 측정값 기본값 + values)"""
+    row = {
+        "dbh": 30.0, "height": 12.0, "species": "소나무", "health_score": 80.0,
+        "device_latitude": 37.5665, "device_longitude": 126.9780,
+        "tree_latitude": 37.5665, "tree_longitude": 126.9780,
+        "measured_at": datetime.datetime(2024, 5, 1, 9, 0),
+    }
+    row.update(values)
+    return row
+
+
+@pytest.fixture
+def add_measurements(db):
+    """add_measurements(행 값 dict, ...) -> 삽입한 id 목록 (커밋까지)"""
+    import models
+
+    def add(*rows):
+        objects = [models.TreeMeasurement(**measurement(**row)) for row in rows]
+        db.add_all(objects)
+        db.commit()
+        return [obj.id for obj in objects]
+
+    return add
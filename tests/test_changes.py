@@ -0,0 +1,80 @@
+import changes
+import clusters
+import serializers
+from response_cache import ResponseCache
+
+from conftest import measurement
+
+LAT, LON = 37.5665, 126.9780
+
+
+def _record(session_factory, ids, kind):
+    with session_factory() as session:
+        changes.ChangeFeed.record(session, ids, kind)
+        session.commit()
+
+
+def test_read_orders_by_seq_and_merges_repeated_changes(db, session_factory, add_measurements):
+    first, second, third = add_measurements(measurement(), measurement(), measurement())
+    _record(session_factory, [first, second], changes.CREATED)
+    _record(session_factory, [third], changes.CREATED)
+    _record(session_factory, [first], changes.PROCESSED)
+
+    page = changes.ChangeFeed.read(db, 0, 10, serializers.MEASUREMENT)
+
+    # 같은 측정의 여러 변경은 마지막 변경(seq) 위치로 합쳐짐
+    assert [(c["measurementId"], c["kind"]) for c in page["changes"]] == [
+        (second, changes.CREATED), (third, changes.CREATED), (first, changes.PROCESSED)]
+    seqs = [c["seq"] for c in page["changes"]]
+    assert seqs == sorted(seqs)
+    assert [row.id for row in page["rows"]] == [second, third, first]
+    assert page["next"] == changes.ChangeFeed.latest_seq(db) == seqs[-1]
+    assert page["has_more"] is False
+
+
+def test_read_pages_with_next_cursor(db, session_factory, add_measurements):
+    ids = add_measurements(*[measurement() for _ in range(5)])
+    for measurement_id in ids:
+        _record(session_factory, [measurement_id], changes.CREATED)
+
+    seen, since = [], 0
+    while True:
+        page = changes.ChangeFeed.read(db, since, 2, serializers.MEASUREMENT)
+        seen += [c["measurementId"] for c in page["changes"]]
+        since = page["next"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+    # 마지막 seq 이후에는 빈 페이지와 같은 커서
+    assert changes.ChangeFeed.read(db, since, 2, serializers.MEASUREMENT) == {
+        "next": since, "has_more": False, "changes": [], "rows": []}
+
+
+def test_cluster_sync_invalidates_tiles_of_new_changes(db, session_factory, add_measurements):
+    index = clusters.ClusterIndex()
+    index.sync(db, changes.ChangeFeed.latest_seq(db))
+    near_tile = (10, *clusters.lonlat_to_tile(LAT, LON, 10))
+    far_tile = (10, *clusters.lonlat_to_tile(35.1796, 129.0756, 10))
+    index._cache.update({near_tile: {}, far_tile: {}})
+
+    # 다른 프로세스가 저장한 측정: change_log에만 남고 이 인스턴스의 캐시는 직접 무효화되지 않음
+    created = add_measurements(measurement(tree_latitude=LAT, tree_longitude=LON))
+    _record(session_factory, created, changes.CREATED)
+    index.sync(db, changes.ChangeFeed.latest_seq(db))
+
+    assert near_tile not in index._cache
+    assert far_tile in index._cache
+
+
+def test_response_cache_sync_bumps_only_on_newer_seq():
+    cache = ResponseCache()
+    base = cache.sync(3)
+    cache.put("k", base, 200, [], b"body")
+
+    assert cache.sync(3) == base
+    assert cache.get("k", base) is not None
+    bumped = cache.sync(4)
+    assert bumped > base
+    assert cache.get("k", bumped) is None
+    # 늦게 도착한 이전 seq로는 되돌아가지 않음
+    assert cache.sync(2) == bumped
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+import models
+from services.group_commit import GroupCommitter
+
+from conftest import measurement
+
+
+@pytest.fixture
+def blocked_committer(session_factory):
+    """첫 배치의 INSERT 직후 release가 설정될 때까지 멈추는 GroupCommitter"""
+    inserted = threading.Event()
+    release = threading.Event()
+
+    def on_inserted(db, ids):
+        inserted.set()
+        release.wait(5)
+
+    committer = GroupCommitter(session_factory, window_ms=0, on_inserted=on_inserted)
+    committer.start()
+    yield committer, inserted, release
+    release.set()
+    committer.stop()
+
+
+def _count(session_factory):
+    with session_factory() as db:
+        return db.query(models.TreeMeasurement).count()
+
+
+def test_timed_out_row_is_not_committed_later(session_factory, blocked_committer):
+    committer, inserted, release = blocked_committer
+    first = {}
+    worker = threading.Thread(target=lambda: first.setdefault("id", committer.submit(measurement())))
+    worker.start()
+    assert inserted.wait(5)
+
+    # 수집기가 첫 배치를 커밋하는 동안 대기열에서 시간 초과
+    with pytest.raises(TimeoutError):
+        committer.submit(measurement(species="느티나무"), timeout=0.05)
+
+    release.set()
+    worker.join(5)
+    assert first["id"] == 1
+    # 취소된 행은 수집기가 버리므로 재시도해도 중복이 생기지 않음
+    assert committer.submit(measurement(species="느티나무")) == 2
+    assert _count(session_factory) == 2
+
+
+def test_timeout_during_commit_waits_for_result(session_factory, blocked_committer):
+    committer, inserted, release = blocked_committer
+    threading.Timer(0.2, release.set).start()
+
+    # 이미 커밋에 포함된 행은 취소할 수 없으므로 시간이 지나도 결과를 기다림
+    assert committer.submit(measurement(), timeout=0.05) == 1
+    assert _count(session_factory) == 1
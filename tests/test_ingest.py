@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from services import ingest
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def _parse(body, ndjson=False, size=3, **kwargs):
+    async def collect():
+        return [record async for record in ingest.iter_json_records(_chunks(body, size), ndjson, **kwargs)]
+    return asyncio.run(collect())
+
+
+RECORDS = [{"species": "느티나무", "dbh": 31.5, "ok": True}, {"species": "은행나무", "dbh": 1e3, "ok": None}]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1024])
+def test_array_records_split_across_chunks(size):
+    # 숫자/리터럴/멀티바이트 문자가 청크 경계에서 잘려도 동일한 결과
+    body = json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")
+    assert _parse(body, size=size) == RECORDS
+
+
+@pytest.mark.parametrize("size", [1, 5, 1024])
+def test_ndjson_records_and_bad_lines(size):
+    body = "\n".join([json.dumps(RECORDS[0], ensure_ascii=False), "", "{bad", json.dumps(RECORDS[1])]).encode()
+    first, bad, second = _parse(body, ndjson=True, size=size)
+    assert (first, second) == tuple(RECORDS)
+    assert isinstance(bad, ValueError)
+
+
+def test_array_malformed_record_stops_at_error():
+    body = b'[{"a": 1}, {"a": 2}, {"a": tru}, ' + b'{"a": 3}, ' * 50 + b'{"a": 4}]'
+    seen = []
+
+    async def collect():
+        async for record in ingest.iter_json_records(_chunks(body, 64), False):
+            seen.append(record)
+
+    with pytest.raises(ValueError, match="Malformed JSON in record 2"):
+        asyncio.run(collect())
+    assert seen == [{"a": 1}, {"a": 2}]
+
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}', b'[{"a": 1}, {"a": ', b'{"a": 1}'])
+def test_array_truncated_or_not_array(body):
+    with pytest.raises(ValueError):
+        _parse(body)
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_record_size_cap(ndjson):
+    big = {"image_data": "x" * 200}
+    body = (json.dumps([{"a": 1}, big]) if not ndjson else '{"a": 1}\n' + json.dumps(big)).encode()
+    with pytest.raises(ValueError, match="maximum record size"):
+        _parse(body, ndjson=ndjson, size=16, max_record_size=100)
+    # 상한 이하이면 그대로 통과
+    assert _parse(body, ndjson=ndjson, size=16, max_record_size=1000)[1] == big
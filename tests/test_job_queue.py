@@ -0,0 +1,53 @@
+import datetime
+
+import models
+from services.job_queue import AIJobQueue, JOB_PENDING, JOB_RUNNING, JOB_DONE
+
+LEASE = 60
+
+
+def _jobs(db, *specs):
+    """(status, started_at 경과 초 또는 None, not_before 남은 초 또는 None) 목록으로 작업 생성"""
+    now = datetime.datetime.utcnow()
+    jobs = [
+        models.AIJob(measurement_id=index + 1, status=status,
+                     started_at=None if age is None else now - datetime.timedelta(seconds=age),
+                     not_before=None if wait is None else now + datetime.timedelta(seconds=wait))
+        for index, (status, age, wait) in enumerate(specs)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    return [job.id for job in jobs]
+
+
+def _status(db, job_id):
+    db.expire_all()
+    return db.get(models.AIJob, job_id).status
+
+
+def test_recover_resets_only_expired_leases(db, session_factory):
+    queue = AIJobQueue(session_factory, workers=0, lease_seconds=LEASE)
+    live, expired, done = _jobs(db, (JOB_RUNNING, 10, None), (JOB_RUNNING, LEASE * 2, None),
+                                (JOB_DONE, LEASE * 2, None))
+
+    queue.recover(db)
+
+    assert [_status(db, job_id) for job_id in (live, expired, done)] == [JOB_RUNNING, JOB_PENDING, JOB_DONE]
+
+
+def test_claim_takes_expired_running_jobs_and_respects_backoff(db, session_factory):
+    queue = AIJobQueue(session_factory, workers=0, lease_seconds=LEASE)
+    pending, live, expired, backoff = _jobs(
+        db, (JOB_PENDING, None, None), (JOB_RUNNING, 10, None),
+        (JOB_RUNNING, LEASE * 2, None), (JOB_PENDING, None, 30))
+
+    claimed = queue._claim(db, limit=10)
+
+    assert sorted(job_id for job_id, _ in claimed) == [pending, expired]
+    db.expire_all()
+    reclaimed = db.get(models.AIJob, expired)
+    assert reclaimed.attempts == 1
+    assert reclaimed.started_at > datetime.datetime.utcnow() - datetime.timedelta(seconds=LEASE)
+    # 다시 가져간 작업은 새 임대 기간 동안 다른 워커가 가져가지 않음
+    assert queue._claim(db, limit=10) == []
+    assert _status(db, backoff) == JOB_PENDING
@@ -0,0 +1,68 @@
+import datetime
+
+import pytest
+
+import models
+import queries
+
+
+def _pages(db, limit):
+    """목록 API와 같은 방식으로 cursor를 따라 끝까지 읽은 페이지별 id 목록"""
+    pages, cursor = [], None
+    while True:
+        query = queries.keyset_order(db.query(models.TreeMeasurement.id, models.TreeMeasurement.measured_at))
+        if cursor:
+            query = queries.apply_cursor(query, cursor)
+        rows = query.limit(limit).all()
+        pages.append([row.id for row in rows])
+        if len(rows) < limit:
+            return pages
+        cursor = queries.encode_cursor(rows[-1].measured_at, rows[-1].id)
+
+
+def test_cursor_round_trip():
+    at = datetime.datetime(2024, 5, 1, 9, 30, 15, 123456)
+    assert queries.decode_cursor(queries.encode_cursor(at, 42)) == (at, 42)
+    assert queries.decode_cursor(queries.encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WzEsMiwzXQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        queries.decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_all_rows_in_order(db, add_measurements):
+    base = datetime.datetime(2024, 5, 1)
+    # 같은 measured_at이 여러 행에 걸치도록 (페이지 경계에서 id로 구분)
+    add_measurements(*[{"measured_at": base + datetime.timedelta(minutes=i // 3)} for i in range(10)])
+
+    pages = _pages(db, limit=4)
+
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert sum(pages, []) == list(range(1, 11))
+
+
+def test_keyset_pages_continue_past_null_measured_at(db, add_measurements):
+    # measured_at이 NULL인 이전 데이터가 페이지 끝에 걸려도 다음 페이지가 비지 않아야 함
+    ids = add_measurements(*[{"measured_at": datetime.datetime(2024, 5, day)} for day in (2, 3, 1, 3, 3, 1)])
+    # ORM 기본값(utcnow) 대신 NULL을 직접 기록 (measured_at 없이 들어온 이전 데이터)
+    db.query(models.TreeMeasurement).filter(models.TreeMeasurement.id.in_([ids[1], ids[3], ids[4]])) \
+        .update({"measured_at": None}, synchronize_session=False)
+    db.commit()
+
+    pages = _pages(db, limit=2)
+
+    # NULL 구간(id 순)이 먼저, 이후 (measured_at, id) 순
+    assert sum(pages, []) == [2, 4, 5, 3, 6, 1]
+    assert [len(page) for page in pages] == [2, 2, 2, 0]
+
+
+@pytest.mark.parametrize("fields", ["species,nope", " , "])
+def test_parse_fields_rejects_unknown_or_empty(fields):
+    with pytest.raises(ValueError):
+        queries.parse_fields(fields)
+
+
+def test_parse_fields_accepts_alias_and_snake_case():
+    assert queries.parse_fields("treeLatitude,tree_latitude,dbh") == ["tree_latitude", "dbh"]
@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+from sqlalchemy import update
+
+import models
+from services.reprocess import ClaimLost, Reprocessor, RUN_PAUSED, RUN_RUNNING
+
+LEASE = 60
+
+
+def _age(db, run_id, seconds, **values):
+    """작업 행의 마지막 임대 갱신 시각을 seconds초 전으로 되돌림"""
+    updated_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=seconds)
+    db.execute(update(models.ReprocessRun).where(models.ReprocessRun.id == run_id)
+               .values(updated_at=updated_at, **values))
+    db.commit()
+
+
+def test_live_run_cannot_be_claimed_twice(db, session_factory):
+    first, second = Reprocessor(session_factory, lease_seconds=LEASE), Reprocessor(session_factory, lease_seconds=LEASE)
+    run = first.prepare(db)
+
+    with pytest.raises(RuntimeError, match="already in progress"):
+        second.prepare(db)
+    # 일시 중지된 작업은 임대와 무관하게 바로 이어서 실행
+    _age(db, run.id, 0, status=RUN_PAUSED)
+    assert second.prepare(db).id == run.id
+
+
+def test_takeover_after_lease_fences_previous_owner(db, session_factory):
+    first, second = Reprocessor(session_factory, lease_seconds=LEASE), Reprocessor(session_factory, lease_seconds=LEASE)
+    run = first.prepare(db)
+    _age(db, run.id, LEASE * 2)
+
+    resumed = second.prepare(db)
+
+    assert resumed.id == run.id and resumed.status == RUN_RUNNING
+    with pytest.raises(ClaimLost):
+        first._write(db, run.id, 10, [], [])
+    second._write(db, run.id, 20, [], [])
+    db.expire_all()
+    assert db.get(models.ReprocessRun, run.id).last_id == 20
@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from response_cache import ResponseCache, ResponseCacheMiddleware
+
+
+class SharedVersion:
+    """다른 프로세스가 기록하는 change_log 최신 seq 대역 (조회 횟수와 렌더링 횟수 기록)"""
+
+    def __init__(self):
+        self.seq = 0
+        self.reads = 0
+        self.rendered = 0
+
+    def __call__(self) -> int:
+        self.reads += 1
+        return self.seq
+
+    def endpoint(self, request):
+        self.rendered += 1
+        return PlainTextResponse(f"seq={self.seq}")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("response_cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def _client(shared, cache=None, ttl=1.0):
+    app = Starlette(routes=[Route("/items", shared.endpoint)])
+    return TestClient(ResponseCacheMiddleware(app, cache or ResponseCache(), paths=["/items"],
+                                              version_source=shared, version_ttl=ttl))
+
+
+def test_conditional_get_within_ttl_skips_version_source(clock):
+    shared = SharedVersion()
+    client = _client(shared)
+    etag = client.get("/items").headers["etag"]
+    assert shared.reads == 1
+
+    clock[0] += 0.5
+    assert client.get("/items", headers={"If-None-Match": etag}).status_code == 304
+    assert shared.reads == 1  # TTL 안에서는 공유 버전을 다시 읽지 않음 (DB 조회 없음)
+
+
+def test_other_process_change_invalidates_after_ttl(clock):
+    shared = SharedVersion()
+    client = _client(shared)
+    etag = client.get("/items").headers["etag"]
+
+    shared.seq = 5  # 다른 프로세스의 커밋
+    clock[0] += 0.5
+    assert client.get("/items").text == "seq=0"  # TTL 동안은 캐시된 응답
+
+    clock[0] += 1.0
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.text == "seq=5"
+    assert response.headers["etag"] != etag
+
+
+def test_local_bump_invalidates_immediately(clock):
+    shared = SharedVersion()
+    cache = ResponseCache()
+    client = _client(shared, cache, ttl=60)
+    etag = client.get("/items").headers["etag"]
+    assert client.get("/items").status_code == 200 and shared.rendered == 1  # 캐시 적중
+
+    cache.bump()  # 같은 프로세스의 저장
+    assert client.get("/items", headers={"If-None-Match": etag}).status_code == 200
+    assert shared.rendered == 2
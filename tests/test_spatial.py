@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import text
+
+import models
+import spatial
+
+from conftest import measurement
+
+# 서울 시청 부근 기준점
+LAT, LON = 37.5665, 126.9780
+
+
+def _at(lat, lon, **values):
+    return measurement(tree_latitude=lat, tree_longitude=lon, **values)
+
+
+def _rtree(db, measurement_id):
+    row = db.execute(text(f"SELECT min_lat, min_lon FROM {spatial.RTREE_TABLE} WHERE id = :id"),
+                     {"id": measurement_id}).first()
+    return None if row is None else (pytest.approx(row.min_lat, abs=1e-5), pytest.approx(row.min_lon, abs=1e-5))
+
+
+def _filtered(db, **filters):
+    query = db.query(models.TreeMeasurement.id)
+    query = spatial.apply_spatial_filter(query, db.get_bind(), **filters)
+    return sorted(row.id for row in query)
+
+
+def test_rtree_triggers_follow_inserts_updates_and_deletes(db, add_measurements):
+    moved, plain = add_measurements(
+        _at(LAT, LON),
+        _at(LAT + 0.01, LON + 0.01),
+    )
+    assert _rtree(db, moved) == (LAT, LON)
+
+    # 보정 좌표가 생기면 인덱스도 보정 좌표로 이동
+    db.query(models.TreeMeasurement).filter_by(id=moved).update(
+        {"adjusted_tree_latitude": LAT + 0.002, "adjusted_tree_longitude": LON - 0.002})
+    db.commit()
+    assert _rtree(db, moved) == (LAT + 0.002, LON - 0.002)
+
+    db.query(models.TreeMeasurement).filter_by(id=plain).delete()
+    db.commit()
+    assert _rtree(db, plain) is None
+
+
+def test_bbox_filter_uses_adjusted_coordinates(db, add_measurements):
+    inside, outside, adjusted_in, adjusted_out = add_measurements(
+        _at(LAT, LON),
+        _at(LAT + 0.1, LON),
+        _at(LAT + 0.1, LON, adjusted_tree_latitude=LAT + 0.0005, adjusted_tree_longitude=LON),
+        _at(LAT, LON, adjusted_tree_latitude=LAT - 0.1, adjusted_tree_longitude=LON),
+    )
+    bbox = (LAT - 0.001, LON - 0.001, LAT + 0.001, LON + 0.001)
+
+    assert _filtered(db, bbox=bbox) == sorted([inside, adjusted_in])
+
+
+def test_radius_filter_excludes_bbox_corners(db, add_measurements):
+    # 반경 100m: 정북 80m는 포함, 대각선 (80m, 80m) ~ 113m는 감싸는 bbox 안이지만 제외
+    d_lat = 80 / spatial.METERS_PER_DEGREE
+    d_lon = d_lat / spatial.math.cos(spatial.math.radians(LAT))
+    center, north, corner, far = add_measurements(
+        _at(LAT, LON),
+        _at(LAT + d_lat, LON),
+        _at(LAT + d_lat, LON + d_lon),
+        _at(LAT + 0.01, LON),
+    )
+
+    assert _filtered(db, near=(LAT, LON, 100)) == [center, north]
+    assert _filtered(db, bbox=spatial.radius_bbox(LAT, LON, 100)) == [center, north, corner]
+
+
+@pytest.mark.parametrize("params", [
+    {"bbox": "1,2,3"},
+    {"bbox": "37.6,127,37.5,127.1"},  # min > max
+    {"lat": 37.5, "lon": 127.0},  # radius 누락
+    {"lat": 37.5, "lon": 127.0, "radius": 0},
+])
+def test_invalid_spatial_params(params):
+    with pytest.raises(ValueError):
+        spatial.parse_spatial_params(**params)
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import inspect, text
+
+import telemetry
+
+from conftest import measurement
+
+
+def test_legacy_columns_move_to_telemetry_table(engine, add_measurements):
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE measurements ADD COLUMN temperature FLOAT"))
+        conn.execute(text("ALTER TABLE measurements ADD COLUMN device_model VARCHAR"))
+    legacy, empty = add_measurements(measurement(), measurement())
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE measurements SET temperature = 21.5, device_model = 'Pixel 8' WHERE id = :id"),
+                     {"id": legacy})
+
+    telemetry.ensure_schema(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("measurements")}
+    assert not columns & set(telemetry.FIELDS)
+    with engine.connect() as conn:
+        moved = conn.execute(text(f"SELECT measurement_id, temperature, device_model FROM {telemetry.TABLE}")).all()
+        view = conn.execute(text(f"SELECT id, temperature, device_model, dbh FROM {telemetry.VIEW} ORDER BY id")).all()
+    # 값이 없는 측정은 센서 행을 만들지 않음
+    assert moved == [(legacy, 21.5, "Pixel 8")]
+    assert view == [(legacy, 21.5, "Pixel 8", 30.0), (empty, None, None, 30.0)]
+    # 이미 이전된 DB에서는 아무것도 하지 않음
+    assert telemetry.migrate_legacy_columns(engine) == 0
+
+
+@pytest.mark.parametrize("vectors", [[[0.02, -9.81, 0.5]], [[1.0, 2.0, 3.0], [4.25, 5.5, -6.75]]])
+def test_vectors_round_trip(vectors):
+    blob = telemetry.pack_vectors(vectors)
+    assert len(blob) == 12 * len(vectors)
+    assert telemetry.unpack_vectors(blob) == vectors
+
+
+def test_empty_vectors_are_null():
+    assert telemetry.pack_vectors([]) is None
+    assert telemetry.unpack_vectors(None) is None